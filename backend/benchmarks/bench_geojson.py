@@ -0,0 +1,94 @@
+"""
+GeoJSON micro-benchmark: loading and merging the grid files, simplifying per
+zoom bucket, encoding and precompressing the payload, and revalidating a cached one
+(the steady-state cost of /api/grid-data and /api/sibe-zones).
+
+--scale N multiplies the grid features (shifted copies) to see how each stage
+grows with the dataset. No database is needed.
+
+    python benchmarks/bench_geojson.py --scale 1 10 --json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import geodata  # noqa: E402
+import simplify  # noqa: E402
+import responses  # noqa: E402
+from responses import PrecompressedPayload  # noqa: E402
+
+
+def _shift(geometry: dict, offset: float) -> dict:
+    def move(coords):
+        if coords and isinstance(coords[0], (int, float)):
+            return [coords[0] + offset, coords[1] + offset] + list(coords[2:])
+        return [move(c) for c in coords]
+    return {"type": geometry["type"], "coordinates": move(geometry["coordinates"])}
+
+
+def scaled_grid(scale: int) -> dict:
+    base = geodata._build_grid(geodata.grid_asset.paths)
+    features = list(base["features"])
+    for copy in range(1, scale):
+        offset = copy * 1e-3
+        features.extend(
+            {**f, "geometry": _shift(f["geometry"], offset)} for f in base["features"] if f.get("geometry")
+        )
+    return {"type": "FeatureCollection", "features": features}
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(scales, repeat: int) -> list:
+    results = []
+    for scale in scales:
+        data = scaled_grid(scale)
+        encoded = geodata.encode_json(data)
+        payload = PrecompressedPayload(encoded)
+        cases = {
+            "load_merge": lambda: geodata._build_grid(geodata.grid_asset.paths),
+            "encode_full": lambda: geodata.encode_json(data),
+            "simplify_all_buckets": lambda: [simplify.simplify_collection(data, b) for b in simplify.ZOOM_BUCKETS],
+            "precompress": lambda: PrecompressedPayload(encoded),
+            "etag_revalidate": lambda: responses._etag_matches(payload.etag_for("gzip"), payload),
+        }
+        for name, fn in cases.items():
+            results.append({
+                "scale": scale,
+                "features": len(data["features"]),
+                "case": name,
+                "seconds": round(best_of(fn, repeat), 6),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.scale, args.repeat)
+    if args.json:
+        print(json.dumps({"benchmark": "geojson", "results": results}, indent=2))
+        return
+
+    print(f"{'scale':>6} {'features':>9}  {'case':<22} {'ms':>10}")
+    for r in results:
+        print(f"{r['scale']:>6} {r['features']:>9}  {r['case']:<22} {r['seconds'] * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Serialization micro-benchmark for /api/projects-style payloads.
+
+Compares the regular path (a ProjectBase per row, re-validated against the
+response_model and encoded the way FastAPI does it) with the opt-in fast
+paths in fastjson.py. No database is needed: rows are synthetic tuples shaped
+like the SQLAlchemy rows the endpoint selects.
+
+    python benchmarks/bench_serialization.py --rows 10000 100000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import TypeAdapter  # noqa: E402
+
+import fastjson  # noqa: E402
+import schemas  # noqa: E402
+
+COLUMNS = ["id", "name", "type", "capacity_mw", "location_name", "status", "latitude", "longitude"]
+TYPES = ["Solar", "Wind", "Hydro"]
+STATUSES = ["Operational", "Under Construction", "Planned"]
+
+
+def make_rows(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    return [
+        (
+            i,
+            f"Site {i}",
+            rng.choice(TYPES),
+            round(rng.uniform(1, 600), 1),
+            f"Commune {i % 1500}",
+            rng.choice(STATUSES),
+            rng.uniform(21.0, 35.9),
+            rng.uniform(-17.0, -1.0),
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+def pydantic_path(rows) -> bytes:
+    # What get_projects + response_model did for every request
+    models = [schemas.ProjectBase(**dict(zip(COLUMNS, r))) for r in rows]
+    adapter = TypeAdapter(List[schemas.ProjectBase])
+    validated = adapter.validate_python(models, from_attributes=True)
+    # Same settings as starlette.responses.JSONResponse.render
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(rows) -> bytes:
+    return fastjson.encode_rows(COLUMNS, rows, "fast")
+
+
+def columnar_path(rows) -> bytes:
+    return fastjson.encode_rows(COLUMNS, rows, "columnar")
+
+
+CASES = {"pydantic": pydantic_path, "fast": fast_path, "columnar": columnar_path}
+
+
+def best_of(fn, rows, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(rows)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(row_counts, repeat: int) -> list:
+    results = []
+    for n in row_counts:
+        rows = make_rows(n)
+        baseline = None
+        for name, fn in CASES.items():
+            seconds = best_of(fn, rows, repeat)
+            baseline = baseline or seconds
+            results.append({
+                "rows": n,
+                "case": name,
+                "seconds": round(seconds, 6),
+                "bytes": len(fn(rows)),
+                "speedup": round(baseline / seconds, 2),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat)
+    if args.json:
+        print(json.dumps({"benchmark": "serialization", "orjson": fastjson.orjson is not None, "results": results}, indent=2))
+        return
+
+    print(f"orjson available: {fastjson.orjson is not None}")
+    print(f"{'rows':>8}  {'case':<10} {'ms':>10} {'bytes':>12} {'speedup':>8}")
+    for r in results:
+        print(f"{r['rows']:>8}  {r['case']:<10} {r['seconds'] * 1000:>10.1f} {r['bytes']:>12} {r['speedup']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
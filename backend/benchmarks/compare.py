@@ -0,0 +1,75 @@
+"""
+Compares two benchmark JSON reports (any of the --json outputs in this
+directory) and flags regressions beyond a tolerance.
+
+    python benchmarks/compare.py before.json after.json --tolerance 10
+
+Exits with status 1 when anything regressed, so it can gate CI.
+"""
+import argparse
+import json
+import sys
+
+# Fields that identify a result row, and the measurements compared (True: lower is better)
+IDENTITY_FIELDS = ("scenario", "route", "case", "rows", "scale", "features")
+MEASUREMENTS = {"seconds": True, "p50_ms": True, "p95_ms": True, "p99_ms": True, "rps": False}
+
+
+def _rows(report: dict) -> dict:
+    rows = {}
+    results = report.get("results", [])
+    if isinstance(results, dict):
+        # seed_synthetic reports {table: {...}}
+        results = [{"case": name, **values} for name, values in results.items()]
+    for row in results:
+        merged = {"scenario": report.get("scenario"), **row}
+        key = (report.get("benchmark"),) + tuple(merged.get(f) for f in IDENTITY_FIELDS)
+        rows[key] = row
+    return rows
+
+
+def compare(before: dict, after: dict, tolerance: float) -> list:
+    changes = []
+    old_rows, new_rows = _rows(before), _rows(after)
+    for key, new in new_rows.items():
+        old = old_rows.get(key)
+        if old is None:
+            continue
+        label = " ".join(str(part) for part in key if part is not None)
+        for field, lower_is_better in MEASUREMENTS.items():
+            if not old.get(field) or new.get(field) is None:
+                continue
+            change = (new[field] - old[field]) / old[field] * 100
+            worse = change > tolerance if lower_is_better else change < -tolerance
+            changes.append({"result": label, "field": field, "before": old[field], "after": new[field],
+                            "change_pct": round(change, 1), "regression": worse})
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--tolerance", type=float, default=10.0, help="Allowed change in percent")
+    parser.add_argument("--json", action="store_true", help="Emit the comparison as JSON")
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    changes = compare(before, after, args.tolerance)
+    regressions = [c for c in changes if c["regression"]]
+
+    if args.json:
+        print(json.dumps({"tolerance_pct": args.tolerance, "changes": changes}, indent=2))
+    else:
+        for c in changes:
+            flag = "REGRESSION" if c["regression"] else ""
+            print(f"{c['result'][:60]:<60} {c['field']:<8} {c['before']:>10} -> {c['after']:<10} {c['change_pct']:>+7.1f}% {flag}")
+        print(f"{len(regressions)} regression(s) beyond {args.tolerance}%")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
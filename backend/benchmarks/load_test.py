@@ -0,0 +1,213 @@
+"""
+HTTP load test for every read route of the API.
+
+Two scenarios:
+  saturate  each route in turn, `--concurrency` clients back to back for
+            `--duration` seconds: throughput and latency under pressure.
+  poll      `--clients` simulated dashboards, each fetching what the
+            dashboards poll every `--interval` seconds (10 s in the app),
+            for `--duration` seconds: latency at a realistic load.
+
+Run the API against a seeded benchmark database (seed_synthetic.py) and the
+stub upstreams (stub_upstreams.py), then:
+
+    python benchmarks/load_test.py --base-url http://127.0.0.1:8000 --scenario saturate --json > before.json
+
+The screening job routes are left out: they start background work rather than serve reads.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+
+import httpx
+
+# (method, path, body) for every route; one entry per distinct code path
+ROUTES = [
+    ("GET", "/", None),
+    ("GET", "/api/projects", None),
+    ("GET", "/api/projects?bbox=-10,29,-5,33&limit=500", None),
+    ("GET", "/api/projects?format=columnar", None),
+    ("GET", "/api/projects?stream=1", None),
+    ("GET", "/api/market-data", None),
+    ("GET", "/api/market-data?stream=1", None),
+    ("GET", "/api/market-series?series=turt_price,turd_price&points=500", None),
+    ("GET", "/api/reforms", None),
+    ("GET", "/api/generation-mix", None),
+    ("GET", "/api/kpis", None),
+    ("GET", "/api/historical-growth", None),
+    ("GET", "/api/financials", None),
+    ("GET", "/api/regulations", None),
+    ("GET", "/api/regulations?stream=1", None),
+    ("GET", "/api/regulations/search?q=energie%20renouvelable&limit=50", None),
+    ("GET", "/api/regulations/search?type=Law,Decree&order=date&limit=50", None),
+    ("GET", "/api/dashboard/snapshot", None),
+    ("GET", "/api/kpis-live", None),
+    ("GET", "/api/grid-data", None),
+    ("GET", "/api/grid-data?zoom=6", None),
+    ("GET", "/tiles/grid/6/30/26.mvt", None),
+    ("GET", "/tiles/projects/6/30/26.mvt", None),
+    ("GET", "/api/sibe-zones?zoom=6", None),
+    ("GET", "/api/climate-data?lat=30.93&lon=-6.91", None),
+    ("GET", "/api/water-stress?lat=30.93&lon=-6.91", None),
+    ("GET", "/api/water-stress/raster?resolution=0.1", None),
+    ("POST", "/api/water-stress/batch", {"points": [{"lat": 30.9 + i * 0.01, "lon": -6.9, "id": i} for i in range(50)]}),
+    ("GET", "/api/projects/constraints", None),
+    ("POST", "/api/constraints", {"points": [{"lat": 30.9 + i * 0.01, "lon": -6.9, "id": i} for i in range(100)]}),
+    ("POST", "/api/analytics/monte-carlo", {"technology": "solar", "draws": 100000}),
+    ("GET", "/api/stream", None),
+    ("GET", "/metrics", None),
+]
+
+# What the dashboards fetch on each 10-second poll
+DASHBOARD_POLL = [
+    "/api/dashboard/snapshot?live=true",
+    "/api/kpis-live",
+    "/api/financials",
+    "/api/regulations",
+    "/api/projects",
+]
+
+
+def percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return None
+    # Nearest-rank percentile
+    index = max(0, math.ceil(q / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, route: str, seconds: float, ok: bool):
+        self.latencies.setdefault(route, []).append(seconds)
+        if not ok:
+            self.errors[route] = self.errors.get(route, 0) + 1
+
+    def summary(self, route: str, wall_seconds: float) -> dict:
+        values = sorted(self.latencies.get(route, []))
+
+        def ms(value):
+            return None if value is None else round(value * 1000, 2)
+
+        return {
+            "route": route,
+            "requests": len(values),
+            "errors": self.errors.get(route, 0),
+            "rps": round(len(values) / wall_seconds, 1) if wall_seconds else None,
+            "p50_ms": ms(percentile(values, 50)),
+            "p95_ms": ms(percentile(values, 95)),
+            "p99_ms": ms(percentile(values, 99)),
+            "max_ms": ms(values[-1] if values else None),
+        }
+
+
+async def fetch(client: httpx.AsyncClient, method: str, path: str, body, recorder: Recorder, label: str = None):
+    label = label or f"{method} {path}"
+    start = time.perf_counter()
+    ok = False
+    try:
+        if path.startswith("/api/stream"):
+            # Server-Sent Events never finish: time until the first event arrives
+            async with client.stream(method, path) as response:
+                async for _ in response.aiter_lines():
+                    break
+                ok = response.status_code == 200
+        else:
+            response = await client.request(method, path, json=body, headers={"Accept-Encoding": "gzip, br"})
+            ok = response.status_code < 400
+    except httpx.HTTPError:
+        ok = False
+    recorder.record(label, time.perf_counter() - start, ok)
+
+
+async def saturate(client, routes, concurrency: int, duration: float) -> list:
+    results = []
+    for method, path, body in routes:
+        recorder = Recorder()
+        label = f"{method} {path}"
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                await fetch(client, method, path, body, recorder, label)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        results.append(recorder.summary(label, time.perf_counter() - start))
+    return results
+
+
+async def poll(client, clients: int, interval: float, duration: float) -> list:
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+
+    async def dashboard():
+        # Spread the clients over the interval, like browsers opened at different times
+        await asyncio.sleep(random.uniform(0, interval))
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            await asyncio.gather(*(fetch(client, "GET", path, None, recorder) for path in DASHBOARD_POLL))
+            await asyncio.sleep(max(0.0, interval - (time.perf_counter() - started)))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(dashboard() for _ in range(clients)))
+    wall = time.perf_counter() - start
+    return [recorder.summary(f"GET {path}", wall) for path in DASHBOARD_POLL]
+
+
+async def run(args) -> dict:
+    limits = httpx.Limits(max_connections=max(args.concurrency, args.clients) * 2)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        if args.scenario == "saturate":
+            routes = [r for r in ROUTES if not args.route or any(f in r[1] for f in args.route)]
+            results = await saturate(client, routes, args.concurrency, args.duration)
+        else:
+            results = await poll(client, args.clients, args.interval, args.duration)
+    return {
+        "benchmark": "load",
+        "scenario": args.scenario,
+        "config": {
+            "base_url": args.base_url,
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "clients": args.clients,
+            "interval": args.interval,
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--scenario", choices=["saturate", "poll"], default="saturate")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per route (saturate) or in total (poll)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients per route (saturate)")
+    parser.add_argument("--clients", type=int, default=200, help="Simulated dashboards (poll)")
+    parser.add_argument("--interval", type=float, default=10.0, help="Dashboard poll interval in seconds (poll)")
+    parser.add_argument("--route", action="append", help="Only routes whose path contains this (repeatable)")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'route':<70} {'req':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for r in report["results"]:
+        print(
+            f"{r['route'][:70]:<70} {r['requests']:>7} {r['errors']:>5} {r['rps'] or 0:>8.1f} "
+            f"{r['p50_ms'] or 0:>8.1f} {r['p95_ms'] or 0:>8.1f} {r['p99_ms'] or 0:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Seeds a benchmark database with synthetic data at a chosen scale: projects,
+hourly market_series points and transmission line features, all inside
+Morocco's bbox. Rows are streamed with COPY, so 10^6 rows take seconds.
+
+Point DATABASE_URL at a dedicated PostGIS database (the API's SQL relies on
+PostGIS functions, so there is no SQLite stand-in), run seed.py once for the
+schema, then:
+
+    python benchmarks/seed_synthetic.py --projects 100000 --market-rows 1000000 --grid-features 10000 --reset
+"""
+import argparse
+import csv
+import datetime
+import hashlib
+import io
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+
+import database  # noqa: E402
+import timeseries  # noqa: E402
+
+MOROCCO_BBOX = (-17.1, 20.8, -1.0, 35.9)
+TYPES = ["Solar", "Wind", "Hydro", "Green Hydrogen"]
+STATUSES = ["Operational", "Under Construction", "Planned"]
+VOLTAGES = [60, 150, 225, 400]
+CHUNK_ROWS = 50_000
+
+
+def _random_point(rng):
+    min_lon, min_lat, max_lon, max_lat = MOROCCO_BBOX
+    return rng.uniform(min_lon, max_lon), rng.uniform(min_lat, max_lat)
+
+
+def project_rows(n: int, rng, tag: str):
+    for i in range(n):
+        lon, lat = _random_point(rng)
+        yield (
+            f"Synthetic Site {tag}-{i}",
+            rng.choice(TYPES),
+            round(rng.uniform(1, 600), 1),
+            f"Commune {i % 1500}",
+            rng.choice(STATUSES),
+            f"SRID=4326;POINT({lon:.5f} {lat:.5f})",
+        )
+
+
+def market_rows(n: int, rng):
+    series = timeseries.MARKET_SERIES
+    per_series = max(1, n // len(series))
+    end = datetime.datetime.now(datetime.timezone.utc).replace(minute=0, second=0, microsecond=0)
+    start = end - datetime.timedelta(hours=per_series - 1)
+    for name in series:
+        value = rng.uniform(0.05, 1.5)
+        for h in range(per_series):
+            # Multiplicative random walk, so prices stay positive
+            value = max(0.01, value * (1 + rng.gauss(0, 0.01)))
+            yield name, (start + datetime.timedelta(hours=h)).isoformat(), round(value, 5)
+
+
+def line_rows(n: int, rng):
+    for _ in range(n):
+        lon, lat = _random_point(rng)
+        points = [(lon, lat)]
+        for _ in range(rng.randint(2, 12)):
+            lon += rng.uniform(-0.1, 0.1)
+            lat += rng.uniform(-0.1, 0.1)
+            points.append((lon, lat))
+        kv = rng.choice(VOLTAGES)
+        wkt = ", ".join(f"{x:.5f} {y:.5f}" for x, y in points)
+        # A geom_key of their own, so seed.py does not take these for legacy keyless rows
+        geom_key = hashlib.sha256(wkt.encode("utf-8")).hexdigest()[:32]
+        yield f"{kv} kV", kv, rng.choice(["Existing", "Planned"]), geom_key, f"SRID=4326;MULTILINESTRING(({wkt}))"
+
+
+def copy_rows(cursor, table: str, columns, rows) -> int:
+    count = 0
+    while True:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        chunk = 0
+        for row in rows:
+            writer.writerow(row)
+            chunk += 1
+            if chunk >= CHUNK_ROWS:
+                break
+        if chunk == 0:
+            return count
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        count += chunk
+
+
+def seed(projects: int, market_rows_count: int, grid_features: int, reset: bool, seed_value: int) -> dict:
+    rng = random.Random(seed_value)
+    # Project names are unique; a fresh table can reuse the same names, an appended run cannot
+    tag = str(seed_value) if reset else str(int(time.time()))
+    timings = {}
+
+    with database.engine.begin() as conn:
+        first_year = datetime.date.today().year - market_rows_count // (len(timeseries.MARKET_SERIES) * 8760) - 1
+        timeseries.ensure_partitions(conn, first_year=min(first_year, timeseries.PARTITION_FIRST_YEAR))
+        if reset:
+            conn.execute(text("TRUNCATE projects, transmission_lines, market_series RESTART IDENTITY"))
+            conn.execute(text("DELETE FROM ingest_record_hashes WHERE source IN ('projects', 'market_series')"))
+
+        cursor = conn.connection.cursor()
+        for name, table, columns, rows in [
+            ("projects", "projects", ["name", "type", "capacity_mw", "location_name", "status", "geom"],
+             project_rows(projects, rng, tag)),
+            ("market_series", "market_series", ["series", "ts", "value"], market_rows(market_rows_count, rng)),
+            ("transmission_lines", "transmission_lines", ["legend", "voltage_kv", "status", "geom_key", "geom"],
+             line_rows(grid_features, rng)),
+        ]:
+            start = time.perf_counter()
+            inserted = copy_rows(cursor, table, columns, rows)
+            timings[name] = {"rows": inserted, "seconds": round(time.perf_counter() - start, 3)}
+
+        conn.execute(text("ANALYZE projects"))
+        conn.execute(text("ANALYZE transmission_lines"))
+        conn.execute(text("ANALYZE market_series"))
+
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=1_000)
+    parser.add_argument("--market-rows", type=int, default=10_000)
+    parser.add_argument("--grid-features", type=int, default=1_000)
+    parser.add_argument("--reset", action="store_true", help="Truncate projects, transmission_lines and market_series first")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed, for reproducible datasets")
+    args = parser.parse_args()
+
+    timings = seed(args.projects, args.market_rows, args.grid_features, args.reset, args.seed)
+    print(json.dumps({"benchmark": "seed_synthetic", "results": timings}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
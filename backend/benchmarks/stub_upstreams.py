@@ -0,0 +1,180 @@
+"""
+Local stand-ins for NASA POWER and WRI Aqueduct, so load tests never hit the
+real services and upstream latency is under our control. Also serves fixtures
+for the background scrapers (ONEE, MASEN and ANRE-style publications) with
+ETag / Last-Modified validators; their figures change every --fixture-period
+seconds, and answer 304 in between.
+
+    python benchmarks/stub_upstreams.py --port 8900 --latency-ms 80
+
+then start the API with
+    NASA_POWER_URL=http://127.0.0.1:8900/nasa-power AQUEDUCT_URL=http://127.0.0.1:8900/aqueduct
+
+and, for the scrapers,
+    SCRAPER_ONEE_URL=http://127.0.0.1:8900/onee/kpis
+    SCRAPER_MASEN_URL=http://127.0.0.1:8900/masen/financials
+    SCRAPER_ANRE_URL=http://127.0.0.1:8900/anre/kpis
+
+--error-rate makes a fraction of calls fail with 503, to exercise the circuit
+breakers, fallbacks and scraper retries.
+"""
+import argparse
+import email.utils
+import hashlib
+import json
+import math
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+MONTHS = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+
+
+def climatology(lat: float, lon: float) -> dict:
+    # Plausible, deterministic values: sunnier and windier towards the south-west
+    ghi = round(4.5 + (35.0 - lat) * 0.12, 2)
+    dni = round(ghi * 1.15, 2)
+    wind = round(5.0 + max(0.0, -lon - 8.0) * 0.3, 2)
+
+    def monthly(annual, amplitude):
+        values = {m: round(annual + amplitude * math.cos((i - 6) * math.pi / 6), 2) for i, m in enumerate(MONTHS)}
+        values["ANN"] = annual
+        return values
+
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [lon, lat, 0]},
+        "properties": {"parameter": {
+            "ALLSKY_SFC_SW_DWN": monthly(ghi, 1.5),
+            "ALLSKY_SFC_SW_DNI": monthly(dni, 1.8),
+            "WS50M": monthly(wind, 0.6),
+        }},
+    }
+
+
+def aqueduct(lat: float) -> dict:
+    return {"data": [{"bws_raw": round(min(5.0, max(0.0, (36.0 - lat) * 0.3)), 2)}]}
+
+
+def onee(period: int) -> dict:
+    return {
+        "as_of": time.strftime("%Y-%m-%d", time.gmtime(StubHandler.started + period * StubHandler.fixture_period)),
+        "installed_capacity_mw": 12016 + 5 * period,
+        "installed_capacity_change_mw": 5,
+        "renewable_share_pct": round(45.3 + 0.01 * period, 2),
+        "renewable_share_change_pct": 0.01,
+    }
+
+
+def masen(period: int) -> dict:
+    return {"programmes": [
+        {"category": "Solar Power", "amount_usd_bn": round(3.2 + 0.001 * period, 3), "year": 2025,
+         "source": "MASEN — Noor Complex & Midelt pipeline"},
+        {"category": "MASEN/ONEE — 800 MW Tender", "amount_usd_bn": 0.9, "year": 2025,
+         "source": "MASEN & ONEE — Nov 2025 tender (500MW wind + 300MW solar+storage)"},
+    ]}
+
+
+def anre(period: int) -> dict:
+    return {"records": [
+        {"label": "Grid Hosting Capacity", "value": f"{4200 + 10 * period:,} MW",
+         "subtext": "Source: ANRE", "trend": "up"},
+    ]}
+
+
+FIXTURES = {"/onee/kpis": onee, "/masen/financials": masen, "/anre/kpis": anre}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    error_rate = 0.0
+    fixture_period = 300
+    started = time.time()
+
+    def _delay_or_fail(self) -> bool:
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and random.random() < self.error_rate:
+            self._send(503, {"error": "stubbed upstream failure"})
+            return True
+        return False
+
+    def _send(self, status: int, body: dict):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_fixture(self, build):
+        # Counted from server start, so the fixtures begin at their base values
+        period = int((time.time() - self.started) // self.fixture_period)
+        data = json.dumps(build(period)).encode("utf-8")
+        etag = '"' + hashlib.sha256(data).hexdigest()[:16] + '"'
+        last_modified = email.utils.formatdate(self.started + period * self.fixture_period, usegmt=True)
+        if self.headers.get("If-None-Match") == etag or (
+            not self.headers.get("If-None-Match") and self.headers.get("If-Modified-Since") == last_modified
+        ):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path in FIXTURES:
+            if self._delay_or_fail():
+                return
+            return self._send_fixture(FIXTURES[url.path])
+        if url.path != "/nasa-power":
+            return self._send(404, {"error": "not found"})
+        if self._delay_or_fail():
+            return
+        query = parse_qs(url.query)
+        self._send(200, climatology(float(query["latitude"][0]), float(query["longitude"][0])))
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/aqueduct":
+            return self._send(404, {"error": "not found"})
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if self._delay_or_fail():
+            return
+        lon, lat = payload["geom"]["coordinates"]
+        self._send(200, aqueduct(lat))
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--fixture-period", type=int, default=300, help="Seconds between scraper fixture updates")
+    args = parser.parse_args()
+
+    StubHandler.latency = args.latency_ms / 1000
+    StubHandler.error_rate = args.error_rate
+    StubHandler.fixture_period = args.fixture_period
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    print(f"Stub NASA POWER: http://{args.host}:{args.port}/nasa-power")
+    print(f"Stub Aqueduct:   http://{args.host}:{args.port}/aqueduct")
+    for path in FIXTURES:
+        print(f"Scraper fixture: http://{args.host}:{args.port}{path}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+
+try:
+    import redis
+    import redis.asyncio as redis_asyncio
+except ImportError:  # redis is optional; the SQLite store is shared by every worker on one host
+    redis = None
+    redis_asyncio = None
+
+CACHE_DIR = os.getenv(
+    "CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+)
+
+# Second tier behind each in-process TTLCache: 'sqlite' (a file shared by the workers on this host),
+# 'redis' (shared by every host, needs REDIS_URL) or 'memory' (per process, nothing shared)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "sqlite").lower()
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+class SQLiteStore:
+    """A tiny persistent key/value store (JSON values with an expiry) that survives restarts."""
+
+    def __init__(self, path: str, table: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        self._pid = None
+        self._connection = None
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        # A connection must not cross a fork: each worker process opens its own
+        if self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._pid = os.getpid()
+        return self._connection
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at < time.time():
+            self.delete(key)
+            return None
+        return json.loads(value), expires_at
+
+    def set(self, key: str, value, expires_at: float):
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at)
+            )
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+
+class RedisStore:
+    """Same interface as SQLiteStore, kept in Redis so several hosts share one cache."""
+
+    def __init__(self, url: str, namespace: str):
+        self.namespace = namespace
+        self.url = url
+        self._client = redis.Redis.from_url(url)
+        # redis.asyncio connections belong to the loop that opened them
+        self._async_client_loop = None
+        self._async_client_instance = None
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _async_client(self):
+        loop = asyncio.get_running_loop()
+        if self._async_client_loop is not loop:
+            self._async_client_loop = loop
+            self._async_client_instance = redis_asyncio.Redis.from_url(self.url)
+        return self._async_client_instance
+
+    @staticmethod
+    def _decode(raw):
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return entry["value"], entry["expires_at"]
+
+    @staticmethod
+    def _encode(value, expires_at: float):
+        ttl_ms = max(1, int((expires_at - time.time()) * 1000))
+        return json.dumps({"value": value, "expires_at": expires_at}), ttl_ms
+
+    def get(self, key: str):
+        return self._decode(self._client.get(self._key(key)))
+
+    async def aget(self, key: str):
+        return self._decode(await self._async_client().get(self._key(key)))
+
+    def set(self, key: str, value, expires_at: float):
+        raw, ttl_ms = self._encode(value, expires_at)
+        self._client.set(self._key(key), raw, px=ttl_ms)
+
+    async def aset(self, key: str, value, expires_at: float):
+        raw, ttl_ms = self._encode(value, expires_at)
+        await self._async_client().set(self._key(key), raw, px=ttl_ms)
+
+    def delete(self, key: str):
+        self._client.delete(self._key(key))
+
+    def clear(self):
+        for key in self._client.scan_iter(match=self._key("*")):
+            self._client.delete(key)
+
+
+def make_store(filename: str, table: str):
+    """The shared second-tier store for one cache, following CACHE_BACKEND (None for 'memory')."""
+    if CACHE_BACKEND == "memory":
+        return None
+    if CACHE_BACKEND == "redis":
+        if redis is not None:
+            return RedisStore(REDIS_URL, table)
+        print("CACHE_BACKEND=redis but the redis package is not installed; using the SQLite store")
+    return SQLiteStore(os.path.join(CACHE_DIR, filename), table)
+
+
+class TTLCache:
+    """
+    An in-memory LRU with per-entry expiry, optionally backed by a SQLiteStore
+    so entries evicted from memory (or lost on restart) are found on disk.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, store: SQLiteStore = None, name: str = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.store = store
+        self.name = name
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key: str):
+        value = self._lookup(key)
+        if self.name is not None:
+            metrics.record_cache(self.name, value is not None)
+        return value
+
+    async def aget(self, key: str):
+        """get() for async callers: the shared store is read without blocking the event loop."""
+        value = self._lookup_memory(key)
+        if value is None and self.store is not None:
+            if hasattr(self.store, "aget"):
+                stored = await self.store.aget(key)
+            else:
+                stored = await asyncio.to_thread(self.store.get, key)
+            value = self._remember_stored(key, stored)
+        if self.name is not None:
+            metrics.record_cache(self.name, value is not None)
+        return value
+
+    def _lookup_memory(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at >= now:
+                    self._entries.move_to_end(key)
+                    return value
+                del self._entries[key]
+        return None
+
+    def _remember_stored(self, key: str, stored):
+        if stored is None:
+            return None
+        value, expires_at = stored
+        self._remember(key, value, expires_at)
+        return value
+
+    def _lookup(self, key: str):
+        value = self._lookup_memory(key)
+        if value is not None or self.store is None:
+            return value
+        return self._remember_stored(key, self.store.get(key))
+
+    def set(self, key: str, value):
+        expires_at = time.time() + self.ttl
+        self._remember(key, value, expires_at)
+        if self.store is not None:
+            self.store.set(key, value, expires_at)
+
+    async def aset(self, key: str, value):
+        """set() for async callers: the shared store is written without blocking the event loop."""
+        expires_at = time.time() + self.ttl
+        self._remember(key, value, expires_at)
+        if self.store is None:
+            return
+        if hasattr(self.store, "aset"):
+            await self.store.aset(key, value, expires_at)
+        else:
+            await asyncio.to_thread(self.store.set, key, value, expires_at)
+
+    def _remember(self, key: str, value, expires_at: float):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.store is not None:
+            self.store.clear()
+
+
+class RequestCoalescer:
+    """Makes concurrent callers asking for the same key share a single in-flight call."""
+
+    def __init__(self):
+        self._inflight = {}
+
+    async def run(self, key, factory):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield() so one caller disconnecting does not cancel the call for everyone else
+        return await asyncio.shield(task)
@@ -0,0 +1,102 @@
+import os
+
+import http_client
+from cache import RequestCoalescer, TTLCache, make_store
+
+# Overridable so the lookup can be pointed at a local stub server
+NASA_POWER_URL = os.getenv("NASA_POWER_URL", "https://power.larc.nasa.gov/api/temporal/climatology/point")
+NASA_POWER_PARAMETERS = "ALLSKY_SFC_SW_DWN,ALLSKY_SFC_SW_DNI,WS50M"
+
+# NASA POWER meteorology is served on the MERRA-2 grid (0.5° lat x 0.625° lon):
+# every click inside the same cell gets the same climatology.
+GRID_LAT_STEP = 0.5
+GRID_LON_STEP = 0.625
+
+# Long-term climatology practically never changes
+CLIMATE_CACHE_TTL = float(os.getenv("CLIMATE_CACHE_TTL", str(30 * 24 * 3600)))
+CLIMATE_CACHE_SIZE = int(os.getenv("CLIMATE_CACHE_SIZE", "4096"))
+
+MONTHS = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+
+climate_cache = TTLCache(
+    CLIMATE_CACHE_SIZE,
+    CLIMATE_CACHE_TTL,
+    make_store("climate.sqlite", "nasa_power"),
+    name="climate",
+)
+_coalescer = RequestCoalescer()
+nasa_power_breaker = http_client.CircuitBreaker("nasa_power")
+
+
+def snap_to_grid(lat: float, lon: float):
+    """Returns the centre of the NASA POWER grid cell containing the point."""
+    return (
+        round(round(lat / GRID_LAT_STEP) * GRID_LAT_STEP, 4),
+        round(round(lon / GRID_LON_STEP) * GRID_LON_STEP, 4),
+    )
+
+
+def parse_climatology(data: dict) -> dict:
+    # Extract Annual Averages (ANN) from the NASA POWER response geometry
+    parameters = data.get("properties", {}).get("parameter", {})
+    ghi_annual = parameters.get("ALLSKY_SFC_SW_DWN", {}).get("ANN", "N/A")
+    dni_annual = parameters.get("ALLSKY_SFC_SW_DNI", {}).get("ANN", "N/A")
+    wind_annual = parameters.get("WS50M", {}).get("ANN", "N/A")
+
+    # Format Monthly Evolution Array
+    monthly_evolution = []
+    for m in MONTHS:
+        monthly_evolution.append({
+            "month": m,
+            "GHI": parameters.get("ALLSKY_SFC_SW_DWN", {}).get(m, 0),
+            "DNI": parameters.get("ALLSKY_SFC_SW_DNI", {}).get(m, 0),
+            "Wind": parameters.get("WS50M", {}).get(m, 0)
+        })
+
+    return {
+        "GHI": ghi_annual,
+        "DNI": dni_annual,
+        "Wind_Speed_50m": wind_annual,
+        "monthly_evolution": monthly_evolution,
+    }
+
+
+async def _fetch_from_nasa(lat: float, lon: float) -> dict:
+    params = {
+        "parameters": NASA_POWER_PARAMETERS,
+        "community": "RE",
+        "longitude": lon,
+        "latitude": lat,
+        "format": "JSON",
+    }
+    if not nasa_power_breaker.allow():
+        raise http_client.CircuitOpenError("NASA POWER is unavailable (circuit open)")
+    try:
+        response = await http_client.request("GET", NASA_POWER_URL, params=params, timeout=10.0)
+        response.raise_for_status()
+        data = response.json()
+    except Exception:
+        nasa_power_breaker.record_failure()
+        raise
+    nasa_power_breaker.record_success()
+    return parse_climatology(data)
+
+
+async def get_climatology(lat: float, lon: float) -> dict:
+    """
+    Cached NASA POWER climatology for the grid cell containing the point.
+    Concurrent lookups for the same cell share one upstream call; failures are not cached.
+    """
+    cell_lat, cell_lon = snap_to_grid(lat, lon)
+    key = f"{cell_lat},{cell_lon}"
+
+    cached = await climate_cache.aget(key)
+    if cached is not None:
+        return cached
+
+    async def load():
+        result = await _fetch_from_nasa(cell_lat, cell_lon)
+        await climate_cache.aset(key, result)
+        return result
+
+    return await _coalescer.run(key, load)
@@ -0,0 +1,133 @@
+import json
+
+from sqlalchemy import text
+
+import versioning
+from cache import RequestCoalescer
+
+DEFAULT_BUFFER_KM = 10.0
+
+# KNN (<->) ranks by planar distance in degrees, which can disagree with the true distance
+# for near ties; the few nearest by index are re-ranked by geodesic distance.
+KNN_CANDIDATES = 3
+
+_POINT_CANDIDATES = """
+    SELECT i::bigint AS id, ST_SetSRID(ST_MakePoint(lon, lat), 4326) AS geom
+    FROM unnest(CAST(:lons AS float8[]), CAST(:lats AS float8[])) WITH ORDINALITY AS u(lon, lat, i)
+"""
+
+_PROJECT_CANDIDATES = "SELECT id::bigint AS id, geom FROM projects WHERE geom IS NOT NULL"
+
+# Tables the project screening reads; its cached distances follow their versions
+PROJECT_TABLES = ("projects", "transmission_lines", "protected_areas")
+
+# include_planned -> (table versions, buffer-independent results); only the latest versions are kept
+_project_results = {}
+_coalescer = RequestCoalescer()
+
+
+def _constraints_sql(candidates: str, include_planned: bool):
+    line_filter = "" if include_planned else "AND l.status = 'Existing'"
+    return text(f"""
+        WITH c AS ({candidates}),
+        v AS MATERIALIZED (
+            SELECT DISTINCT voltage_kv FROM transmission_lines l
+            WHERE voltage_kv IS NOT NULL {line_filter}
+        )
+        SELECT c.id, ST_Y(c.geom) AS latitude, ST_X(c.geom) AS longitude,
+            (
+                SELECT json_object_agg(v.voltage_kv, d.km ORDER BY v.voltage_kv)
+                FROM v CROSS JOIN LATERAL (
+                    SELECT min(ST_Distance(n.geom::geography, c.geom::geography)) / 1000 AS km
+                    FROM (
+                        SELECT l.geom FROM transmission_lines l
+                        WHERE l.voltage_kv = v.voltage_kv {line_filter}
+                        ORDER BY l.geom <-> c.geom
+                        LIMIT {KNN_CANDIDATES}
+                    ) n
+                ) d
+            ) AS grid_km,
+            z.name AS sibe_name, z.wdpa_id AS sibe_wdpa_id, z.inside AS sibe_intersects, z.km AS sibe_km
+        FROM c
+        LEFT JOIN LATERAL (
+            SELECT n.name, n.wdpa_id, ST_Intersects(n.geom, c.geom) AS inside,
+                   ST_Distance(n.geom::geography, c.geom::geography) / 1000 AS km
+            FROM (
+                SELECT p.name, p.wdpa_id, p.geom FROM protected_areas p
+                ORDER BY p.geom <-> c.geom
+                LIMIT {KNN_CANDIDATES}
+            ) n
+            ORDER BY inside DESC, km
+            LIMIT 1
+        ) z ON true
+        ORDER BY c.id
+    """)
+
+
+def _to_result(row) -> dict:
+    grid = row.grid_km or {}
+    if isinstance(grid, str):
+        grid = json.loads(grid)
+    sibe = None
+    if row.sibe_name is not None or row.sibe_wdpa_id is not None:
+        sibe = {
+            "name": row.sibe_name,
+            "wdpa_id": row.sibe_wdpa_id,
+            "distance_km": row.sibe_km,
+            "intersects": row.sibe_intersects,
+        }
+    return {
+        "id": row.id,
+        "latitude": row.latitude,
+        "longitude": row.longitude,
+        "grid_distance_km": grid,
+        "nearest_grid_km": min(grid.values()) if grid else None,
+        "sibe": sibe,
+    }
+
+
+def apply_buffer(results, buffer_km: float) -> list:
+    """Copies of `results` with the SIBE within_buffer flag set for `buffer_km`; the cached results are left as they are."""
+    flagged = []
+    for result in results:
+        sibe = result["sibe"]
+        if sibe is not None:
+            within = bool(sibe["intersects"] or sibe["distance_km"] <= buffer_km)
+            result = {**result, "sibe": {**sibe, "within_buffer": within}}
+        flagged.append(result)
+    return flagged
+
+
+async def screen_points(db, points, buffer_km: float = DEFAULT_BUFFER_KM, include_planned: bool = False):
+    """
+    Grid distance per voltage class and nearest SIBE zone for each (lat, lon), in one query.
+    Results are in input order; each 'id' is the point's 1-based position.
+    """
+    if not points:
+        return []
+    params = {"lats": [lat for lat, _ in points], "lons": [lon for _, lon in points]}
+    rows = (await db.execute(_constraints_sql(_POINT_CANDIDATES, include_planned), params)).all()
+    return apply_buffer([_to_result(row) for row in rows], buffer_km)
+
+
+async def screen_projects(db, buffer_km: float = DEFAULT_BUFFER_KM, include_planned: bool = False):
+    """
+    Same analysis for every project. The distances do not depend on buffer_km, so they are
+    computed once per table versions and only the within_buffer flag is set per call.
+    """
+    versions = tuple(versioning.tracker.get(table) for table in PROJECT_TABLES)
+    cached = _project_results.get(include_planned)
+    if cached is not None and None not in versions and cached[0] == versions:
+        return apply_buffer(cached[1], buffer_km)
+
+    async def build():
+        rows = (await db.execute(_constraints_sql(_PROJECT_CANDIDATES, include_planned))).all()
+        results = [_to_result(row) for row in rows]
+        # A table without a known version is never cached
+        if None not in versions:
+            _project_results[include_planned] = (versions, results)
+        return results
+
+    # Concurrent misses for the same versions share one query
+    results = await _coalescer.run((include_planned, versions), build)
+    return apply_buffer(results, buffer_km)
@@ -0,0 +1,51 @@
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import JSON
+
+LIVE_SYNC_LABEL = "⟳ Live — Synced"
+
+# Each snapshot section, as the rows the matching REST endpoint returns
+SNAPSHOT_SECTIONS = {
+    "kpis": "SELECT id, label, value, subtext, trend FROM top_level_kpis ORDER BY id",
+    "generation_mix": "SELECT id, name, value, color, type FROM generation_mix ORDER BY id",
+    "historical_growth": "SELECT id, year, renewables, fossil FROM historical_growth ORDER BY id",
+    "projects": (
+        "SELECT id, name, type, capacity_mw, location_name, status, "
+        "ST_Y(geom) AS latitude, ST_X(geom) AS longitude FROM projects ORDER BY id"
+    ),
+    "market_data": (
+        "SELECT id, year, residential_price, industrial_price, turt_price, turd_price, tss_price, "
+        "excedent_pointe_price, excedent_hors_pointe_price, renewables_percentage, fossil_percentage, "
+        "solar_lcoe, wind_lcoe, fossil_lcoe FROM market_data ORDER BY id"
+    ),
+    "reforms": "SELECT id, reform_name, description, status, completion_percentage FROM reform_tracker ORDER BY id",
+}
+
+
+def parse_sections(sections):
+    """Validates a comma-separated section selector; None selects every section."""
+    if not sections:
+        return list(SNAPSHOT_SECTIONS)
+    selected = [s.strip() for s in sections.split(",") if s.strip()]
+    unknown = [s for s in selected if s not in SNAPSHOT_SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown snapshot sections: {', '.join(unknown)}")
+    return list(dict.fromkeys(selected))
+
+
+def _snapshot_sql(sections):
+    # One statement, so every section comes from the same MVCC snapshot and one round trip
+    columns = ", ".join(
+        f"(SELECT coalesce(json_agg(s), '[]'::json) FROM ({SNAPSHOT_SECTIONS[name]}) s) AS {name}"
+        for name in sections
+    )
+    return text(f"SELECT {columns}").columns(**{name: JSON for name in sections})
+
+
+async def fetch_snapshot(db, sections, live: bool = False) -> dict:
+    row = (await db.execute(_snapshot_sql(sections))).one()
+    snapshot = dict(row._mapping)
+    if "kpis" in snapshot:
+        # Same shape as /api/kpis and /api/kpis-live
+        for kpi in snapshot["kpis"]:
+            kpi["change"] = LIVE_SYNC_LABEL if live else None
+    return snapshot
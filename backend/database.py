@@ -1,8 +1,13 @@
 import os
-from sqlalchemy import create_engine
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
+import metrics
 
 load_dotenv()
 
@@ -13,11 +18,91 @@ SQLALCHEMY_DATABASE_URL = os.getenv(
     "postgresql://postgres@localhost:5432/energy_db"
 )
 
+# Connection pool tuning, shared by the sync and async engines
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# Number of prepared statements asyncpg keeps per connection
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "500"))
+
+_pool_options = dict(
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+
+class _TimedQueuePool(QueuePool):
+    # Records how long callers wait for a connection (pool exhaustion shows up here first)
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start, engine="sync")
+
+
+class _TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start, engine="async")
+
+
+def _instrument(sync_engine):
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        metrics.record_query(time.perf_counter() - conn.info["query_start"].pop())
+
+
 # We use psycopg2 as the driver
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, poolclass=_TimedQueuePool, **_pool_options)
+_instrument(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _async_url(url: str):
+    # Same database, reached through asyncpg
+    return make_url(url).set(drivername="postgresql+asyncpg").update_query_dict(
+        {"prepared_statement_cache_size": str(DB_STATEMENT_CACHE_SIZE)}
+    )
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_url(SQLALCHEMY_DATABASE_URL)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args={"statement_cache_size": DB_STATEMENT_CACHE_SIZE},
+    poolclass=_TimedAsyncQueuePool,
+    **_pool_options
+)
+_instrument(async_engine.sync_engine)
+
+
+def pool_stats() -> dict:
+    """Current size and usage of both connection pools, for /metrics."""
+    stats = {}
+    for name, pool in (("sync", engine.pool), ("async", async_engine.sync_engine.pool)):
+        stats[name] = {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": pool.overflow(),
+        }
+    return stats
+
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
 Base = declarative_base()
 
 # Dependency
@@ -27,3 +112,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Async dependency, used by the read endpoints
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
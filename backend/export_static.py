@@ -0,0 +1,206 @@
+"""
+Renders the endpoints whose data only changes on (re)seed to static files, so
+the Next.js app or a CDN can serve them without touching Python or Postgres.
+
+Every response is written as a content-hashed file with gzip and brotli
+siblings (name.<hash>.json, .json.gz, .json.br: the layout nginx's
+gzip_static / brotli_static expect), listed in manifest.json by API path.
+The GeoJSON layers get one file per zoom bucket, exactly like ?zoom= on the API.
+
+Re-runs are incremental: a table endpoint is only re-rendered when its row in
+table_versions moved, a GeoJSON layer only when its source files changed.
+Files of the previous generation are kept, so a client still holding the old
+manifest keeps working; anything older is removed.
+
+    python export_static.py                    # into public/snapshots/
+    python export_static.py --out /srv/cdn/api --force
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import sys
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+import database
+import geodata
+import models
+import schemas
+import simplify
+from responses import PrecompressedPayload
+
+DEFAULT_OUT_DIR = os.path.join(geodata.BASE_DIR, "public", "snapshots")
+MANIFEST_NAME = "manifest.json"
+MANIFEST_FORMAT = 1
+
+# Endpoint -> (table model, response schema), rendered like the API renders them
+TABLE_ENDPOINTS = {
+    "kpis": (models.TopLevelKPI, schemas.TopLevelKPIBase),
+    "generation-mix": (models.GenerationMix, schemas.GenerationMixBase),
+    "historical-growth": (models.HistoricalGrowth, schemas.HistoricalGrowthBase),
+    "financials": (models.FinancialData, schemas.FinancialDataBase),
+    "reforms": (models.ReformTracker, schemas.ReformTrackerBase),
+}
+GEO_ENDPOINTS = {
+    "grid-data": geodata.grid_asset,
+    "sibe-zones": geodata.sibe_asset,
+}
+
+
+def targets(only=None):
+    """Every file to export: (API path, file stem, kind, source object, zoom bucket)."""
+    for name, (model, schema) in TABLE_ENDPOINTS.items():
+        if not only or name in only:
+            yield f"/api/{name}", name, "table", (model, schema), None
+    for name, asset in GEO_ENDPOINTS.items():
+        if only and name not in only:
+            continue
+        yield f"/api/{name}", name, "geojson", asset, None
+        for bucket in simplify.ZOOM_BUCKETS:
+            yield f"/api/{name}?zoom={bucket}", f"{name}.z{bucket}", "geojson", asset, bucket
+
+
+def _files_digest(paths) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()[:32]
+
+
+def render_table(db: Session, model, schema) -> bytes:
+    # Same serialization as the API's table endpoints; ordered so equal data gives equal bytes
+    rows = db.execute(select(model).order_by(model.id)).scalars().all()
+    adapter = TypeAdapter(List[schema])
+    return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def write_payload(out_dir: str, stem: str, payload: PrecompressedPayload) -> dict:
+    """Writes the body and its compressed variants under a content-hashed name."""
+    base = f"{stem}.{payload.digest[:16]}.json"
+    files = {"identity": base, "gzip": base + ".gz"}
+    variants = [(base, payload.body), (base + ".gz", payload.gzip_body)]
+    if payload.br_body is not None:
+        files["br"] = base + ".br"
+        variants.append((base + ".br", payload.br_body))
+    for filename, data in variants:
+        path = os.path.join(out_dir, filename)
+        # Content-hashed, so an existing file already holds these bytes
+        if not os.path.exists(path):
+            _write_atomic(path, data)
+    return {"files": files, "etag": payload.etag, "bytes": len(payload.body), "gzip_bytes": len(payload.gzip_body)}
+
+
+def load_manifest(out_dir: str) -> dict:
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return manifest if manifest.get("format") == MANIFEST_FORMAT else {}
+
+
+def _referenced(manifest: dict) -> set:
+    return {f for entry in manifest.get("entries", {}).values() for f in entry["files"].values()}
+
+
+def _unchanged(entry: dict, source: dict, out_dir: str) -> bool:
+    return (
+        entry is not None
+        and entry.get("source") == source
+        and all(os.path.exists(os.path.join(out_dir, f)) for f in entry["files"].values())
+    )
+
+
+def export(out_dir: str = DEFAULT_OUT_DIR, force: bool = False, only=None) -> dict:
+    os.makedirs(out_dir, exist_ok=True)
+    previous = load_manifest(out_dir)
+    previous_entries = previous.get("entries", {})
+    entries = dict(previous_entries)
+    stats = {"written": [], "unchanged": []}
+
+    # One snapshot for every table: the versions read match the rows rendered
+    with database.engine.connect().execution_options(isolation_level="REPEATABLE READ") as conn:
+        versions = dict(conn.execute(text("SELECT table_name, version FROM table_versions")).all())
+        db = Session(bind=conn)
+        file_digests = {}
+        for path, stem, kind, source_object, bucket in targets(only):
+            if kind == "table":
+                model, schema = source_object
+                table = model.__tablename__
+                # A table without a version (triggers not installed) is always re-rendered
+                source = {"table": table, "version": versions.get(table)}
+                if source["version"] is not None and not force and _unchanged(previous_entries.get(path), source, out_dir):
+                    stats["unchanged"].append(path)
+                    continue
+                payload = PrecompressedPayload(render_table(db, model, schema))
+            else:
+                asset = source_object
+                if id(asset) not in file_digests:
+                    file_digests[id(asset)] = _files_digest(asset.paths)
+                source = {"files": file_digests[id(asset)]}
+                if not force and _unchanged(previous_entries.get(path), source, out_dir):
+                    stats["unchanged"].append(path)
+                    continue
+                payload = asset.payload_for(bucket)
+
+            entries[path] = {**write_payload(out_dir, stem, payload), "source": source}
+            stats["written"].append(path)
+        db.close()
+
+    if previous and not stats["written"]:
+        # Nothing to publish: the manifest (and its timestamp) stays as it is
+        stats["removed"] = []
+        return stats
+
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "zoom_buckets": list(simplify.ZOOM_BUCKETS),
+        "entries": entries,
+    }
+    _write_atomic(
+        os.path.join(out_dir, MANIFEST_NAME),
+        json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True).encode("utf-8"),
+    )
+
+    # Keep this generation and the previous one; anything older is garbage
+    keep = _referenced(manifest) | _referenced(previous)
+    stems = set(TABLE_ENDPOINTS) | set(GEO_ENDPOINTS)
+    removed = []
+    for filename in os.listdir(out_dir):
+        # Only files this exporter could have written
+        if filename not in keep and filename.split(".")[0] in stems and filename.endswith((".json", ".gz", ".br")):
+            os.remove(os.path.join(out_dir, filename))
+            removed.append(filename)
+    stats["removed"] = removed
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=DEFAULT_OUT_DIR, help="Output directory (default: public/snapshots)")
+    parser.add_argument("--force", action="store_true", help="Re-render every endpoint, changed or not")
+    parser.add_argument(
+        "--only", action="append", choices=sorted(list(TABLE_ENDPOINTS) + list(GEO_ENDPOINTS)),
+        help="Export just this endpoint (repeatable)"
+    )
+    args = parser.parse_args(argv)
+
+    print(json.dumps(export(args.out, force=args.force, only=args.only), indent=2))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder gives the same output, just slower
+    orjson = None
+
+# Response shapes of the opt-in fast path
+FAST_FORMATS = ("fast", "columnar")
+FORMAT_PATTERN = "^(json|fast|columnar)$"
+
+
+def _default(value):
+    # Dates and other non-JSON scalars, as Pydantic would render them
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, default=_default)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def encode_rows(columns, rows, shape: str = "fast") -> bytes:
+    """
+    Encodes plain column tuples without building a model per row.
+    'fast' gives the same list-of-objects shape as the regular endpoint;
+    'columnar' gives {"columns": [...], "rows": [[...], ...]}.
+    """
+    if shape == "columnar":
+        return dumps({"columns": list(columns), "rows": [tuple(r) for r in rows]})
+    return dumps([dict(zip(columns, r)) for r in rows])
@@ -0,0 +1,122 @@
+import json
+import os
+import threading
+
+import simplify
+from responses import PrecompressedPayload
+
+# Paths relative to backend directory
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "public", "data")
+EXISTING_GRID_PATH = os.path.join(DATA_DIR, "existingtransmissionlines.geojson")
+FUTURE_GRID_PATH = os.path.join(DATA_DIR, "futuretransmissionlines.geojson")
+SIBE_ZONES_PATH = os.path.join(DATA_DIR, "sibe_zones.geojson")
+
+
+def load_clean_geojson(file_path: str) -> dict:
+    if not os.path.exists(file_path):
+        return {"features": []}
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        text_data = f.read().strip()
+
+    # The World Bank currently has an export bug where it appends 'System.IO.MemoryStream' to the end of the JSON.
+    if text_data.endswith("System.IO.MemoryStream"):
+        text_data = text_data.replace("System.IO.MemoryStream", "").strip()
+
+    return json.loads(text_data)
+
+
+def parse_voltage_kv(legend):
+    """Extracts the voltage from a grid 'Legend' property such as "225 kV"."""
+    if not legend:
+        return None
+    digits = "".join(ch for ch in legend if ch.isdigit())
+    return int(digits) if digits else None
+
+
+def encode_json(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _mtime(file_path: str):
+    try:
+        return os.stat(file_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+class GeoJSONAsset:
+    """
+    A GeoJSON document assembled from one or more source files, built once
+    and rebuilt only when one of the source files' mtime changes.
+    Alongside the full-resolution payload, a simplified payload is
+    precomputed for every zoom bucket in simplify.ZOOM_BUCKETS.
+    """
+
+    def __init__(self, paths, builder):
+        self.paths = list(paths)
+        self.builder = builder
+        self._lock = threading.Lock()
+        self._mtimes = None
+        self._data = None
+        self._payloads = {}
+
+    def _current_mtimes(self):
+        return tuple(_mtime(p) for p in self.paths)
+
+    def _ensure_fresh(self):
+        mtimes = self._current_mtimes()
+        if mtimes == self._mtimes:
+            return
+        with self._lock:
+            if mtimes == self._mtimes:
+                return
+            data = self.builder(self.paths)
+            payloads = {None: PrecompressedPayload(encode_json(simplify.simplify_collection(data)))}
+            for bucket in simplify.ZOOM_BUCKETS:
+                payloads[bucket] = PrecompressedPayload(encode_json(simplify.simplify_collection(data, bucket)))
+            self._data = data
+            self._payloads = payloads
+            self._mtimes = mtimes
+
+    def load(self):
+        self._ensure_fresh()
+
+    @property
+    def data(self) -> dict:
+        self._ensure_fresh()
+        return self._data
+
+    @property
+    def payload(self) -> PrecompressedPayload:
+        return self.payload_for(None)
+
+    def payload_for(self, zoom=None) -> PrecompressedPayload:
+        self._ensure_fresh()
+        return self._payloads[simplify.zoom_bucket(zoom)]
+
+
+def _build_grid(paths) -> dict:
+    # Combine into one massive Feature Collection expected by react-simple-maps Geographies
+    features = []
+    for path in paths:
+        features.extend(load_clean_geojson(path).get("features", []))
+    return {
+        "type": "FeatureCollection",
+        "features": features
+    }
+
+
+def _build_single(paths) -> dict:
+    return load_clean_geojson(paths[0])
+
+
+grid_asset = GeoJSONAsset([EXISTING_GRID_PATH, FUTURE_GRID_PATH], _build_grid)
+sibe_asset = GeoJSONAsset([SIBE_ZONES_PATH], _build_single)
+
+
+def preload():
+    """Builds every static dataset up-front so the first request is not the one paying for it."""
+    grid_asset.load()
+    sibe_asset.load()
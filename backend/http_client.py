@@ -0,0 +1,130 @@
+import asyncio
+import os
+import time
+
+import httpx
+
+import metrics
+
+try:
+    import h2  # noqa: F401  (httpx only needs it to be importable for HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HOST_CONCURRENCY = int(os.getenv("UPSTREAM_HOST_CONCURRENCY", "16"))
+DEFAULT_TIMEOUT = 10.0
+
+_client = None
+_host_limits = {}
+
+
+def _build_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        timeout=DEFAULT_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        ),
+    )
+
+
+async def startup():
+    global _client
+    if _client is None:
+        _client = _build_client()
+
+
+async def shutdown():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+    # The semaphores belong to the closing event loop
+    _host_limits.clear()
+
+
+def get_client() -> httpx.AsyncClient:
+    """The process-wide pooled client; created on first use when running outside the app lifespan."""
+    global _client
+    if _client is None:
+        _client = _build_client()
+    return _client
+
+
+async def request(method: str, url: str, **kwargs) -> httpx.Response:
+    """Sends a request over the shared client, holding a per-host concurrency slot while it runs."""
+    host = httpx.URL(url).host
+    limit = _host_limits.get(host)
+    if limit is None:
+        limit = _host_limits.setdefault(host, asyncio.Semaphore(HOST_CONCURRENCY))
+    async with limit:
+        start = time.perf_counter()
+        outcome = "exception"
+        try:
+            response = await get_client().request(method, url, **kwargs)
+            outcome = "http_error" if response.status_code >= 400 else "ok"
+            return response
+        finally:
+            metrics.UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - start, host=host)
+            metrics.UPSTREAM_REQUESTS_TOTAL.inc(host=host, outcome=outcome)
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Stops calling an upstream after `failure_threshold` consecutive failures.
+    After `reset_timeout` seconds one half-open probe is let through: success
+    closes the circuit again, failure re-opens it for another `reset_timeout`.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at = None
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+
+        now = time.monotonic()
+        if self.state == self.OPEN:
+            if now - self._opened_at < self.reset_timeout:
+                metrics.CIRCUIT_REJECTIONS_TOTAL.inc(name=self.name)
+                return False
+            self.state = self.HALF_OPEN
+            self._probe_started_at = now
+            return True
+
+        # Half-open: a single probe at a time, unless the previous probe never reported back
+        if self._probe_started_at is None or now - self._probe_started_at >= self.reset_timeout:
+            self._probe_started_at = now
+            return True
+        metrics.CIRCUIT_REJECTIONS_TOTAL.inc(name=self.name)
+        return False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self._failures = 0
+        self._probe_started_at = None
+
+    def record_failure(self):
+        self._failures += 1
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._probe_started_at = None
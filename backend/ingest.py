@@ -0,0 +1,339 @@
+"""
+Bulk, idempotent, incremental ingestion of CSV / JSON / NDJSON / GeoJSON sources.
+
+Every record is content-hashed; only new or changed records are staged
+(PostgreSQL COPY, in batches) and merged with INSERT ... ON CONFLICT on the
+table's natural key. Each run is a single transaction per source, so readers
+never see a half-loaded table and nothing is ever dropped.
+
+    python ingest.py market_data data/seed/market_data.json
+    python ingest.py projects self_generation_sites.csv --prune
+    python ingest.py market_series turt_hourly.csv   # columns: series, ts, value
+    python ingest.py transmission_lines_planned futuretransmissionlines.geojson --prune
+"""
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import sys
+
+from sqlalchemy import text
+
+import database
+import geodata
+import models
+import timeseries
+
+KEY_SEPARATOR = "\x1f"
+DEFAULT_BATCH_SIZE = 10_000
+SEED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "seed")
+
+def _grid_lines(status: str):
+    """
+    World Bank grid features only carry a 'Legend' and the file tells the status, so the
+    columns are derived; lines have no id, so the key is a hash of the geometry.
+    """
+    def derive(record: dict) -> dict:
+        legend = record.get("Legend")
+        geometry = json.dumps(record.get("geometry"), sort_keys=True, separators=(",", ":"))
+        return {
+            "legend": legend,
+            "voltage_kv": geodata.parse_voltage_kv(legend),
+            "status": status,
+            "geom_key": hashlib.sha256(geometry.encode("utf-8")).hexdigest()[:32],
+        }
+    return derive
+
+
+# Ingestible sources: target model, natural key (backed by a unique index on the model)
+# and how the geometry, if any, is built from the record.
+SOURCES = {
+    "projects": {"model": models.Project, "key": ["name"], "geometry": "point"},
+    "market_data": {"model": models.MarketData, "key": ["year"]},
+    "reforms": {"model": models.ReformTracker, "key": ["reform_name"]},
+    "generation_mix": {"model": models.GenerationMix, "key": ["name", "type"]},
+    "kpis": {"model": models.TopLevelKPI, "key": ["label"]},
+    "historical_growth": {"model": models.HistoricalGrowth, "key": ["year"]},
+    "financials": {"model": models.FinancialData, "key": ["category"]},
+    "regulations": {"model": models.RegulatoryUpdate, "key": ["date", "title"]},
+    "protected_areas": {"model": models.ProtectedArea, "key": ["wdpa_id"], "geometry": "multipolygon"},
+    "market_series": {"model": models.MarketSeriesPoint, "key": ["series", "ts"]},
+    # One source per grid file, so --prune on one never touches the other's lines
+    "transmission_lines": {
+        "model": models.TransmissionLine, "key": ["status", "geom_key"],
+        "geometry": "multilinestring", "derive": _grid_lines("Existing"),
+    },
+    "transmission_lines_planned": {
+        "model": models.TransmissionLine, "key": ["status", "geom_key"],
+        "geometry": "multilinestring", "derive": _grid_lines("Planned"),
+    },
+}
+
+# Indexes superseded by an explicitly named one on the model, dropped wherever the model's
+# indexes are ensured. idx_projects_geom is geoalchemy2's automatic GiST index, now ix_projects_geom.
+SUPERSEDED_INDEXES = {"projects": ["idx_projects_geom"]}
+
+_GEOMETRY_SQL = {
+    "point": "ST_SetSRID(ST_GeomFromGeoJSON(geom_json), 4326)",
+    "multipolygon": "ST_Multi(ST_SetSRID(ST_GeomFromGeoJSON(geom_json), 4326))",
+    "multilinestring": "ST_Multi(ST_SetSRID(ST_GeomFromGeoJSON(geom_json), 4326))",
+}
+
+
+def _columns(source: dict):
+    return [c.name for c in source["model"].__table__.columns if c.name not in ("id", "geom")]
+
+
+def _quote(column: str) -> str:
+    # Some columns are mixed case (e.g. "amountBillionUSD")
+    return f'"{column}"'
+
+
+def _column_list(columns) -> str:
+    return ", ".join(_quote(c) for c in columns)
+
+
+def ensure_indexes(conn, table):
+    """Creates the indexes declared on `table` that are missing and drops the ones they replace."""
+    for index in table.indexes:
+        index.create(bind=conn, checkfirst=True)
+    for name in SUPERSEDED_INDEXES.get(table.name, []):
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+def read_records(path: str):
+    """Yields one dict per record; GeoJSON features become their properties plus 'geometry'."""
+    lower = path.lower()
+    if lower.endswith(".geojson"):
+        # Tolerates the trailing garbage of some World Bank exports
+        data = geodata.load_clean_geojson(path)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            if lower.endswith(".csv"):
+                yield from csv.DictReader(f)
+                return
+            if lower.endswith(".ndjson") or lower.endswith(".jsonl"):
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+                return
+            data = json.load(f)
+
+    if isinstance(data, dict) and data.get("type") == "FeatureCollection":
+        for feature in data.get("features", []):
+            record = dict(feature.get("properties") or {})
+            record["geometry"] = feature.get("geometry")
+            yield record
+    elif isinstance(data, dict):
+        yield from data.get("records", [])
+    else:
+        yield from data
+
+
+def _normalize(record: dict, columns, source: dict) -> dict:
+    if "derive" in source:
+        record = {**record, **source["derive"](record)}
+    values = {}
+    for column in columns:
+        value = record.get(column)
+        # CSV has no NULL: treat empty cells as missing
+        values[column] = None if value == "" else value
+
+    geometry = source.get("geometry")
+    if geometry is not None:
+        geom = record.get("geometry")
+        if geom is None and record.get("latitude") not in (None, "") and record.get("longitude") not in (None, ""):
+            geom = {"type": "Point", "coordinates": [float(record["longitude"]), float(record["latitude"])]}
+        values["geom_json"] = json.dumps(geom, separators=(",", ":")) if geom is not None else None
+    return values
+
+
+def record_key(values: dict, key) -> str:
+    return KEY_SEPARATOR.join(str(values[k]) for k in key)
+
+
+def content_hash(values: dict) -> str:
+    canonical = json.dumps(values, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _copy_rows(cursor, table: str, columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["\\N" if v is None else v for v in row])
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {table} ({_column_list(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+        buffer
+    )
+
+
+def _stage_keys(conn, cursor, stage: str, table: str, key, record_keys):
+    """
+    COPYs record keys into a temp table with the table's typed key columns, parsed from the same
+    strings the upsert staged, so joins on it match however the key type prints (timestamps, dates).
+    """
+    conn.execute(text(
+        f"CREATE TEMP TABLE {stage} ON COMMIT DROP AS "
+        f"SELECT {_column_list(key)} FROM {table} WITH NO DATA"
+    ))
+    conn.execute(text(f"ALTER TABLE {stage} ADD COLUMN record_key text"))
+    _copy_rows(cursor, stage, key + ["record_key"], [k.split(KEY_SEPARATOR) + [k] for k in record_keys])
+
+
+def _key_match(key, left: str = "t", right: str = "s") -> str:
+    return " AND ".join(f"{left}.{_quote(k)} = {right}.{_quote(k)}" for k in key)
+
+
+def ingest(name: str, path: str, batch_size: int = DEFAULT_BATCH_SIZE, prune: bool = False, dry_run: bool = False) -> dict:
+    """
+    Loads one source file; returns counts of inserted-or-updated, unchanged, skipped and pruned
+    records, and of stored hashes dropped because their row had been deleted outside the ingest.
+    """
+    source = SOURCES[name]
+    table = source["model"].__tablename__
+    key = source["key"]
+    columns = _columns(source)
+    stage_columns = columns + (["geom_json"] if source.get("geometry") else []) + ["record_key", "content_hash"]
+    stats = {"source": name, "changed": 0, "unchanged": 0, "skipped": 0, "pruned": 0, "orphaned": 0}
+
+    with database.engine.connect() as conn, conn.begin() as transaction:
+        ensure_indexes(conn, source["model"].__table__)
+
+        known = dict(conn.execute(
+            text("SELECT record_key, content_hash FROM ingest_record_hashes WHERE source = :source"),
+            {"source": name}
+        ).all())
+
+        cursor = conn.connection.cursor()
+        if known:
+            # Hashes whose row was deleted outside the ingest: forget them, so the record is
+            # inserted again instead of being skipped as unchanged (or failing to prune)
+            _stage_keys(conn, cursor, "ingest_known", table, key, known)
+            orphaned = [k for (k,) in conn.execute(text(
+                f"SELECT s.record_key FROM ingest_known s "
+                f"WHERE NOT EXISTS (SELECT 1 FROM {table} t WHERE {_key_match(key)})"
+            ))]
+            if orphaned:
+                conn.execute(text(
+                    "DELETE FROM ingest_record_hashes WHERE source = :source AND record_key = ANY(:keys)"
+                ), {"source": name, "keys": orphaned})
+                for k in orphaned:
+                    del known[k]
+                stats["orphaned"] = len(orphaned)
+
+        conn.execute(text(
+            f"CREATE TEMP TABLE ingest_stage ON COMMIT DROP AS "
+            f"SELECT {_column_list(columns)} FROM {table} WITH NO DATA"
+        ))
+        extra = ", ADD COLUMN geom_json text" if source.get("geometry") else ""
+        conn.execute(text(f"ALTER TABLE ingest_stage ADD COLUMN record_key text, ADD COLUMN content_hash text{extra}"))
+
+        seen = set()
+        batch = []
+        for record in read_records(path):
+            values = _normalize(record, columns, source)
+            if any(values[k] is None for k in key):
+                stats["skipped"] += 1
+                continue
+            rkey = record_key(values, key)
+            if rkey in seen:
+                # Duplicate natural key within the file: the first occurrence wins
+                stats["skipped"] += 1
+                continue
+            seen.add(rkey)
+
+            digest = content_hash(values)
+            if known.get(rkey) == digest:
+                stats["unchanged"] += 1
+                continue
+
+            values["record_key"] = rkey
+            values["content_hash"] = digest
+            batch.append([values[c] for c in stage_columns])
+            stats["changed"] += 1
+            if len(batch) >= batch_size:
+                _copy_rows(cursor, "ingest_stage", stage_columns, batch)
+                batch = []
+        if batch:
+            _copy_rows(cursor, "ingest_stage", stage_columns, batch)
+
+        if stats["changed"]:
+            target_columns = list(columns)
+            select_columns = [_quote(c) for c in columns]
+            if source.get("geometry"):
+                target_columns.append("geom")
+                select_columns.append(_GEOMETRY_SQL[source["geometry"]])
+            updates = [c for c in target_columns if c not in key]
+            conflict = (
+                "DO UPDATE SET " + ", ".join(f"{_quote(c)} = EXCLUDED.{_quote(c)}" for c in updates)
+                if updates else "DO NOTHING"
+            )
+            conn.execute(text(
+                f"INSERT INTO {table} ({_column_list(target_columns)}) "
+                f"SELECT {', '.join(select_columns)} FROM ingest_stage "
+                f"ON CONFLICT ({_column_list(key)}) {conflict}"
+            ))
+            conn.execute(text(
+                "INSERT INTO ingest_record_hashes (source, record_key, content_hash) "
+                "SELECT :source, record_key, content_hash FROM ingest_stage "
+                "ON CONFLICT (source, record_key) DO UPDATE SET content_hash = EXCLUDED.content_hash"
+            ), {"source": name})
+            if table == "market_series":
+                # Points past the yearly partitions landed in the default one: give them their year
+                timeseries.ensure_partitions(conn)
+
+        if prune:
+            stale = [k for k in known if k not in seen]
+            if stale:
+                # Every known key has a row (orphans were dropped above), so each stale key deletes one
+                pruned = conn.execute(text(
+                    f"DELETE FROM {table} t USING ingest_known s "
+                    f"WHERE {_key_match(key)} AND s.record_key = ANY(:keys)"
+                ), {"keys": stale}).rowcount
+                conn.execute(text(
+                    "DELETE FROM ingest_record_hashes WHERE source = :source AND record_key = ANY(:keys)"
+                ), {"source": name, "keys": stale})
+                stats["pruned"] = pruned
+
+        if dry_run:
+            transaction.rollback()
+
+    return stats
+
+
+def ingest_seed_data(batch_size: int = DEFAULT_BATCH_SIZE):
+    """Loads every bundled file in data/seed/ whose name matches a source."""
+    results = []
+    for name in SOURCES:
+        path = os.path.join(SEED_DIR, f"{name}.json")
+        if os.path.exists(path):
+            results.append(ingest(name, path, batch_size=batch_size))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", choices=sorted(SOURCES) + ["seed"], help="Target source, or 'seed' for the bundled data")
+    parser.add_argument("path", nargs="?", help="CSV, JSON, NDJSON or GeoJSON file")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--prune", action="store_true", help="Delete records previously ingested from this source but absent from the file")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change, then roll back")
+    args = parser.parse_args(argv)
+
+    if args.source == "seed":
+        results = ingest_seed_data(batch_size=args.batch_size)
+    elif not args.path:
+        parser.error("path is required")
+    else:
+        results = [ingest(args.source, args.path, batch_size=args.batch_size, prune=args.prune, dry_run=args.dry_run)]
+
+    for stats in results:
+        print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
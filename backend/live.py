@@ -0,0 +1,204 @@
+import asyncio
+import json
+import os
+
+from sqlalchemy import text
+
+import dashboard
+import database
+import metrics
+import versioning
+
+# Safety-net poll of table_versions, in case a NOTIFY is missed; much faster while LISTEN is
+# down, since the version-keyed caches (responses, tiles) are only as fresh as this poll then
+POLL_INTERVAL = float(os.getenv("STREAM_POLL_INTERVAL", "30"))
+FALLBACK_POLL_INTERVAL = float(os.getenv("STREAM_FALLBACK_POLL_INTERVAL", "2"))
+HEARTBEAT_INTERVAL = float(os.getenv("STREAM_HEARTBEAT_INTERVAL", "15"))
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Rows pushed for each watched table, in the same shape as its REST endpoint.
+# Small reference tables are re-read and diffed on every write; tables that can grow
+# to millions of rows (None) only announce their new version and clients refetch.
+STREAM_TABLES = {
+    "top_level_kpis": dashboard.SNAPSHOT_SECTIONS["kpis"],
+    "generation_mix": dashboard.SNAPSHOT_SECTIONS["generation_mix"],
+    "historical_growth": dashboard.SNAPSHOT_SECTIONS["historical_growth"],
+    "projects": None,
+    "market_data": dashboard.SNAPSHOT_SECTIONS["market_data"],
+    "reform_tracker": dashboard.SNAPSHOT_SECTIONS["reforms"],
+    "financial_data": (
+        'SELECT id, category, "amountBillionUSD", color, source, year, yoy_growth_pct '
+        "FROM financial_data ORDER BY id"
+    ),
+    "regulatory_updates": None,
+}
+
+
+def parse_tables(tables):
+    if not tables:
+        return set(STREAM_TABLES)
+    selected = {t.strip() for t in tables.split(",") if t.strip()}
+    unknown = selected - set(STREAM_TABLES)
+    if unknown:
+        raise ValueError(f"Unknown stream tables: {', '.join(sorted(unknown))}")
+    return selected
+
+
+def format_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _load_rows(db, table: str) -> dict:
+    sql = text(f"SELECT coalesce(json_agg(s), '[]'::json) FROM ({STREAM_TABLES[table]}) s")
+    raw = (await db.execute(sql)).scalar()
+    rows = json.loads(raw) if isinstance(raw, str) else raw
+    if table == "top_level_kpis":
+        for row in rows:
+            row["change"] = dashboard.LIVE_SYNC_LABEL
+    return {row["id"]: row for row in rows}
+
+
+class ChangeBroker:
+    """
+    Watches table_versions (woken by LISTEN/NOTIFY, with a slow poll as a fallback)
+    and fans the changed rows of each table (or, for the large ones, just its new
+    version) out to every connected stream.
+    The database is queried once per change, however many clients are connected.
+    """
+
+    def __init__(self):
+        self._subscribers = set()
+        self._versions = {}
+        self._rows = {}
+        self._wakeup = asyncio.Event()
+        self._listening = False
+        self._tasks = []
+
+    async def start(self):
+        self._tasks = [asyncio.create_task(self._run()), asyncio.create_task(self._listen())]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    @property
+    def versions(self) -> dict:
+        return {t: v for t, v in self._versions.items() if t in STREAM_TABLES}
+
+    def _publish(self, change: dict):
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(change)
+            except asyncio.QueueFull:
+                # A client that stopped reading is dropped: its stream ends, the browser
+                # reconnects, and the versions in the new 'hello' tell it what to refetch
+                self._subscribers.discard(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    async def _listen(self):
+        def notify(*_):
+            self._wakeup.set()
+
+        while True:
+            try:
+                async with database.async_engine.connect() as conn:
+                    raw = await conn.get_raw_connection()
+                    lost = asyncio.Event()
+                    raw.driver_connection.add_termination_listener(lambda *_: lost.set())
+                    await raw.driver_connection.add_listener(versioning.CHANGE_CHANNEL, notify)
+                    self._set_listening(True)
+                    # Anything written while we were not listening is picked up here
+                    self._wakeup.set()
+                    await lost.wait()
+                    raise ConnectionError("LISTEN connection closed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._set_listening(False)
+                self._wakeup.set()
+                print(f"Change stream LISTEN failed, polling every {FALLBACK_POLL_INTERVAL}s: {e}")
+                await asyncio.sleep(POLL_INTERVAL)
+
+    def _set_listening(self, listening: bool):
+        self._listening = listening
+        metrics.CHANGE_STREAM_LISTENING.set(1 if listening else 0)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), POLL_INTERVAL if self._listening else FALLBACK_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self._refresh()
+            except Exception as e:
+                print(f"Error refreshing change stream: {e}")
+
+    async def _refresh(self):
+        async with database.AsyncSessionLocal() as db:
+            versions = await versioning.fetch_versions(db)
+            for table, sql in STREAM_TABLES.items():
+                if table in self._versions and versions.get(table) == self._versions.get(table):
+                    continue
+                if sql is None:
+                    known = table in self._versions
+                    self._versions[table] = versions.get(table)
+                    if known:
+                        self._publish({"table": table, "version": versions.get(table), "refetch": True})
+                    continue
+                rows = await _load_rows(db, table)
+                previous = self._rows.get(table)
+                self._rows[table] = rows
+                self._versions[table] = versions.get(table)
+                if previous is None:
+                    continue  # First load is the baseline; clients fetch it over REST
+                upserted = [row for row_id, row in rows.items() if previous.get(row_id) != row]
+                deleted = [row_id for row_id in previous if row_id not in rows]
+                if upserted or deleted:
+                    self._publish({
+                        "table": table,
+                        "version": versions.get(table),
+                        "upserted": upserted,
+                        "deleted": deleted,
+                    })
+        versioning.tracker.update(versions)
+
+
+broker = ChangeBroker()
+
+
+async def event_stream(request, tables):
+    """
+    Server-Sent Events: a 'hello' with current versions, then one 'change' event per table write.
+    The 'hello' is sent on every (re)connect, so clients can refetch whatever moved meanwhile.
+    """
+    queue = broker.subscribe()
+    try:
+        yield format_event("hello", {"versions": {t: v for t, v in broker.versions.items() if t in tables}})
+        while True:
+            if await request.is_disconnected():
+                break
+            try:
+                change = await asyncio.wait_for(queue.get(), HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if change is None:
+                break
+            if change["table"] in tables:
+                yield format_event("change", change)
+    finally:
+        broker.unsubscribe(queue)
@@ -1,17 +1,65 @@
-from fastapi import FastAPI, Depends, HTTPException, Query
+from contextlib import asynccontextmanager
+import asyncio
+import datetime
+from fastapi import FastAPI, Depends, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select, literal
 import database
 import models
 import schemas
-from typing import List
-import httpx
+import geodata
+import responses
+import tiles
+import climate
+import http_client
+import water_stress
+import dashboard
+import fastjson
+import live
+import timeseries
+import constraints
+import regulations
+import streaming
+import screening
+import metrics
+import scrapers
+import montecarlo
+from response_cache import response_cache
+from pydantic import TypeAdapter
+from typing import List, Optional
 
 # Wait to create tables until DB is configured via Postgres.app
 # models.Base.metadata.create_all(bind=database.engine)
 
-app = FastAPI(title="Morocco Energy API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Parse and encode the static GeoJSON layers once, before serving traffic
+    try:
+        geodata.preload()
+    except Exception as e:
+        print(f"Error preloading static datasets: {e}")
+    # One pooled client for every external data source
+    await http_client.startup()
+    # Pushes table changes to /api/stream subscribers
+    await live.broker.start()
+    # Screening jobs whose process died (e.g. a restart) would otherwise stay "running" forever
+    try:
+        await asyncio.to_thread(screening.recover_interrupted_jobs)
+    except Exception as e:
+        print(f"Error recovering screening jobs: {e}")
+    # Keeps the KPI and financing tables fresh off the request path (or run `python scrapers.py` separately)
+    if scrapers.SCRAPERS_ENABLED:
+        await scrapers.scheduler.start()
+    yield
+    await scrapers.scheduler.stop()
+    await live.broker.stop()
+    await http_client.shutdown()
+    montecarlo.shutdown_pool()
+    await database.async_engine.dispose()
+
+app = FastAPI(title="Morocco Energy API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,16 +67,49 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-After-Id", "X-Next-Cursor"],
 )
+# Outermost, so the latency includes every other middleware
+app.add_middleware(metrics.MetricsMiddleware)
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Morocco Energy Dashboard API"}
 
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Prometheus scrape endpoint: request latency per route, DB time and pool usage, upstream calls, cache hit ratios."""
+    for engine_name, stats in database.pool_stats().items():
+        for state, value in stats.items():
+            metrics.DB_POOL_CONNECTIONS.set(value, engine=engine_name, state=state)
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+def _parse_bbox(bbox: str):
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be 'min_lon,min_lat,max_lon,max_lat'")
+    if min_lon > max_lon or min_lat > max_lat:
+        raise HTTPException(status_code=400, detail="bbox minimums must not exceed maximums")
+    return min_lon, min_lat, max_lon, max_lat
+
 @app.get("/api/projects", response_model=List[schemas.ProjectBase])
-def get_projects(db: Session = Depends(database.get_db)):
-    # Returns all projects with manually extracted coordinates from PostGIS
-    projects = db.query(
+async def get_projects(
+    request: Request,
+    response: Response,
+    bbox: Optional[str] = Query(None, description="Visible window as 'min_lon,min_lat,max_lon,max_lat'"),
+    type: Optional[str] = Query(None, description="Project type, e.g. Solar, Wind, Hydro"),
+    status: Optional[str] = Query(None, description="Project status, e.g. Operational"),
+    min_capacity_mw: Optional[float] = Query(None, ge=0),
+    after_id: Optional[int] = Query(None, description="Keyset cursor: only return projects with a greater id"),
+    limit: Optional[int] = Query(None, ge=1, le=5000),
+    format: str = Query("json", pattern=fastjson.FORMAT_PATTERN, description="'fast' or 'columnar' skip per-row model validation"),
+    stream: bool = Query(False, description="Stream NDJSON (also selected by Accept: application/x-ndjson)"),
+    db: AsyncSession = Depends(database.get_async_db)
+):
+    # Returns projects with manually extracted coordinates from PostGIS.
+    # Every filter is pushed down into SQL; bbox uses the GiST index on geom.
+    query = select(
         models.Project.id,
         models.Project.name,
         models.Project.type,
@@ -37,7 +118,41 @@ def get_projects(db: Session = Depends(database.get_db)):
         models.Project.status,
         func.ST_Y(models.Project.geom).label('latitude'),
         func.ST_X(models.Project.geom).label('longitude')
-    ).all()
+    )
+
+    if bbox is not None:
+        min_lon, min_lat, max_lon, max_lat = _parse_bbox(bbox)
+        envelope = func.ST_MakeEnvelope(min_lon, min_lat, max_lon, max_lat, 4326)
+        query = query.where(func.ST_Intersects(models.Project.geom, envelope))
+    if type is not None:
+        query = query.where(models.Project.type == type)
+    if status is not None:
+        query = query.where(models.Project.status == status)
+    if min_capacity_mw is not None:
+        query = query.where(models.Project.capacity_mw >= min_capacity_mw)
+    if after_id is not None:
+        query = query.where(models.Project.id > after_id)
+
+    query = query.order_by(models.Project.id)
+    if limit is not None:
+        query = query.limit(limit)
+    if streaming.wants_ndjson(request, stream):
+        # Rows leave as they are fetched; the end of the stream is the end of the page
+        return streaming.ndjson_response(query)
+    result = await db.execute(query)
+    projects = result.all()
+
+    # A full page means there may be more: hand back the cursor for the next one
+    headers = {}
+    if limit is not None and len(projects) == limit:
+        headers["X-Next-After-Id"] = str(projects[-1].id)
+
+    if format in fastjson.FAST_FORMATS:
+        # Plain tuples straight to JSON, no ProjectBase per row and no response_model re-validation
+        body = fastjson.encode_rows(list(result.keys()), projects, format)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    response.headers.update(headers)
     
     # Convert Row objects to dictionaries to match the Pydantic schema
     return [
@@ -53,98 +168,232 @@ def get_projects(db: Session = Depends(database.get_db)):
         ) for p in projects
     ]
 
+async def _serialize_table(db: AsyncSession, model, schema) -> bytes:
+    # Validated once per table version, then served from the response cache
+    rows = (await db.execute(select(model))).scalars().all()
+    adapter = TypeAdapter(List[schema])
+    return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+def _table_select(model, schema):
+    # The schema's fields as plain columns, for streaming without a model object per row
+    return select(*(model.__table__.c[name] for name in schema.model_fields)).order_by(model.id)
+
 @app.get("/api/market-data", response_model=List[schemas.MarketDataBase])
-def get_market_data(db: Session = Depends(database.get_db)):
-    market_data = db.query(models.MarketData).all()
-    return market_data
+async def get_market_data(
+    request: Request,
+    stream: bool = Query(False, description="Stream NDJSON (also selected by Accept: application/x-ndjson)"),
+    db: AsyncSession = Depends(database.get_async_db)
+):
+    if streaming.wants_ndjson(request, stream):
+        return streaming.ndjson_response(_table_select(models.MarketData, schemas.MarketDataBase))
+    return await response_cache.serve(
+        request, "market_data", "market_data",
+        lambda: _serialize_table(db, models.MarketData, schemas.MarketDataBase)
+    )
+
+@app.get("/api/market-series")
+async def get_market_series(
+    series: Optional[str] = Query(None, description="Comma-separated series, e.g. 'turt_price,turd_price' (default: all)"),
+    start: Optional[datetime.datetime] = Query(None, description="ISO 8601 start (default: first stored point)"),
+    end: Optional[datetime.datetime] = Query(None, description="ISO 8601 end, inclusive (default: last stored point)"),
+    resolution: str = Query("auto", pattern=timeseries.RESOLUTION_PATTERN),
+    points: int = Query(timeseries.DEFAULT_POINTS, ge=1, le=timeseries.MAX_POINTS, description="Target number of buckets for 'auto'; the cap for calendar resolutions"),
+    db: AsyncSession = Depends(database.get_async_db)
+):
+    """
+    Tariff, surplus price and LCOE time series, downsampled in SQL to avg/min/max/last per bucket.
+    With resolution=auto the bucket width is chosen so any range returns about `points` buckets;
+    a calendar resolution that would exceed `points` is coarsened (the response says which was used).
+    """
+    try:
+        selected = timeseries.parse_series(series)
+        data = await timeseries.fetch_series(db, selected, start, end, resolution, points)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=fastjson.dumps(data), media_type="application/json")
 
 @app.get("/api/reforms", response_model=List[schemas.ReformTrackerBase])
-def get_reforms(db: Session = Depends(database.get_db)):
-    reforms = db.query(models.ReformTracker).all()
-    return reforms
+async def get_reforms(request: Request, db: AsyncSession = Depends(database.get_async_db)):
+    return await response_cache.serve(
+        request, "reforms", "reform_tracker",
+        lambda: _serialize_table(db, models.ReformTracker, schemas.ReformTrackerBase)
+    )
 
 @app.get("/api/generation-mix", response_model=List[schemas.GenerationMixBase])
-def get_generation_mix(db: Session = Depends(database.get_db)):
-    mix = db.query(models.GenerationMix).all()
-    return mix
+async def get_generation_mix(request: Request, db: AsyncSession = Depends(database.get_async_db)):
+    return await response_cache.serve(
+        request, "generation_mix", "generation_mix",
+        lambda: _serialize_table(db, models.GenerationMix, schemas.GenerationMixBase)
+    )
 
 @app.get("/api/kpis", response_model=List[schemas.TopLevelKPIBase])
-def get_kpis(db: Session = Depends(database.get_db)):
-    kpis = db.query(models.TopLevelKPI).all()
-    return kpis
+async def get_kpis(request: Request, db: AsyncSession = Depends(database.get_async_db)):
+    return await response_cache.serve(
+        request, "kpis", "top_level_kpis",
+        lambda: _serialize_table(db, models.TopLevelKPI, schemas.TopLevelKPIBase)
+    )
 
 @app.get("/api/historical-growth", response_model=List[schemas.HistoricalGrowthBase])
-def get_historical_growth(db: Session = Depends(database.get_db)):
-    growth = db.query(models.HistoricalGrowth).all()
-    return growth
+async def get_historical_growth(request: Request, db: AsyncSession = Depends(database.get_async_db)):
+    return await response_cache.serve(
+        request, "historical_growth", "historical_growth",
+        lambda: _serialize_table(db, models.HistoricalGrowth, schemas.HistoricalGrowthBase)
+    )
 
 @app.get("/api/financials", response_model=List[schemas.FinancialDataBase])
-def get_financials(db: Session = Depends(database.get_db)):
-    financials = db.query(models.FinancialData).all()
-    return financials
+async def get_financials(request: Request, db: AsyncSession = Depends(database.get_async_db)):
+    return await response_cache.serve(
+        request, "financials", "financial_data",
+        lambda: _serialize_table(db, models.FinancialData, schemas.FinancialDataBase)
+    )
 
 @app.get("/api/regulations", response_model=List[schemas.RegulatoryUpdateBase])
-def get_regulations(db: Session = Depends(database.get_db)):
-    updates = db.query(models.RegulatoryUpdate).all()
-    return updates
+async def get_regulations(
+    request: Request,
+    stream: bool = Query(False, description="Stream NDJSON (also selected by Accept: application/x-ndjson)"),
+    db: AsyncSession = Depends(database.get_async_db)
+):
+    if streaming.wants_ndjson(request, stream):
+        return streaming.ndjson_response(_table_select(models.RegulatoryUpdate, schemas.RegulatoryUpdateBase))
+    return await response_cache.serve(
+        request, "regulations", "regulatory_updates",
+        lambda: _serialize_table(db, models.RegulatoryUpdate, schemas.RegulatoryUpdateBase)
+    )
+
+@app.get("/api/regulations/search")
+async def search_regulations(
+    q: Optional[str] = Query(None, max_length=200, description="Web-search syntax, French or English: 'tarif \"net metering\" -draft'"),
+    type: Optional[str] = Query(None, description="Comma-separated types, e.g. 'Law,Decree'"),
+    impact_level: Optional[str] = Query(None, description="Comma-separated impact levels, e.g. 'High,Medium'"),
+    date_from: Optional[datetime.date] = Query(None),
+    date_to: Optional[datetime.date] = Query(None),
+    order: Optional[str] = Query(None, pattern=regulations.ORDER_PATTERN, description="'relevance' (default with q) or 'date' (newest first)"),
+    after: Optional[str] = Query(None, description="Keyset cursor from the X-Next-Cursor header of the previous page"),
+    limit: int = Query(regulations.DEFAULT_LIMIT, ge=1, le=regulations.MAX_LIMIT),
+    include_description: bool = Query(True, description="false leaves out the full text (the headline excerpt is still sent with q)"),
+    format: str = Query("fast", pattern=fastjson.FORMAT_PATTERN, description="'columnar' for {columns, rows}"),
+    db: AsyncSession = Depends(database.get_async_db)
+):
+    """
+    Full-text search over the regulatory archive (GIN-indexed tsvector, French + English stemming),
+    with type / impact / date filters and keyset pagination. With q, rows carry their rank and a
+    highlighted headline.
+    """
+    try:
+        columns, rows, next_cursor = await regulations.search(
+            db, q,
+            types=regulations.parse_values(type),
+            impact_levels=regulations.parse_values(impact_level),
+            date_from=date_from,
+            date_to=date_to,
+            order=order,
+            after=after,
+            limit=limit,
+            include_description=include_description,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    body = fastjson.encode_rows(columns, rows, "columnar" if format == "columnar" else "fast")
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@app.get("/api/dashboard/snapshot")
+async def get_dashboard_snapshot(
+    sections: Optional[str] = Query(None, description="Comma-separated sections, e.g. 'kpis,projects' (default: all)"),
+    live: bool = Query(False, description="Stamp KPIs with the live-sync marker, like /api/kpis-live"),
+    db: AsyncSession = Depends(database.get_async_db)
+):
+    """
+    Everything the overview and market dashboards poll for, in one request and one DB round trip.
+    Sections: kpis, generation_mix, historical_growth, projects, market_data, reforms.
+    """
+    try:
+        selected = dashboard.parse_sections(sections)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await dashboard.fetch_snapshot(db, selected, live=live)
+
+@app.get("/api/stream")
+async def stream_changes(
+    request: Request,
+    tables: Optional[str] = Query(None, description="Comma-separated tables to watch, e.g. 'top_level_kpis,financial_data' (default: all)")
+):
+    """
+    Server-Sent Events channel for live sync. Writes to the watched tables are detected
+    through table version triggers (LISTEN/NOTIFY). The changed rows are pushed for the small
+    reference tables; projects and regulatory_updates only push their new version to refetch on.
+    """
+    try:
+        selected = live.parse_tables(tables)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(
+        live.event_stream(request, selected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.get("/api/grid-data")
-def get_grid_data():
+def get_grid_data(
+    request: Request,
+    zoom: Optional[int] = Query(None, ge=0, le=22, description="Map zoom level; geometries are simplified to match it")
+):
     """
     Proxy endpoint to assemble the High Voltage electricity network from local datasets.
     Combines the 'Existing' and 'Planned' transmission line datasets into a single FeatureCollection.
+    The merged collection is built once and re-used until a source file changes.
+    Without `zoom` the full-resolution lines are returned.
     """
-    import os
-    import json
-    from fastapi.responses import JSONResponse
-    
-    # Paths relative to backend directory
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    existing_path = os.path.join(base_dir, "public", "data", "existingtransmissionlines.geojson")
-    future_path = os.path.join(base_dir, "public", "data", "futuretransmissionlines.geojson")
-
-    def load_clean_geojson(file_path: str):
-        if not os.path.exists(file_path):
-            return {"features": []}
-            
-        with open(file_path, 'r', encoding='utf-8') as f:
-            text_data = f.read().strip()
-            
-        # The World Bank currently has an export bug where it appends 'System.IO.MemoryStream' to the end of the JSON. 
-        if text_data.endswith("System.IO.MemoryStream"):
-            text_data = text_data.replace("System.IO.MemoryStream", "").strip()
-            
-        return json.loads(text_data)
-
     try:
-        existing_data = load_clean_geojson(existing_path)
-        future_data = load_clean_geojson(future_path)
-        
-        # Combine into one massive Feature Collection expected by react-simple-maps Geographies
-        features = []
-        features.extend(existing_data.get("features", []))
-        features.extend(future_data.get("features", []))
-        
-        combined_geojson = {
-            "type": "FeatureCollection",
-            "features": features
-        }
-        
-        return JSONResponse(content=combined_geojson)
-
+        payload = geodata.grid_asset.payload_for(zoom)
     except Exception as e:
         print(f"Error proxying Grid Data: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch local grid data: {str(e)}")
 
+    return responses.serve_payload(request, payload)
+
+
+
+@app.get("/tiles/{layer}/{z}/{x}/{y}.mvt")
+async def get_tile(layer: str, z: int, x: int, y: int, db: AsyncSession = Depends(database.get_async_db)):
+    """
+    Mapbox Vector Tile for one of the spatial layers (grid, sibe, projects), rendered by PostGIS.
+    Tiles are kept in a bounded LRU cache, and low zoom levels are also persisted on disk.
+    """
+    if layer not in tiles.TILE_LAYERS:
+        raise HTTPException(status_code=404, detail=f"Unknown tile layer: {layer}")
+    if not tiles.is_valid_tile(z, x, y):
+        raise HTTPException(status_code=400, detail=f"Invalid tile coordinates: {z}/{x}/{y}")
+
+    tile = await tiles.render_tile(db, layer, z, x, y)
+    if not tile:
+        return Response(status_code=204)
+    return Response(content=tile, media_type=tiles.MVT_MEDIA_TYPE, headers={"Cache-Control": "public, max-age=3600"})
 
 
 @app.get("/api/kpis-live", response_model=List[schemas.TopLevelKPIBase])
-def get_kpis_live(db: Session = Depends(database.get_db)):
+async def get_kpis_live(
+    format: str = Query("json", pattern=fastjson.FORMAT_PATTERN, description="'fast' or 'columnar' skip per-row model validation"),
+    db: AsyncSession = Depends(database.get_async_db)
+):
     """
     Live Sync endpoint: reads real KPI data from the database (same as /api/kpis)
     but overrides the `change` field to indicate live synchronization status.
+    The table is kept current by the background scrapers (scrapers.py), never on this path.
     """
-    kpis = db.query(models.TopLevelKPI).all()
+    if format in fastjson.FAST_FORMATS:
+        columns = ["id", "label", "value", "subtext", "trend", "change"]
+        rows = (await db.execute(select(
+            models.TopLevelKPI.id,
+            models.TopLevelKPI.label,
+            models.TopLevelKPI.value,
+            models.TopLevelKPI.subtext,
+            models.TopLevelKPI.trend,
+            literal(dashboard.LIVE_SYNC_LABEL)
+        ))).all()
+        return Response(content=fastjson.encode_rows(columns, rows, format), media_type="application/json")
+
+    kpis = (await db.execute(select(models.TopLevelKPI))).scalars().all()
     result = []
     for kpi in kpis:
         result.append(schemas.TopLevelKPIBase(
@@ -153,7 +402,7 @@ def get_kpis_live(db: Session = Depends(database.get_db)):
             value=kpi.value,
             subtext=kpi.subtext,
             trend=kpi.trend,
-            change="⟳ Live — Synced"
+            change=dashboard.LIVE_SYNC_LABEL
         ))
     return result
 
@@ -166,76 +415,50 @@ async def get_climate_data(
     """
     Acts as a proxy connecting to the NASA POWER external API.
     Used for the Global Solar Atlas implementation to render Solar GHI, DNI, and Wind Speed on the frontend map.
+    Lookups are cached per NASA POWER grid cell (memory + disk) and coalesced.
     """
-    url = f"https://power.larc.nasa.gov/api/temporal/climatology/point?parameters=ALLSKY_SFC_SW_DWN,ALLSKY_SFC_SW_DNI,WS50M&community=RE&longitude={lon}&latitude={lat}&format=JSON"
-    
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, timeout=10.0)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Extract Annual Averages (ANN) from the NASA POWER response geometry
-            parameters = data.get("properties", {}).get("parameter", {})
-            ghi_annual = parameters.get("ALLSKY_SFC_SW_DWN", {}).get("ANN", "N/A")
-            dni_annual = parameters.get("ALLSKY_SFC_SW_DNI", {}).get("ANN", "N/A")
-            wind_annual = parameters.get("WS50M", {}).get("ANN", "N/A")
-            
-            # Format Monthly Evolution Array
-            months = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
-            monthly_evolution = []
-            for m in months:
-                monthly_evolution.append({
-                    "month": m,
-                    "GHI": parameters.get("ALLSKY_SFC_SW_DWN", {}).get(m, 0),
-                    "DNI": parameters.get("ALLSKY_SFC_SW_DNI", {}).get(m, 0),
-                    "Wind": parameters.get("WS50M", {}).get(m, 0)
-                })
-            
-            return {
-                "latitude": lat,
-                "longitude": lon,
-                "GHI": ghi_annual,
-                "DNI": dni_annual,
-                "Wind_Speed_50m": wind_annual,
-                "monthly_evolution": monthly_evolution,
-                "units": {
-                    "GHI": "kWh/m^2/day",
-                    "DNI": "kWh/m^2/day",
-                    "Wind_Speed_50m": "m/s"
-                },
-                "source": "NASA Prediction Of Worldwide Energy Resources"
-            }
+        climatology = await climate.get_climatology(lat, lon)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch climate data from NASA POWER: {str(e)}")
 
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        **climatology,
+        "units": {
+            "GHI": "kWh/m^2/day",
+            "DNI": "kWh/m^2/day",
+            "Wind_Speed_50m": "m/s"
+        },
+        "source": "NASA Prediction Of Worldwide Energy Resources"
+    }
+
 
 # ---------------------------------------------------------------------------
 # Environmental Constraints Endpoints
 # ---------------------------------------------------------------------------
 
-import json
 import os
 import math
 
+# 1000 x 1000 cells
+MAX_RASTER_CELLS = 1_000_000
+
 @app.get("/api/sibe-zones")
-def get_sibe_zones():
+def get_sibe_zones(
+    request: Request,
+    zoom: Optional[int] = Query(None, ge=0, le=22, description="Map zoom level; geometries are simplified to match it")
+):
     """
     Returns GeoJSON of Morocco's main protected areas (SIBE / National Parks).
     Data sourced from UNEP-WCMC Protected Planet / HCEFLCD.
     The file is served from public/data/sibe_zones.geojson.
     """
-    # Resolve path relative to this file (backend/) → ../public/data/
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    geojson_path = os.path.join(base_dir, "..", "public", "data", "sibe_zones.geojson")
-
-    if not os.path.exists(geojson_path):
+    if not os.path.exists(geodata.SIBE_ZONES_PATH):
         raise HTTPException(status_code=404, detail="SIBE GeoJSON file not found")
 
-    with open(geojson_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    return data
+    return responses.serve_payload(request, geodata.sibe_asset.payload_for(zoom))
 
 
 @app.get("/api/water-stress")
@@ -245,73 +468,172 @@ async def get_water_stress(lat: float = Query(...), lon: float = Query(...)):
     Falls back to an estimated score based on Morocco's regional hydrological data
     if the external API is unavailable.
 
+    While Aqueduct's circuit breaker is open the fallback is returned immediately.
+
     Score interpretation (BWS — Baseline Water Stress):
       0-1 : Low   | 1-2 : Low-Medium | 2-3 : Medium-High
       3-4 : High  | 4-5 : Extremely High
     """
-    # --- Try WRI Aqueduct 4.0 public API ---
-    aqueduct_url = "https://aqueduct40.rdc.io/api/v1/analysis"
-    payload = {
-        "geom": {"type": "Point", "coordinates": [lon, lat]},
-        "indicators": ["bws"],
-        "year": "2030",
-        "scenario": "business_as_usual"
-    }
-
-    try:
-        async with httpx.AsyncClient(timeout=8.0) as client:
-            resp = await client.post(aqueduct_url, json=payload)
-            if resp.status_code == 200:
-                data = resp.json()
-                bws = data.get("data", [{}])[0].get("bws_raw", None)
-                if bws is not None:
-                    return {
-                        "lat": lat, "lon": lon,
-                        "bws_score": round(bws, 2),
-                        "bws_label": _bws_label(bws),
-                        "source": "WRI Aqueduct 4.0 — Business as Usual 2030"
-                    }
-    except Exception:
-        pass  # Fall through to regional fallback
-
-    # --- Regional fallback based on Morocco's hydrology ---
-    # Morocco has significant north-south gradient:
-    # North (>35°N) — Low stress | Coastal — Medium | South (<30°N) — High/Extreme
-    # East of Oued Draa (<28°N) — Extremely High
-    bws_estimated = _estimate_morocco_bws(lat, lon)
-    return {
-        "lat": lat, "lon": lon,
-        "bws_score": bws_estimated,
-        "bws_label": _bws_label(bws_estimated),
-        "source": "Regional estimate — ONEE / National Water Plan Morocco (fallback)"
-    }
+    results = await water_stress.score_points([(lat, lon)])
+    return results[0]
 
 
-def _bws_label(score: float) -> str:
-    if score < 1.0:   return "Low"
-    if score < 2.0:   return "Low-Medium"
-    if score < 3.0:   return "Medium-High"
-    if score < 4.0:   return "High"
-    return "Extremely High"
+@app.get("/api/water-stress/raster")
+def get_water_stress_raster(
+    bbox: str = Query("-17.1,20.8,-1.0,35.9", description="Area as 'min_lon,min_lat,max_lon,max_lat' (defaults to Morocco)"),
+    resolution: float = Query(0.1, gt=0, description="Cell size in degrees")
+):
+    """
+    Regional water-stress estimate over a bbox, for rendering a country-wide heatmap.
+    The estimate only varies with latitude, so `row_scores` / `row_classes` hold one value per
+    row (north to south), each repeated across the `width` columns; `row_classes` index into `labels`.
+    """
+    min_lon, min_lat, max_lon, max_lat = _parse_bbox(bbox)
+    width = math.ceil((max_lon - min_lon) / resolution)
+    height = math.ceil((max_lat - min_lat) / resolution)
+    if width * height > MAX_RASTER_CELLS:
+        raise HTTPException(status_code=400, detail=f"Raster too large ({width}x{height}); increase resolution")
+
+    scores, classes, width = water_stress.estimate_raster(min_lon, min_lat, max_lon, max_lat, resolution)
+    return Response(content=fastjson.dumps({
+        "bbox": [min_lon, min_lat, max_lon, max_lat],
+        "resolution": resolution,
+        "width": width,
+        "height": len(scores),
+        "row_scores": scores.tolist(),
+        "row_classes": classes.tolist(),
+        "labels": water_stress.BWS_LABELS.tolist(),
+        "source": water_stress.FALLBACK_SOURCE
+    }), media_type="application/json")
+
+
+@app.post("/api/water-stress/batch")
+async def get_water_stress_batch(request: schemas.WaterStressBatchRequest):
+    """
+    Scores many points in one round trip (e.g. every project when the water-stress layer is toggled).
+    Upstream Aqueduct calls share one client and run with bounded concurrency;
+    each point is served from cache or falls back to the regional estimate independently.
+    Results are returned in the same order as the submitted points.
+    """
+    results = await water_stress.score_points([(p.lat, p.lon) for p in request.points])
+    for point, result in zip(request.points, results):
+        if point.id is not None:
+            result["id"] = point.id
+    return {"results": results}
+
+
+@app.get("/api/projects/constraints")
+async def get_project_constraints(
+    buffer_km: float = Query(constraints.DEFAULT_BUFFER_KM, ge=0, description="SIBE proximity threshold"),
+    include_planned: bool = Query(False, description="Also measure distance to planned transmission lines"),
+    db: AsyncSession = Depends(database.get_async_db)
+):
+    """
+    For every project: distance to the nearest transmission line per voltage class and the
+    nearest SIBE / protected area (intersecting, or within buffer_km). Computed in PostGIS with
+    KNN over the GiST indexes; the distances are cached until projects, lines or zones change.
+    """
+    results = await constraints.screen_projects(db, buffer_km, include_planned)
+    return Response(content=fastjson.dumps({"buffer_km": buffer_km, "results": results}), media_type="application/json")
 
 
-def _estimate_morocco_bws(lat: float, lon: float) -> float:
+@app.post("/api/constraints")
+async def screen_constraints(request: schemas.ConstraintsRequest, db: AsyncSession = Depends(database.get_async_db)):
     """
-    Regional heuristic for Morocco's baseline water stress:
-    Based on national water scarcity data (Plan National de l'Eau 2020-2050).
+    Same analysis as /api/projects/constraints for arbitrary candidate sites (up to 10k per request),
+    returned in the order submitted.
     """
-    # Extremely arid south (Sahara, Anti-Atlas far south)
-    if lat < 28.5:
-        return round(4.2 + (28.5 - lat) * 0.08, 2)
-    # Arid south-central (Draa, Souss, Tafilalet)
-    if lat < 30.5:
-        return round(3.5 + (30.5 - lat) * 0.1, 2)
-    # Semi-arid central (Marrakech, Beni Mellal region)
-    if lat < 32.5:
-        return round(2.8 - (lat - 30.5) * 0.15, 2)
-    # Sub-humid north-central (Fès, Meknès)
-    if lat < 34.0:
-        return round(1.8 - (lat - 32.5) * 0.2, 2)
-    # Humid/sub-humid north (Tanger, Al Hoceima, Rif)
-    return round(max(0.5, 1.2 - (lat - 34.0) * 0.4), 2)
+    results = await constraints.screen_points(
+        db, [(p.lat, p.lon) for p in request.points], request.buffer_km, request.include_planned
+    )
+    for point, result in zip(request.points, results):
+        result["id"] = point.id
+    return {"buffer_km": request.buffer_km, "results": results}
+
 
+@app.post("/api/screening/jobs", response_model=schemas.ScreeningJobBase, status_code=202)
+async def create_screening_job(request: schemas.ScreeningJobRequest, db: AsyncSession = Depends(database.get_async_db)):
+    """
+    Starts a site-suitability screening of every cell in the bbox: NASA POWER climatology,
+    water stress, grid distance and SIBE exclusion, scored in parallel worker processes.
+    Poll the returned job for progress.
+    """
+    bbox = _parse_bbox(request.bbox)
+    try:
+        job_id = await asyncio.to_thread(screening.create_job, bbox, request.resolution, request.buffer_km)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    screening.start_job(job_id)
+    return await db.get(models.ScreeningJob, job_id)
+
+
+@app.get("/api/screening/jobs/{job_id}", response_model=schemas.ScreeningJobBase)
+async def get_screening_job(job_id: int, db: AsyncSession = Depends(database.get_async_db)):
+    job = await db.get(models.ScreeningJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Screening job not found")
+    return job
+
+
+@app.get("/api/screening/jobs/{job_id}/results")
+async def get_screening_results(
+    job_id: int,
+    min_score: Optional[float] = Query(None, ge=0, le=100),
+    include_excluded: bool = Query(True),
+    after_cell: Optional[int] = Query(None, description="Keyset cursor: only return cells with a greater index"),
+    limit: int = Query(10000, ge=1, le=100000),
+    format: str = Query("columnar", pattern=fastjson.FORMAT_PATTERN),
+    db: AsyncSession = Depends(database.get_async_db)
+):
+    """Scored cells of a job (available while it runs), in row-major cell order."""
+    result_model = models.ScreeningResult
+    query = select(
+        result_model.cell,
+        result_model.latitude,
+        result_model.longitude,
+        result_model.ghi,
+        result_model.dni,
+        result_model.wind_speed_50m,
+        result_model.bws_score,
+        result_model.grid_km,
+        result_model.sibe_name,
+        result_model.excluded,
+        result_model.score
+    ).where(result_model.job_id == job_id)
+
+    if min_score is not None:
+        query = query.where(result_model.score >= min_score)
+    if not include_excluded:
+        query = query.where(result_model.excluded.is_(False))
+    if after_cell is not None:
+        query = query.where(result_model.cell > after_cell)
+    result = await db.execute(query.order_by(result_model.cell).limit(limit))
+    rows = result.all()
+
+    headers = {}
+    if len(rows) == limit:
+        headers["X-Next-After-Id"] = str(rows[-1].cell)
+    body = fastjson.encode_rows(list(result.keys()), rows, "columnar" if format == "columnar" else "fast")
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@app.post("/api/analytics/monte-carlo")
+async def monte_carlo(request: schemas.MonteCarloRequest, db: AsyncSession = Depends(database.get_async_db)):
+    """
+    Monte Carlo LCOE (MAD/kWh), NPV (MAD/kW) and IRR distributions for a solar or wind project.
+    Parameters left out are seeded from the market data and financing tables; identical
+    requests (same parameters, draws and seed) are answered from cache.
+    """
+    overrides = {
+        name: getattr(request, name).model_dump(exclude_none=True)
+        for name in montecarlo.PARAMETERS
+        if getattr(request, name) is not None
+    }
+    try:
+        result = await montecarlo.simulate(
+            db, request.technology, overrides, request.draws, request.seed,
+            request.lifetime_years, request.degradation_pct
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=fastjson.dumps(result), media_type="application/json")
@@ -0,0 +1,232 @@
+"""
+In-process metrics in the Prometheus text exposition format, served at /metrics.
+
+Counters, gauges and histograms with labels; no client library needed.
+Values are per process: with several workers, scrape each one (or sum them).
+"""
+import contextvars
+import math
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_registry = []
+
+
+def _format_labels(names, values, extra=None) -> str:
+    pairs = list(zip(names, values)) + list(extra or [])
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+        _registry.append(self)
+
+    def _key(self, labels: dict):
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            items = [(key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items()]
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = _format_labels(self.labels, key, [("le", _format_value(bound))])
+                yield f"{self.name}_bucket{le} {cumulative}"
+            labels = _format_labels(self.labels, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+def render() -> str:
+    _update_cache_ratios()
+    lines = []
+    for metric in list(_registry):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Application metrics
+# ---------------------------------------------------------------------------
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Request latency by route template", ["method", "route", "status"]
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds", "Time per SQL statement", ["route"]
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "SQL statements executed per request", ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+DB_TIME_PER_REQUEST_SECONDS = Histogram(
+    "db_time_per_request_seconds", "Total SQL time per request", ["route"]
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", ["engine"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections", "Pool size and connections by state", ["engine", "state"]
+)
+UPSTREAM_REQUEST_SECONDS = Histogram(
+    "upstream_request_duration_seconds", "External API latency", ["host"]
+)
+UPSTREAM_REQUESTS_TOTAL = Counter(
+    "upstream_requests_total", "External API calls by outcome (ok, http_error, exception)", ["host", "outcome"]
+)
+CIRCUIT_REJECTIONS_TOTAL = Counter(
+    "circuit_breaker_rejections_total", "Calls refused while a circuit breaker was open", ["name"]
+)
+WATER_STRESS_FALLBACK_TOTAL = Counter(
+    "water_stress_fallback_total", "Points answered with the regional estimate instead of Aqueduct"
+)
+SCRAPER_RUNS_TOTAL = Counter(
+    "scraper_runs_total", "Scraper runs by outcome (changed, unchanged, not_modified, error)", ["source", "outcome"]
+)
+SCRAPER_ROWS_WRITTEN_TOTAL = Counter(
+    "scraper_rows_written_total", "Rows inserted or updated by the scrapers", ["source"]
+)
+CHANGE_STREAM_LISTENING = Gauge(
+    "change_stream_listening", "1 while LISTEN on table changes is up; 0 while versions are only polled"
+)
+CACHE_REQUESTS_TOTAL = Counter(
+    "cache_requests_total", "Cache lookups by result (hit, miss)", ["cache", "result"]
+)
+CACHE_HIT_RATIO = Gauge(
+    "cache_hit_ratio", "Hits / lookups since process start", ["cache"]
+)
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS_TOTAL.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def _update_cache_ratios():
+    caches = {key[0] for key in list(CACHE_REQUESTS_TOTAL._values)}
+    for cache in caches:
+        hits = CACHE_REQUESTS_TOTAL.value(cache=cache, result="hit")
+        misses = CACHE_REQUESTS_TOTAL.value(cache=cache, result="miss")
+        if hits + misses:
+            CACHE_HIT_RATIO.set(hits / (hits + misses), cache=cache)
+
+
+# Per-request SQL accounting: [statement count, seconds, ASGI scope], filled in by the engine listeners in database.py
+_request_db = contextvars.ContextVar("request_db", default=None)
+
+
+def _route_of(scope) -> str:
+    return getattr(scope.get("route"), "path", "unmatched")
+
+
+def record_query(seconds: float):
+    stats = _request_db.get()
+    route = "background"
+    if stats is not None:
+        stats[0] += 1
+        stats[1] += seconds
+        route = _route_of(stats[2])
+    DB_QUERY_SECONDS.observe(seconds, route=route)
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request, labelled by route template rather than raw path."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        # The router stores the matched route in the scope, so it is read back lazily
+        stats = [0, 0.0, scope]
+        token = _request_db.set(stats)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            route = _route_of(scope)
+            HTTP_REQUEST_SECONDS.observe(elapsed, method=scope["method"], route=route, status=status["code"])
+            DB_QUERIES_PER_REQUEST.observe(stats[0], route=route)
+            DB_TIME_PER_REQUEST_SECONDS.observe(stats[1], route=route)
+            _request_db.reset(token)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date, Boolean, JSON
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Date, DateTime, Boolean, JSON, Index, func
 from geoalchemy2 import Geometry
 from database import Base
 
@@ -13,7 +13,17 @@ class Project(Base):
     status = Column(String) # Operational, Under Construction, Planned
     
     # PostGIS Geometry column for exact coordinates (Point)
-    geom = Column(Geometry(geometry_type='POINT', srid=4326))
+    geom = Column(Geometry(geometry_type='POINT', srid=4326, spatial_index=False))
+
+    __table_args__ = (
+        # GiST index backing the bbox filter and the vector tiles
+        Index("ix_projects_geom", "geom", postgresql_using="gist"),
+        # Map filters combine type and status; capacity is the usual range filter after them
+        Index("ix_projects_type_status_capacity", "type", "status", "capacity_mw"),
+        Index("ix_projects_status_capacity", "status", "capacity_mw"),
+        # Natural key used by ingest.py upserts
+        Index("ux_projects_name", "name", unique=True),
+    )
 
 class RegulatoryUpdate(Base):
     __tablename__ = "regulatory_updates"
@@ -25,6 +35,12 @@ class RegulatoryUpdate(Base):
     description = Column(String)
     impact_level = Column(String) # High, Medium, Low
 
+    # Full-text search_vector column and its GIN index: see regulations.ensure_search_column
+    __table_args__ = (
+        Index("ux_regulatory_updates_date_title", "date", "title", unique=True),
+        Index("ix_regulatory_updates_date_id", "date", "id"),  # Keyset pages, newest first
+    )
+
 class MarketData(Base):
     __tablename__ = "market_data"
 
@@ -51,6 +67,8 @@ class MarketData(Base):
     wind_lcoe = Column(Float)
     fossil_lcoe = Column(Float)
 
+    __table_args__ = (Index("ux_market_data_year", "year", unique=True),)
+
 class ReformTracker(Base):
     __tablename__ = "reform_tracker"
     
@@ -60,6 +78,8 @@ class ReformTracker(Base):
     status = Column(String) # Planned, In Progress, Complete
     completion_percentage = Column(Integer)
 
+    __table_args__ = (Index("ux_reform_tracker_reform_name", "reform_name", unique=True),)
+
 class GenerationMix(Base):
     __tablename__ = "generation_mix"
     id = Column(Integer, primary_key=True, index=True)
@@ -68,6 +88,8 @@ class GenerationMix(Base):
     color = Column(String)
     type = Column(String) # 'current' or 'target'
 
+    __table_args__ = (Index("ux_generation_mix_name_type", "name", "type", unique=True),)
+
 class TopLevelKPI(Base):
     __tablename__ = "top_level_kpis"
     id = Column(Integer, primary_key=True, index=True)
@@ -76,6 +98,8 @@ class TopLevelKPI(Base):
     subtext = Column(String)
     trend = Column(String) # 'up', 'down', 'neutral'
 
+    __table_args__ = (Index("ux_top_level_kpis_label", "label", unique=True),)
+
 class HistoricalGrowth(Base):
     __tablename__ = "historical_growth"
     id = Column(Integer, primary_key=True, index=True)
@@ -83,6 +107,8 @@ class HistoricalGrowth(Base):
     renewables = Column(Float)
     fossil = Column(Float)
 
+    __table_args__ = (Index("ux_historical_growth_year", "year", unique=True),)
+
 class FinancialData(Base):
     __tablename__ = "financial_data"
     id = Column(Integer, primary_key=True, index=True)
@@ -92,3 +118,101 @@ class FinancialData(Base):
     source = Column(String, nullable=True)       # Official source citation
     year = Column(Integer, nullable=True)        # Reference year for the data
     yoy_growth_pct = Column(Float, nullable=True) # Year-over-year growth %
+
+    __table_args__ = (Index("ux_financial_data_category", "category", unique=True),)
+
+class TransmissionLine(Base):
+    __tablename__ = "transmission_lines"
+    id = Column(Integer, primary_key=True, index=True)
+    legend = Column(String)                       # e.g. "225 kV", as published by the World Bank dataset
+    voltage_kv = Column(Integer, index=True)
+    status = Column(String, index=True)           # 'Existing' or 'Planned'
+    geom_key = Column(String)                     # Hash of the source geometry; lines have no id of their own
+
+    geom = Column(Geometry(geometry_type='MULTILINESTRING', srid=4326))
+
+    # Natural key used by ingest.py upserts
+    __table_args__ = (Index("ux_transmission_lines_status_geom_key", "status", "geom_key", unique=True),)
+
+class ProtectedArea(Base):
+    __tablename__ = "protected_areas"
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String)
+    category = Column(String)                     # National Park, SIBE, ...
+    area_km2 = Column(Float, nullable=True)
+    status = Column(String, nullable=True)
+    wdpa_id = Column(String, nullable=True)
+
+    geom = Column(Geometry(geometry_type='MULTIPOLYGON', srid=4326))
+
+    __table_args__ = (Index("ux_protected_areas_wdpa_id", "wdpa_id", unique=True),)
+
+class MarketSeriesPoint(Base):
+    # Hourly/daily tariff, surplus price and LCOE series; range-partitioned by year on ts (see timeseries.py)
+    __tablename__ = "market_series"
+    series = Column(String, primary_key=True)     # e.g. 'turt_price', 'solar_lcoe'
+    ts = Column(DateTime(timezone=True), primary_key=True)
+    value = Column(Float, nullable=False)
+
+    __table_args__ = (
+        # Range scans over time across several series
+        Index("ix_market_series_ts_series", "ts", "series"),
+        {"postgresql_partition_by": "RANGE (ts)"},
+    )
+
+class ScreeningJob(Base):
+    # A site-suitability run over a bbox grid (see screening.py); progress is done_cells / total_cells
+    __tablename__ = "screening_jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String, nullable=False, default="queued")   # queued, running, done, failed
+    min_lon = Column(Float, nullable=False)
+    min_lat = Column(Float, nullable=False)
+    max_lon = Column(Float, nullable=False)
+    max_lat = Column(Float, nullable=False)
+    resolution = Column(Float, nullable=False)                   # Cell size in degrees
+    buffer_km = Column(Float, nullable=False)                    # SIBE exclusion distance
+    total_cells = Column(Integer, nullable=False, default=0)
+    done_cells = Column(Integer, nullable=False, default=0)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+class ScreeningResult(Base):
+    __tablename__ = "screening_results"
+    job_id = Column(Integer, primary_key=True)
+    cell = Column(Integer, primary_key=True)                     # Row-major index, north to south
+    latitude = Column(Float)
+    longitude = Column(Float)
+    ghi = Column(Float, nullable=True)                           # kWh/m^2/day
+    dni = Column(Float, nullable=True)                           # kWh/m^2/day
+    wind_speed_50m = Column(Float, nullable=True)                # m/s
+    bws_score = Column(Float)
+    grid_km = Column(Float, nullable=True)
+    sibe_name = Column(String, nullable=True)
+    excluded = Column(Boolean)
+    score = Column(Float, nullable=True)                         # 0-100, 0 when excluded
+
+class TableVersion(Base):
+    # Bumped by the trigger installed in versioning.py on every write to a watched table
+    __tablename__ = "table_versions"
+    table_name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class IngestRecordHash(Base):
+    # Content hash of every record ingest.py has loaded, so re-runs only write what changed
+    __tablename__ = "ingest_record_hashes"
+    source = Column(String, primary_key=True)
+    record_key = Column(String, primary_key=True)
+    content_hash = Column(String, nullable=False)
+
+class ScraperState(Base):
+    # Conditional-request validators and the last payload hash per scraped source (see scrapers.py)
+    __tablename__ = "scraper_state"
+    source = Column(String, primary_key=True)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    content_hash = Column(String, nullable=True)
+    checked_at = Column(DateTime(timezone=True), nullable=True)
+    changed_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(String, nullable=True)
@@ -0,0 +1,406 @@
+"""
+Monte Carlo LCOE / NPV / IRR simulation per technology.
+
+Every draw samples capex, opex, WACC, capacity factor and tariff from their
+distributions, then prices one kW of capacity over its lifetime with closed
+forms (annuity and degraded-annuity factors), so a draw costs a handful of
+vectorized array operations and no per-year loop. IRR is found by vectorized
+Newton iteration on the same closed form.
+
+Defaults are seeded from the database: the capex mode is calibrated so the
+modal draw reproduces the LCOE in market_data, the tariff is the industrial
+tariff net of the TURT/TURD wheeling charges (a private PPA under Law 13-09 /
+82-21), and NPV is scaled to the technology's investment in financial_data.
+
+Draws are split into chunks with independent, reproducible random streams
+(SeedSequence.spawn), so results depend on the seed only, not on the number of
+worker processes. Results are memoized by a hash of the resolved parameters.
+
+All money is in MAD per kW of capacity; energy in kWh.
+"""
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sqlalchemy import select
+
+import models
+from cache import RequestCoalescer, TTLCache
+
+HOURS_PER_YEAR = 8760
+DEFAULT_DRAWS = 100_000
+MAX_DRAWS = 2_000_000
+CHUNK_DRAWS = int(os.getenv("MONTE_CARLO_CHUNK_DRAWS", "125000"))
+WORKERS = int(os.getenv("MONTE_CARLO_WORKERS", str(os.cpu_count() or 1)))
+PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+# IRR is searched in this bracket; draws without a sign change in it have no IRR
+IRR_BRACKET = (-0.99, 1.0)
+IRR_ITERATIONS = 30
+IRR_BISECTIONS = 50
+
+PARAMETERS = ("capex", "opex", "wacc", "capacity_factor", "tariff")
+DISTRIBUTIONS = {
+    "fixed": ("value",),
+    "uniform": ("low", "high"),
+    "triangular": ("low", "mode", "high"),
+    "normal": ("mean", "std"),
+}
+
+# Technology assumptions; capex and tariff defaults come from the database
+TECHNOLOGIES = {
+    "solar": {
+        "lcoe_column": "solar_lcoe",
+        "financial_category": "Solar Power",
+        "capacity_factor": {"dist": "triangular", "low": 0.19, "mode": 0.22, "high": 0.25},
+        "opex_share": (0.010, 0.015, 0.025),  # Fixed O&M per year, as a share of capex (low, mode, high)
+        "lifetime_years": 25,
+        "degradation_pct": 0.5,
+    },
+    "wind": {
+        "lcoe_column": "wind_lcoe",
+        "financial_category": "Wind Power",
+        "capacity_factor": {"dist": "triangular", "low": 0.32, "mode": 0.38, "high": 0.45},
+        "opex_share": (0.020, 0.025, 0.035),
+        "lifetime_years": 25,
+        "degradation_pct": 0.3,
+    },
+}
+DEFAULT_WACC = {"dist": "triangular", "low": 0.06, "mode": 0.075, "high": 0.10}
+# Spread of the capex and tariff defaults around their seeded modes
+CAPEX_SPREAD = (0.85, 1.25)
+TARIFF_SPREAD = (0.80, 1.05)
+
+RESULT_CACHE_TTL = float(os.getenv("MONTE_CARLO_CACHE_TTL", str(24 * 3600)))
+result_cache = TTLCache(256, RESULT_CACHE_TTL, name="monte_carlo")
+_coalescer = RequestCoalescer()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def validate_distribution(name: str, spec: dict) -> dict:
+    """Keeps only the fields of the distribution's kind; raises ValueError when one is missing or inconsistent."""
+    kind = spec.get("dist")
+    if kind not in DISTRIBUTIONS:
+        raise ValueError(f"{name}: unknown distribution {kind!r} (expected one of {', '.join(DISTRIBUTIONS)})")
+    missing = [f for f in DISTRIBUTIONS[kind] if spec.get(f) is None]
+    if missing:
+        raise ValueError(f"{name}: a {kind} distribution needs {', '.join(missing)}")
+    clean = {"dist": kind, **{f: float(spec[f]) for f in DISTRIBUTIONS[kind]}}
+    if kind == "uniform" and not clean["low"] < clean["high"]:
+        raise ValueError(f"{name}: low must be below high")
+    if kind == "triangular" and not (clean["low"] <= clean["mode"] <= clean["high"] and clean["low"] < clean["high"]):
+        raise ValueError(f"{name}: expected low <= mode <= high, with low < high")
+    if kind == "normal":
+        if clean["std"] < 0:
+            raise ValueError(f"{name}: std must not be negative")
+        # Optional truncation, e.g. to keep capacity factors inside [0, 1]
+        for bound in ("min", "max"):
+            if spec.get(bound) is not None:
+                clean[bound] = float(spec[bound])
+    return clean
+
+
+def sample(spec: dict, n: int, rng: np.random.Generator) -> np.ndarray:
+    kind = spec["dist"]
+    if kind == "fixed":
+        return np.full(n, spec["value"])
+    if kind == "uniform":
+        return rng.uniform(spec["low"], spec["high"], n)
+    if kind == "triangular":
+        return rng.triangular(spec["low"], spec["mode"], spec["high"], n)
+    values = rng.normal(spec["mean"], spec["std"], n)
+    if "min" in spec or "max" in spec:
+        values = np.clip(values, spec.get("min"), spec.get("max"))
+    return values
+
+
+def _mode(spec: dict) -> float:
+    return {
+        "fixed": lambda s: s["value"],
+        "uniform": lambda s: (s["low"] + s["high"]) / 2,
+        "triangular": lambda s: s["mode"],
+        "normal": lambda s: s["mean"],
+    }[spec["dist"]](spec)
+
+
+def annuity_factor(rate, years: int):
+    """sum_{t=1..T} (1 + r)^-t."""
+    rate = np.asarray(rate, dtype=float)
+    small = np.abs(rate) < 1e-9
+    safe = np.where(small, 1.0, rate)
+    return np.where(small, float(years), (1.0 - (1.0 + safe) ** -years) / safe)
+
+
+def degraded_annuity_factor(rate, years: int, degradation: float):
+    """sum_{t=1..T} (1 - g)^(t-1) (1 + r)^-t: discounted output of one first-year kWh."""
+    q = (1.0 - degradation) / (1.0 + np.asarray(rate, dtype=float))
+    near_one = np.abs(1.0 - q) < 1e-12
+    safe = np.where(near_one, 0.5, q)
+    return np.where(near_one, float(years), safe * (1.0 - safe ** years) / (1.0 - safe)) / (1.0 - degradation)
+
+
+def _geometric_sums(y, years: int):
+    """sum_{t=1..T} y^t and its derivative sum_{t=1..T} t y^(t-1), both in closed form (y != 1)."""
+    y_t = y ** years
+    one_minus = 1.0 - y
+    total = y * (1.0 - y_t) / one_minus
+    derivative = (1.0 - (years + 1) * y_t + years * y_t * y) / (one_minus * one_minus)
+    return total, derivative
+
+
+def _npv_at(rate, capex, revenue, opex, years: int, keep: float):
+    x = 1.0 / (1.0 + rate)
+    return -capex + revenue / keep * _geometric_sums(keep * x, years)[0] - opex * _geometric_sums(x, years)[0]
+
+
+def _irr(capex, revenue, opex, years: int, degradation: float):
+    """
+    Vectorized Newton iteration on NPV(r) = 0, where the first-year revenue
+    decays by `degradation` a year and opex is flat. With positive yearly cash
+    flows NPV is convex in r and Newton converges in a few steps; the rare
+    draws it leaves unconverged (late cash flows turning negative) are
+    bisected instead. Draws without a root inside IRR_BRACKET get NaN.
+    """
+    keep = 1.0 - degradation
+    # Perpetuity yield as the first guess (nudged off r = 0, where the closed forms are singular)
+    rate = np.clip((revenue - opex) / capex, IRR_BRACKET[0], IRR_BRACKET[1]) + 1e-7
+    for _ in range(IRR_ITERATIONS):
+        x = 1.0 / (1.0 + rate)
+        annuity, d_annuity = _geometric_sums(x, years)
+        degraded, d_degraded = _geometric_sums(keep * x, years)
+        npv = -capex + revenue / keep * degraded - opex * annuity
+        # d NPV / dr = d NPV / dx * dx / dr, with dx / dr = -x^2
+        slope = -(revenue * d_degraded - opex * d_annuity) * x * x
+        step = npv / slope
+        rate = np.clip(rate - step, IRR_BRACKET[0], IRR_BRACKET[1])
+        if np.nanmax(np.abs(step)) < 1e-10:
+            break
+    residual = _npv_at(rate, capex, revenue, opex, years, keep)
+    converged = np.isfinite(rate) & (np.abs(residual) <= 1e-6 * capex)
+    converged &= (rate > IRR_BRACKET[0]) & (rate < IRR_BRACKET[1])
+
+    rest = np.flatnonzero(~converged)
+    if rest.size:
+        c, r, o = capex[rest], revenue[rest], opex[rest]
+        lo = np.full(rest.size, IRR_BRACKET[0])
+        hi = np.full(rest.size, IRR_BRACKET[1])
+        bracketed = (_npv_at(lo, c, r, o, years, keep) > 0) & (_npv_at(hi, c, r, o, years, keep) < 0)
+        for _ in range(IRR_BISECTIONS):
+            mid = 0.5 * (lo + hi)
+            above = _npv_at(mid, c, r, o, years, keep) > 0
+            lo = np.where(above, mid, lo)
+            hi = np.where(above, hi, mid)
+        rate[rest] = np.where(bracketed, 0.5 * (lo + hi), np.nan)
+    return rate
+
+
+def simulate_chunk(params: dict, draws: int, seed: np.random.SeedSequence) -> dict:
+    """Prices `draws` scenarios of one kW; the arrays are float32 to halve what travels back from the workers."""
+    rng = np.random.default_rng(seed)
+    capex = sample(params["capex"], draws, rng)
+    opex = sample(params["opex"], draws, rng)
+    wacc = sample(params["wacc"], draws, rng)
+    capacity_factor = np.clip(sample(params["capacity_factor"], draws, rng), 1e-6, 1.0)
+    tariff = sample(params["tariff"], draws, rng)
+    years = params["lifetime_years"]
+    degradation = params["degradation_pct"] / 100
+
+    first_year_kwh = capacity_factor * HOURS_PER_YEAR
+    annuity = annuity_factor(wacc, years)
+    discounted_kwh = first_year_kwh * degraded_annuity_factor(wacc, years, degradation)
+
+    lcoe = (capex + opex * annuity) / discounted_kwh
+    npv = -capex + tariff * discounted_kwh - opex * annuity
+    irr = _irr(capex, tariff * first_year_kwh, opex, years, degradation)
+    return {
+        "lcoe": lcoe.astype(np.float32),
+        "npv": npv.astype(np.float32),
+        "npv_per_capex": (npv / capex).astype(np.float32),
+        "irr": irr.astype(np.float32),
+    }
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    # Long-lived, so requests do not pay for starting interpreters and importing NumPy
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def summarize(values: np.ndarray) -> dict:
+    finite = values[np.isfinite(values)].astype(np.float64)
+    summary = {"defined_share": round(finite.size / values.size, 6) if values.size else 0.0}
+    if finite.size == 0:
+        return {**summary, "mean": None, "std": None, "percentiles": None}
+    percentiles = np.percentile(finite, PERCENTILES)
+    return {
+        **summary,
+        "mean": float(finite.mean()),
+        "std": float(finite.std()),
+        "percentiles": {f"p{p}": float(v) for p, v in zip(PERCENTILES, percentiles)},
+    }
+
+
+def run_simulation(params: dict, draws: int, seed: int, workers: int = WORKERS, chunk_draws: int = CHUNK_DRAWS) -> dict:
+    """Runs every chunk (in the process pool when there is more than one) and summarizes the draws. Blocking."""
+    start = time.perf_counter()
+    sizes = [min(chunk_draws, draws - i) for i in range(0, draws, chunk_draws)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if len(sizes) == 1 or workers <= 1:
+        chunks = [simulate_chunk(params, n, s) for n, s in zip(sizes, seeds)]
+    else:
+        chunks = list(_get_pool(workers).map(simulate_chunk, [params] * len(sizes), sizes, seeds))
+    draws_by_metric = {name: np.concatenate([c[name] for c in chunks]) for name in chunks[0]}
+
+    lcoe = draws_by_metric["lcoe"]
+    npv = draws_by_metric["npv"]
+    result = {
+        "draws": draws,
+        "seed": seed,
+        "lcoe_mad_per_kwh": summarize(lcoe),
+        "npv_mad_per_kw": summarize(npv),
+        "irr": summarize(draws_by_metric["irr"]),
+        "probabilities": {"npv_positive": float(np.mean(npv > 0))},
+    }
+    if params.get("fossil_lcoe") is not None:
+        result["probabilities"]["lcoe_below_fossil"] = float(np.mean(lcoe < params["fossil_lcoe"]))
+    if params.get("investment_usd_bn") is not None:
+        # NPV of the whole programme: the same return on every dirham of its capex
+        result["portfolio"] = {
+            "category": params["financial_category"],
+            "investment_usd_bn": params["investment_usd_bn"],
+            "npv_usd_bn": summarize(draws_by_metric["npv_per_capex"] * np.float32(params["investment_usd_bn"])),
+        }
+    result["elapsed_seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+async def load_baseline(db, technology: str) -> dict:
+    """Latest market_data row and the technology's investment line from financial_data."""
+    config = TECHNOLOGIES[technology]
+    market = (await db.execute(
+        select(models.MarketData).order_by(models.MarketData.year.desc()).limit(1)
+    )).scalars().first()
+    investment = (await db.execute(
+        select(models.FinancialData.amountBillionUSD)
+        .where(models.FinancialData.category == config["financial_category"])
+    )).scalar()
+    if market is None:
+        return {"investment_usd_bn": investment}
+    return {
+        "year": market.year,
+        "lcoe": getattr(market, config["lcoe_column"]),
+        "fossil_lcoe": market.fossil_lcoe,
+        "industrial_price": market.industrial_price,
+        "turt_price": market.turt_price,
+        "turd_price": market.turd_price,
+        "investment_usd_bn": investment,
+    }
+
+
+def resolve_parameters(technology: str, baseline: dict, overrides: dict, lifetime_years: int = None, degradation_pct: float = None) -> dict:
+    """
+    The full, explicit parameter set of a run: request overrides where given,
+    database-seeded defaults elsewhere. Raises ValueError when a default cannot be seeded.
+    """
+    if technology not in TECHNOLOGIES:
+        raise ValueError(f"Unknown technology {technology!r} (expected one of {', '.join(TECHNOLOGIES)})")
+    config = TECHNOLOGIES[technology]
+    params = {
+        "technology": technology,
+        "lifetime_years": int(lifetime_years or config["lifetime_years"]),
+        "degradation_pct": float(config["degradation_pct"] if degradation_pct is None else degradation_pct),
+        "financial_category": config["financial_category"],
+        "investment_usd_bn": baseline.get("investment_usd_bn"),
+        "fossil_lcoe": baseline.get("fossil_lcoe"),
+        "market_year": baseline.get("year"),
+    }
+    for name in PARAMETERS:
+        if overrides.get(name) is not None:
+            params[name] = validate_distribution(name, overrides[name])
+    params.setdefault("wacc", dict(DEFAULT_WACC))
+    params.setdefault("capacity_factor", dict(config["capacity_factor"]))
+
+    share_low, share_mode, share_high = config["opex_share"]
+    if "capex" not in params:
+        if baseline.get("lcoe") is None:
+            raise ValueError("No market_data LCOE to seed the capex from: pass a capex distribution")
+        # Capex at which the modal draw's LCOE equals the published one:
+        # lcoe = (capex + share * capex * A) / (kWh * D)  =>  capex = lcoe * kWh * D / (1 + share * A)
+        years, degradation = params["lifetime_years"], params["degradation_pct"] / 100
+        wacc = _mode(params["wacc"])
+        if "opex" in params:
+            opex_mode = _mode(params["opex"])
+            capex_mode = (
+                baseline["lcoe"] * _mode(params["capacity_factor"]) * HOURS_PER_YEAR
+                * float(degraded_annuity_factor(wacc, years, degradation))
+                - opex_mode * float(annuity_factor(wacc, years))
+            )
+        else:
+            capex_mode = (
+                baseline["lcoe"] * _mode(params["capacity_factor"]) * HOURS_PER_YEAR
+                * float(degraded_annuity_factor(wacc, years, degradation))
+                / (1 + share_mode * float(annuity_factor(wacc, years)))
+            )
+        if capex_mode <= 0:
+            raise ValueError("The seeded LCOE does not cover the given opex: pass a capex distribution")
+        low, high = CAPEX_SPREAD
+        params["capex"] = {"dist": "triangular", "low": capex_mode * low, "mode": capex_mode, "high": capex_mode * high}
+    if "opex" not in params:
+        capex_mode = _mode(params["capex"])
+        params["opex"] = {
+            "dist": "triangular", "low": capex_mode * share_low, "mode": capex_mode * share_mode, "high": capex_mode * share_high,
+        }
+    if "tariff" not in params:
+        if baseline.get("industrial_price") is None:
+            raise ValueError("No market_data tariffs to seed the tariff from: pass a tariff distribution")
+        # What a private producer nets selling to an industrial offtaker over the grid
+        net = baseline["industrial_price"] - (baseline.get("turt_price") or 0) - (baseline.get("turd_price") or 0)
+        low, high = TARIFF_SPREAD
+        params["tariff"] = {"dist": "triangular", "low": net * low, "mode": net, "high": net * high}
+    return params
+
+
+def parameter_hash(params: dict, draws: int, seed: int) -> str:
+    canonical = json.dumps({"params": params, "draws": draws, "seed": seed}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+async def simulate(db, technology: str, overrides: dict, draws: int = DEFAULT_DRAWS, seed: int = 0,
+                   lifetime_years: int = None, degradation_pct: float = None) -> dict:
+    """Seeds, runs (off the event loop) and memoizes one scenario; identical concurrent requests share a run."""
+    if not 1 <= draws <= MAX_DRAWS:
+        raise ValueError(f"draws must be between 1 and {MAX_DRAWS}")
+    baseline = await load_baseline(db, technology) if technology in TECHNOLOGIES else {}
+    params = resolve_parameters(technology, baseline, overrides, lifetime_years, degradation_pct)
+    key = parameter_hash(params, draws, seed)
+
+    cached = result_cache.get(key)
+    if cached is not None:
+        return cached
+
+    async def run():
+        result = await asyncio.to_thread(run_simulation, params, draws, seed)
+        result = {"parameter_hash": key, "technology": technology, "parameters": params, **result}
+        result_cache.set(key, result)
+        return result
+
+    return await _coalescer.run(key, run)
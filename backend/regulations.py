@@ -0,0 +1,143 @@
+import datetime
+
+from sqlalchemy import bindparam, text
+
+# Titles and descriptions mix French and English, so both stemmers index every
+# document (titles weighted above descriptions) and a query matches in either language.
+SEARCH_CONFIGS = ("french", "english")
+SEARCH_VECTOR_SQL = " || ".join(
+    f"setweight(to_tsvector('{config}', coalesce({column}, '')), '{weight}')"
+    for column, weight in (("title", "A"), ("description", "B"))
+    for config in SEARCH_CONFIGS
+)
+SEARCH_QUERY_SQL = " || ".join(f"websearch_to_tsquery('{config}', :q)" for config in SEARCH_CONFIGS)
+HEADLINE_OPTIONS = "MaxFragments=2, MaxWords=30, MinWords=10, StartSel=<mark>, StopSel=</mark>"
+
+ORDERS = ("date", "relevance")
+ORDER_PATTERN = "^(" + "|".join(ORDERS) + ")$"
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+def ensure_search_column(conn):
+    """
+    Adds the generated tsvector column and its GIN index to regulatory_updates.
+    Safe to re-run; must run after the table exists.
+    """
+    conn.execute(text(
+        "ALTER TABLE regulatory_updates ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_regulatory_updates_search "
+        "ON regulatory_updates USING gin (search_vector)"
+    ))
+
+
+def parse_values(values):
+    """Comma-separated filter values; None or empty means no filter."""
+    if not values:
+        return None
+    selected = [v.strip() for v in values.split(",") if v.strip()]
+    return selected or None
+
+
+def encode_cursor(order: str, row) -> str:
+    if order == "relevance":
+        return f"{row.rank!r},{row.date.isoformat()},{row.id}"
+    return f"{row.date.isoformat()},{row.id}"
+
+
+def decode_cursor(order: str, cursor: str) -> dict:
+    try:
+        parts = cursor.split(",")
+        if order == "relevance":
+            rank, day, row_id = parts
+            return {"after_rank": float(rank), "after_date": datetime.date.fromisoformat(day), "after_id": int(row_id)}
+        day, row_id = parts
+        return {"after_date": datetime.date.fromisoformat(day), "after_id": int(row_id)}
+    except ValueError:
+        raise ValueError(f"Invalid cursor for order={order}: {cursor!r}")
+
+
+async def search(
+    db,
+    q: str = None,
+    types=None,
+    impact_levels=None,
+    date_from: datetime.date = None,
+    date_to: datetime.date = None,
+    order: str = None,
+    after: str = None,
+    limit: int = DEFAULT_LIMIT,
+    include_description: bool = True,
+):
+    """
+    Regulatory updates matching the text query and filters, newest first or by
+    relevance (ts_rank_cd), one keyset page at a time.
+    Returns (columns, rows, next_cursor); next_cursor is None on the last page.
+    """
+    q = (q or "").strip() or None
+    order = order or ("relevance" if q else "date")
+    if order == "relevance" and q is None:
+        raise ValueError("order=relevance needs a search query (q)")
+
+    params = {"limit": limit}
+    where = ["r.date IS NOT NULL"]
+    if q is not None:
+        where.append("r.search_vector @@ query.tsq")
+        params["q"] = q
+    if types:
+        where.append("r.type IN :types")
+        params["types"] = types
+    if impact_levels:
+        where.append("r.impact_level IN :impact_levels")
+        params["impact_levels"] = impact_levels
+    if date_from is not None:
+        where.append("r.date >= :date_from")
+        params["date_from"] = date_from
+    if date_to is not None:
+        where.append("r.date <= :date_to")
+        params["date_to"] = date_to
+
+    rank_sql = "NULL::real"
+    from_sql = "regulatory_updates r"
+    if q is not None:
+        rank_sql = "ts_rank_cd(r.search_vector, query.tsq)"
+        from_sql += f", (SELECT {SEARCH_QUERY_SQL} AS tsq) query"
+
+    page_where = ""
+    if after:
+        params.update(decode_cursor(order, after))
+        if order == "relevance":
+            page_where = "WHERE (m.rank, m.date, m.id) < (CAST(:after_rank AS real), :after_date, :after_id)"
+        else:
+            page_where = "WHERE (m.date, m.id) < (:after_date, :after_id)"
+    order_sql = "rank DESC, date DESC, id DESC" if order == "relevance" else "date DESC, id DESC"
+
+    columns = ["id", "date", "type", "title"]
+    if include_description:
+        columns.append("description")
+    columns.append("impact_level")
+    outer = list(columns)
+    if q is not None:
+        columns += ["rank", "headline"]
+        # Headlines are costly, so they are only built for the rows of the page
+        outer += ["rank", f"ts_headline('french', description, {SEARCH_QUERY_SQL}, '{HEADLINE_OPTIONS}') AS headline"]
+
+    sql = text(
+        f"SELECT {', '.join(outer)} FROM ("
+        f"  SELECT m.* FROM ("
+        f"    SELECT r.id, r.date, r.type, r.title, r.description, r.impact_level, {rank_sql} AS rank"
+        f"    FROM {from_sql} WHERE {' AND '.join(where)}"
+        f"  ) m {page_where} ORDER BY {order_sql} LIMIT :limit"
+        f") page ORDER BY {order_sql}"
+    )
+    if types:
+        sql = sql.bindparams(bindparam("types", expanding=True))
+    if impact_levels:
+        sql = sql.bindparams(bindparam("impact_levels", expanding=True))
+
+    rows = (await db.execute(sql, params)).all()
+    next_cursor = encode_cursor(order, rows[-1]) if len(rows) == limit else None
+    return columns, rows, next_cursor
@@ -0,0 +1,43 @@
+from typing import Awaitable, Callable
+
+from fastapi import Request
+from fastapi.responses import Response
+
+import metrics
+import responses
+import versioning
+from cache import RequestCoalescer
+
+
+class VersionedResponseCache:
+    """
+    Pre-serialized, pre-compressed response bodies for endpoints that read a
+    single table, each stored against the table version it was built from.
+    A write to the table bumps its version (see versioning.py), so the next
+    request rebuilds; every other request is a dictionary lookup and a copy.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._coalescer = RequestCoalescer()
+
+    async def serve(self, request: Request, key: str, table: str, build: Callable[[], Awaitable[bytes]]) -> Response:
+        version = versioning.tracker.get(table)
+        entry = self._entries.get((table, key))
+        if version is not None and entry is not None and entry[0] == version:
+            metrics.record_cache("response", True)
+            return responses.serve_payload(request, entry[1])
+        metrics.record_cache("response", False)
+
+        async def rebuild():
+            payload = responses.PrecompressedPayload(await build())
+            if version is not None:
+                self._entries[(table, key)] = (version, payload)
+            return payload
+
+        # Concurrent misses for the same version share one rebuild
+        payload = await self._coalescer.run((table, key, version), rebuild)
+        return responses.serve_payload(request, payload)
+
+
+response_cache = VersionedResponseCache()
@@ -0,0 +1,81 @@
+import gzip
+import hashlib
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+
+class PrecompressedPayload:
+    """
+    A response body encoded once and kept in memory together with its
+    compressed variants and a strong ETag, so serving it is only a copy.
+    """
+
+    def __init__(self, body: bytes, media_type: str = "application/json"):
+        self.body = body
+        self.media_type = media_type
+        self.digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etag = '"' + self.digest + '"'
+        self.gzip_body = gzip.compress(body, compresslevel=9)
+        self.br_body = brotli.compress(body) if brotli is not None else None
+
+    def etag_for(self, coding: str = None) -> str:
+        # Each encoded representation gets its own strong validator
+        if coding is None:
+            return self.etag
+        return '"' + self.digest + "-" + coding + '"'
+
+
+def _etag_matches(if_none_match: str, payload: PrecompressedPayload) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    known = {payload.etag, payload.etag_for("gzip"), payload.etag_for("br")}
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in known:
+            return True
+    return False
+
+
+def _accepts(accept_encoding: str, coding: str) -> bool:
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() != coding:
+            continue
+        # Honour an explicit "q=0" refusal
+        return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def serve_payload(request: Request, payload: PrecompressedPayload, headers: dict = None) -> Response:
+    """
+    Returns the payload as-is, answering conditional requests with 304 and
+    picking the best pre-compressed variant allowed by Accept-Encoding.
+    """
+    accept_encoding = request.headers.get("accept-encoding", "")
+    if payload.br_body is not None and _accepts(accept_encoding, "br"):
+        coding, body = "br", payload.br_body
+    elif _accepts(accept_encoding, "gzip"):
+        coding, body = "gzip", payload.gzip_body
+    else:
+        coding, body = None, payload.body
+
+    response_headers = {"ETag": payload.etag_for(coding), "Vary": "Accept-Encoding"}
+    if coding is not None:
+        response_headers["Content-Encoding"] = coding
+    if headers:
+        response_headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, payload):
+        response_headers.pop("Content-Encoding", None)
+        return Response(status_code=304, headers=response_headers)
+
+    return Response(content=body, media_type=payload.media_type, headers=response_headers)
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
-from datetime import date
+from datetime import date, datetime
 
 class ProjectBase(BaseModel):
     id: int
@@ -97,3 +97,64 @@ class FinancialDataBase(BaseModel):
     class Config:
         from_attributes = True
 
+
+class LatLonPoint(BaseModel):
+    lat: float
+    lon: float
+    id: Optional[int] = None  # Echoed back so callers can match results to their own records
+
+class WaterStressBatchRequest(BaseModel):
+    points: List[LatLonPoint] = Field(..., max_length=2000)  # Clients split larger sets (see ProjectsMap.tsx)
+
+class ConstraintsRequest(BaseModel):
+    points: List[LatLonPoint] = Field(..., max_length=10000)
+    buffer_km: float = Field(10.0, ge=0)
+    include_planned: bool = False
+
+class ScreeningJobRequest(BaseModel):
+    bbox: str = "-17.1,20.8,-1.0,35.9"  # 'min_lon,min_lat,max_lon,max_lat' (defaults to Morocco)
+    resolution: float = Field(0.1, gt=0)  # Cell size in degrees
+    buffer_km: float = Field(10.0, ge=0)
+
+class ScreeningJobBase(BaseModel):
+    id: int
+    status: str
+    min_lon: float
+    min_lat: float
+    max_lon: float
+    max_lat: float
+    resolution: float
+    buffer_km: float
+    total_cells: int
+    done_cells: int
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class MonteCarloDistribution(BaseModel):
+    dist: str = "fixed"  # fixed (value), uniform (low, high), triangular (low, mode, high) or normal (mean, std)
+    value: Optional[float] = None
+    low: Optional[float] = None
+    mode: Optional[float] = None
+    high: Optional[float] = None
+    mean: Optional[float] = None
+    std: Optional[float] = None
+    min: Optional[float] = None  # Optional truncation of a normal distribution
+    max: Optional[float] = None
+
+class MonteCarloRequest(BaseModel):
+    technology: str = "solar"
+    draws: int = Field(100000, ge=1, le=2000000)
+    seed: int = Field(0, ge=0)
+    # Units: capex MAD/kW, opex MAD/kW/year, wacc and capacity_factor as fractions, tariff MAD/kWh.
+    # Anything omitted is seeded from the market data and financing tables.
+    capex: Optional[MonteCarloDistribution] = None
+    opex: Optional[MonteCarloDistribution] = None
+    wacc: Optional[MonteCarloDistribution] = None
+    capacity_factor: Optional[MonteCarloDistribution] = None
+    tariff: Optional[MonteCarloDistribution] = None
+    lifetime_years: Optional[int] = Field(None, ge=1, le=60)
+    degradation_pct: Optional[float] = Field(None, ge=0, lt=100)
@@ -1,8 +1,396 @@
-def fetch_live_kpi_data():
-    """
-    Mock version of the KPI scraper.
-    """
+"""
+Background ingestion of live KPIs and investment figures from ONEE, MASEN and
+ANRE-style publications into top_level_kpis and financial_data.
+
+Every configured source is polled on its own interval, concurrently, off the
+request path:
+  - conditional requests (If-None-Match / If-Modified-Since): an unchanged
+    source answers 304 and nothing is downloaded or parsed; the validators are
+    kept in scraper_state, so they survive restarts
+  - a payload whose hash matches the last one is not parsed either
+  - a per-source rate limit spaces out every request, retries included
+  - timeouts, 429 and 5xx are retried with exponential backoff and jitter
+    (honouring Retry-After)
+  - only rows whose values differ from the table are written, so an unchanged
+    publication never bumps table_versions or wakes the change stream
+
+A source is enabled by setting its URL, e.g.
+    SCRAPER_ONEE_URL=http://127.0.0.1:8900/onee/kpis
+(benchmarks/stub_upstreams.py serves fixtures for all three). The scheduler
+runs in the API lifespan when SCRAPERS_ENABLED=true; with several web workers
+run it as its own process instead:
+
+    python scrapers.py               # poll until interrupted
+    python scrapers.py --once onee   # one pass over the given (or all) sources
+"""
+import argparse
+import asyncio
+import email.utils
+import hashlib
+import os
+import random
+import time
+from datetime import datetime, timezone
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+import database
+import http_client
+import metrics
+import models
+
+SCRAPERS_ENABLED = os.getenv("SCRAPERS_ENABLED", "false").lower() in ("1", "true", "yes")
+MAX_ATTEMPTS = int(os.getenv("SCRAPER_MAX_ATTEMPTS", "4"))
+BACKOFF_BASE = float(os.getenv("SCRAPER_BACKOFF_BASE", "2.0"))
+BACKOFF_MAX = 300.0
+REQUEST_TIMEOUT = 20.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Where each kind of record is written, keyed on the table's natural key
+TARGETS = {
+    "kpis": {
+        "model": models.TopLevelKPI,
+        "key": "label",
+        "columns": ["label", "value", "subtext", "trend"],
+        # Filled in only when a scraper creates a row it does not fully describe
+        "defaults": {"subtext": "", "trend": "neutral"},
+    },
+    "financials": {
+        "model": models.FinancialData,
+        "key": "category",
+        "columns": ["category", "amountBillionUSD", "color", "source", "year", "yoy_growth_pct"],
+        "defaults": {"color": "#94A3B8"},
+    },
+}
+
+
+def _trend(delta) -> str:
+    if delta is None or delta == 0:
+        return "neutral"
+    return "up" if delta > 0 else "down"
+
+
+def parse_onee(data: dict) -> list:
+    """ONEE grid statistics: installed capacity and renewable share."""
+    as_of = data.get("as_of")
+    subtext = f"Source: ONEE ({as_of})" if as_of else "Source: ONEE"
+    rows = []
+    if data.get("installed_capacity_mw") is not None:
+        rows.append({
+            "label": "Total Installed Capacity",
+            "value": f"{data['installed_capacity_mw']:,.0f} MW",
+            "subtext": subtext,
+            "trend": _trend(data.get("installed_capacity_change_mw")),
+        })
+    if data.get("renewable_share_pct") is not None:
+        rows.append({
+            "label": "Renewable Energy Share",
+            "value": f"{data['renewable_share_pct']:.1f}%",
+            "subtext": subtext,
+            "trend": _trend(data.get("renewable_share_change_pct")),
+        })
+    return rows
+
+
+def parse_masen(data: dict) -> list:
+    """MASEN programme financing, one row per programme (amounts in USD billions)."""
+    rows = []
+    for programme in data.get("programmes", []):
+        row = {
+            "category": programme["category"],
+            "amountBillionUSD": programme["amount_usd_bn"],
+            "source": programme.get("source", "MASEN"),
+            "year": programme.get("year"),
+            "yoy_growth_pct": programme.get("yoy_growth_pct"),
+        }
+        if programme.get("color"):
+            row["color"] = programme["color"]
+        rows.append(row)
+    return rows
+
+
+def parse_records(data: dict) -> list:
+    """Sources that already publish rows in the table's shape ({"records": [...]})."""
+    return list(data.get("records", []))
+
+
+def _source(name: str, target: str, parse, interval: float, rate_per_minute: float) -> dict:
+    prefix = f"SCRAPER_{name.upper()}"
+    return {
+        "url": os.getenv(f"{prefix}_URL"),
+        "target": target,
+        "parse": parse,
+        "interval": float(os.getenv(f"{prefix}_INTERVAL", str(interval))),
+        "rate_per_minute": float(os.getenv(f"{prefix}_RATE_PER_MINUTE", str(rate_per_minute))),
+    }
+
+
+# A source without a URL is disabled
+SOURCES = {
+    "onee": _source("onee", "kpis", parse_onee, interval=900, rate_per_minute=6),
+    "masen": _source("masen", "financials", parse_masen, interval=3600, rate_per_minute=6),
+    "anre": _source("anre", "kpis", parse_records, interval=3600, rate_per_minute=2),
+}
+
+
+def enabled_sources() -> list:
+    return [name for name, source in SOURCES.items() if source["url"]]
+
+
+class RateLimiter:
+    """Spaces requests at least 60 / rate_per_minute seconds apart."""
+
+    def __init__(self, rate_per_minute: float):
+        self.min_gap = 60.0 / rate_per_minute if rate_per_minute > 0 else 0.0
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            delay = self._next_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_at = time.monotonic() + self.min_gap
+
+
+def _retry_after(response: httpx.Response):
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+async def fetch(url: str, validators: dict, limiter: RateLimiter) -> httpx.Response:
+    """GETs the source conditionally, retrying transient failures with backoff."""
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    for attempt in range(MAX_ATTEMPTS):
+        await limiter.wait()
+        retry_after = None
+        try:
+            response = await http_client.request("GET", url, headers=headers, timeout=REQUEST_TIMEOUT)
+            if response.status_code not in RETRY_STATUSES:
+                return response
+            retry_after = _retry_after(response)
+            if attempt + 1 == MAX_ATTEMPTS:
+                response.raise_for_status()
+        except httpx.TransportError:
+            if attempt + 1 == MAX_ATTEMPTS:
+                raise
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+        await asyncio.sleep(min(BACKOFF_MAX, retry_after) if retry_after is not None else delay)
+
+
+def diff_records(current: dict, records: list, key: str) -> list:
+    """The records that are new or differ from the current row in any column they carry."""
+    changed = []
+    for record in records:
+        row = current.get(record[key])
+        if row is None or any(row.get(column) != value for column, value in record.items()):
+            changed.append(record)
+    return changed
+
+
+async def write_records(db, target: str, records: list) -> int:
+    """Upserts the changed records; returns how many rows were written."""
+    spec = TARGETS[target]
+    table = spec["model"].__table__
+    key = spec["key"]
+    # Unknown fields are dropped rather than failing the whole source
+    records = [{c: r[c] for c in spec["columns"] if c in r} for r in records if r.get(key) is not None]
+    if not records:
+        return 0
+
+    rows = (await db.execute(
+        select(*(table.c[c] for c in spec["columns"])).where(table.c[key].in_([r[key] for r in records]))
+    )).mappings().all()
+    current = {row[key]: dict(row) for row in rows}
+    changed = diff_records(current, records, key)
+
+    # One statement per column set (a multi-row INSERT needs the same columns in every row)
+    groups = {}
+    for record in changed:
+        if record[key] not in current:
+            record = {**spec["defaults"], **record}
+        groups.setdefault(tuple(sorted(record)), []).append(record)
+    for columns, group in groups.items():
+        statement = insert(table).values(group)
+        statement = statement.on_conflict_do_update(
+            index_elements=[key],
+            set_={c: statement.excluded[c] for c in columns if c != key},
+        )
+        await db.execute(statement)
+    return len(changed)
+
+
+async def load_state(db, name: str) -> dict:
+    state = await db.get(models.ScraperState, name)
+    if state is None:
+        return {}
     return {
-        "capacity_mw": 11000,
-        "renewable_percentage": 38
+        "etag": state.etag,
+        "last_modified": state.last_modified,
+        "content_hash": state.content_hash,
+        "checked_at": state.checked_at,
     }
+
+
+async def _save_state(db, name: str, values: dict):
+    statement = insert(models.ScraperState.__table__).values(source=name, **values)
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=["source"],
+        set_={c: statement.excluded[c] for c in values},
+    ))
+
+
+async def run_source(name: str, limiter: RateLimiter = None) -> dict:
+    """One conditional fetch of a source, writing whatever changed."""
+    source = SOURCES[name]
+    limiter = limiter or RateLimiter(source["rate_per_minute"])
+    async with database.AsyncSessionLocal() as db:
+        state = await load_state(db, name)
+        await db.commit()
+
+    now = datetime.now(timezone.utc)
+    result = {"source": name, "outcome": "not_modified", "written": 0}
+    values = {"checked_at": now, "last_error": None}
+    try:
+        response = await fetch(source["url"], state, limiter)
+        if response.status_code != 304:
+            response.raise_for_status()
+            values["etag"] = response.headers.get("ETag")
+            values["last_modified"] = response.headers.get("Last-Modified")
+            body_hash = hashlib.sha256(response.content).hexdigest()
+            if body_hash == state.get("content_hash"):
+                result["outcome"] = "unchanged"
+            else:
+                values["content_hash"] = body_hash
+                records = source["parse"](response.json())
+                result["outcome"] = "changed"
+    except Exception as e:
+        metrics.SCRAPER_RUNS_TOTAL.inc(source=name, outcome="error")
+        async with database.AsyncSessionLocal() as db:
+            await _save_state(db, name, {"checked_at": now, "last_error": str(e)[:500]})
+            await db.commit()
+        raise
+
+    async with database.AsyncSessionLocal() as db:
+        # The rows and the new hash commit together, so a failed write is retried on the next run
+        if result["outcome"] == "changed":
+            result["written"] = await write_records(db, source["target"], records)
+            if result["written"]:
+                values["changed_at"] = now
+                metrics.SCRAPER_ROWS_WRITTEN_TOTAL.inc(result["written"], source=name)
+        await _save_state(db, name, values)
+        await db.commit()
+    metrics.SCRAPER_RUNS_TOTAL.inc(source=name, outcome=result["outcome"])
+    return result
+
+
+class ScraperScheduler:
+    """
+    One polling loop per enabled source, all on the running event loop.
+    A restart resumes each source where its last check left off instead of
+    fetching everything at once.
+    """
+
+    def __init__(self):
+        self._tasks = []
+
+    async def start(self, names=None):
+        names = names or enabled_sources()
+        self._tasks = [asyncio.create_task(self._loop(name)) for name in names]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _loop(self, name: str):
+        source = SOURCES[name]
+        limiter = RateLimiter(source["rate_per_minute"])
+        try:
+            async with database.AsyncSessionLocal() as db:
+                checked_at = (await load_state(db, name)).get("checked_at")
+        except Exception as e:
+            print(f"Scraper {name}: could not load its state: {e}")
+            checked_at = None
+        if checked_at is not None:
+            elapsed = (datetime.now(timezone.utc) - checked_at).total_seconds()
+            await asyncio.sleep(max(0.0, source["interval"] - elapsed))
+
+        while True:
+            try:
+                await run_source(name, limiter)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Scraper {name} failed: {e}")
+            # Jitter keeps the sources from lining up on the same tick
+            await asyncio.sleep(source["interval"] * random.uniform(0.9, 1.1))
+
+
+scheduler = ScraperScheduler()
+
+
+async def run_once(names=None) -> list:
+    """A single pass over the sources, concurrently; failures are reported, not raised."""
+    names = names or enabled_sources()
+    results = await asyncio.gather(*(run_source(name) for name in names), return_exceptions=True)
+    return [
+        {"source": name, "outcome": "error", "error": str(r)} if isinstance(r, Exception) else r
+        for name, r in zip(names, results)
+    ]
+
+
+async def _main(args):
+    await http_client.startup()
+    try:
+        if args.once:
+            for result in await run_once(args.sources):
+                print(result)
+        else:
+            await scheduler.start(args.sources)
+            await asyncio.Event().wait()
+    finally:
+        await scheduler.stop()
+        await http_client.shutdown()
+        await database.async_engine.dispose()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sources", nargs="*", help=f"Sources to run (default: every configured one of {', '.join(SOURCES)})")
+    parser.add_argument("--once", action="store_true", help="Run each source once and exit")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.sources) - set(SOURCES)
+    if unknown:
+        parser.error(f"unknown sources: {', '.join(sorted(unknown))}")
+    missing = [name for name in args.sources if not SOURCES[name]["url"]]
+    if missing:
+        parser.error(f"no URL configured for: {', '.join(missing)} (set SCRAPER_<NAME>_URL)")
+    if not (args.sources or enabled_sources()):
+        parser.error("no sources configured (set SCRAPER_<NAME>_URL)")
+
+    try:
+        asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+Site-suitability screening over a bbox grid, run as a background job.
+
+Every cell gets NASA POWER climatology (through the shared climate cache),
+the regional water-stress estimate, grid distance and SIBE exclusion
+(constraints.py). Cells are scored in chunks across a process pool and
+written to screening_results as each chunk finishes, so progress can be
+polled from screening_jobs while the job runs.
+
+    python screening.py --bbox=-17.1,20.8,-1.0,35.9 --resolution 0.1
+"""
+import argparse
+import asyncio
+import datetime
+import math
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import httpx
+import numpy as np
+from sqlalchemy import insert, text
+
+import climate
+import constraints
+import database
+import http_client
+import models
+import water_stress
+
+SCREENING_WORKERS = int(os.getenv("SCREENING_WORKERS", str(os.cpu_count() or 2)))
+SCREENING_CHUNK_SIZE = int(os.getenv("SCREENING_CHUNK_SIZE", "2000"))
+MAX_SCREENING_CELLS = int(os.getenv("MAX_SCREENING_CELLS", "250000"))
+# Upstream NASA POWER lookups in flight per worker
+CLIMATE_CONCURRENCY = 8
+
+# Scoring: the better of the solar and wind resource, discounted by grid distance and water stress
+GHI_FULL_SCORE = 6.5          # kWh/m^2/day
+WIND_CUT_IN = 4.0             # m/s at 50 m
+WIND_FULL_SCORE = 9.0
+GRID_DISTANCE_SCALE_KM = 25.0  # Grid factor halves at this distance
+WATER_STRESS_WEIGHT = 0.1      # Per BWS point (0-5)
+
+# A running job holds a session-level advisory lock (this namespace, job id) for as long as
+# its process lives, so any process can tell a running job from one whose process died
+JOB_LOCK_NAMESPACE = 17017
+# Queued jobs start right away; one still queued after this long lost its process
+QUEUED_JOB_GRACE_SECONDS = 300
+
+
+def grid_cells(min_lon: float, min_lat: float, max_lon: float, max_lat: float, resolution: float):
+    """Cell centres in row-major order, north to south, west to east (same layout as the water-stress raster)."""
+    width = max(1, math.ceil((max_lon - min_lon) / resolution))
+    height = max(1, math.ceil((max_lat - min_lat) / resolution))
+    lons = min_lon + (np.arange(width) + 0.5) * resolution
+    lats = max_lat - (np.arange(height) + 0.5) * resolution
+    lat_grid, lon_grid = np.meshgrid(lats, lons, indexing="ij")
+    return lat_grid.ravel(), lon_grid.ravel()
+
+
+def count_cells(min_lon: float, min_lat: float, max_lon: float, max_lat: float, resolution: float) -> int:
+    return max(1, math.ceil((max_lon - min_lon) / resolution)) * max(1, math.ceil((max_lat - min_lat) / resolution))
+
+
+def suitability_scores(ghi, wind, grid_km, bws, excluded) -> np.ndarray:
+    """0-100 per cell; NaN where the climatology is missing, 0 where a protected area excludes the site."""
+    solar = np.clip(ghi / GHI_FULL_SCORE, 0, 1)
+    wind_score = np.clip((wind - WIND_CUT_IN) / (WIND_FULL_SCORE - WIND_CUT_IN), 0, 1)
+    resource = np.fmax(solar, wind_score)
+    grid = 1 / (1 + np.nan_to_num(grid_km, nan=np.inf) / GRID_DISTANCE_SCALE_KM)
+    water = 1 - WATER_STRESS_WEIGHT * bws
+    scores = np.round(100 * resource * grid * water, 1)
+    return np.where(excluded, 0.0, scores)
+
+
+def _climate_value(value):
+    # NASA POWER reports missing data as -999 (and parse_climatology as "N/A")
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return math.nan
+    return value if value >= 0 else math.nan
+
+
+async def _chunk_climatology(lats, lons):
+    """GHI, DNI and WS50M per cell; each NASA POWER grid cell is looked up once."""
+    cells = [climate.snap_to_grid(float(lat), float(lon)) for lat, lon in zip(lats, lons)]
+    limit = asyncio.Semaphore(CLIMATE_CONCURRENCY)
+
+    async def lookup(cell):
+        async with limit:
+            try:
+                return await climate.get_climatology(*cell)
+            except httpx.HTTPStatusError as e:
+                # NASA POWER rejecting this one cell (4xx): the cell is left unscored.
+                # 5xx, timeouts and an open circuit are outages and fail the chunk.
+                if e.response.status_code >= 500:
+                    raise
+                return {}
+            except ValueError:
+                return {}  # Malformed body for this cell
+
+    unique = list(dict.fromkeys(cells))
+    found = dict(zip(unique, await asyncio.gather(*(lookup(c) for c in unique))))
+    ghi = np.array([_climate_value(found[c].get("GHI")) for c in cells])
+    dni = np.array([_climate_value(found[c].get("DNI")) for c in cells])
+    wind = np.array([_climate_value(found[c].get("Wind_Speed_50m")) for c in cells])
+    return ghi, dni, wind
+
+
+async def _score_chunk_async(job_id: int, first_cell: int, lats, lons, buffer_km: float) -> int:
+    try:
+        ghi, dni, wind = await _chunk_climatology(lats, lons)
+        async with database.AsyncSessionLocal() as db:
+            sites = await constraints.screen_points(db, list(zip(lats.tolist(), lons.tolist())), buffer_km)
+    finally:
+        # This event loop ends with the chunk; don't leave pooled connections bound to it
+        await http_client.shutdown()
+        await database.async_engine.dispose()
+
+    grid_km = np.array([s["nearest_grid_km"] if s["nearest_grid_km"] is not None else math.nan for s in sites])
+    excluded = np.array([bool(s["sibe"] and s["sibe"]["within_buffer"]) for s in sites])
+    bws = water_stress.estimate_morocco_bws_array(lats, lons)
+    scores = suitability_scores(ghi, wind, grid_km, bws, excluded)
+
+    def nullable(value):
+        return None if math.isnan(value) else float(value)
+
+    rows = [
+        {
+            "job_id": job_id,
+            "cell": first_cell + i,
+            "latitude": float(lats[i]),
+            "longitude": float(lons[i]),
+            "ghi": nullable(ghi[i]),
+            "dni": nullable(dni[i]),
+            "wind_speed_50m": nullable(wind[i]),
+            "bws_score": float(bws[i]),
+            "grid_km": nullable(grid_km[i]),
+            "sibe_name": sites[i]["sibe"]["name"] if excluded[i] else None,
+            "excluded": bool(excluded[i]),
+            "score": nullable(scores[i]),
+        }
+        for i in range(len(lats))
+    ]
+    with database.engine.begin() as conn:
+        conn.execute(insert(models.ScreeningResult), rows)
+    return len(rows)
+
+
+def _score_chunk(job_id: int, first_cell: int, lats, lons, buffer_km: float) -> int:
+    # Runs in a worker process, with its own HTTP client and DB connections
+    try:
+        return asyncio.run(_score_chunk_async(job_id, first_cell, lats, lons, buffer_km))
+    except Exception as e:
+        # Re-raised as a plain error: not every upstream exception survives pickling back to the parent
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+
+
+def _update_job(job_id: int, **values):
+    with database.SessionLocal() as db:
+        db.query(models.ScreeningJob).filter(models.ScreeningJob.id == job_id).update(values)
+        db.commit()
+
+
+def _try_lock(conn, job_id: int) -> bool:
+    return conn.execute(
+        text("SELECT pg_try_advisory_lock(:ns, :id)"), {"ns": JOB_LOCK_NAMESPACE, "id": job_id}
+    ).scalar()
+
+
+def _unlock(conn, job_id: int):
+    conn.execute(text("SELECT pg_advisory_unlock(:ns, :id)"), {"ns": JOB_LOCK_NAMESPACE, "id": job_id})
+
+
+def run_job(job_id: int, workers: int = SCREENING_WORKERS, chunk_size: int = SCREENING_CHUNK_SIZE, progress=None):
+    """Scores every cell of a queued job. Blocking; call from a thread or the CLI."""
+    with database.engine.connect() as lock_conn:
+        if not _try_lock(lock_conn, job_id):
+            raise ValueError(f"Screening job {job_id} is already running")
+        try:
+            _run_locked_job(job_id, workers, chunk_size, progress)
+        finally:
+            # Session-level lock: release it before the connection goes back to the pool
+            _unlock(lock_conn, job_id)
+
+
+def _run_locked_job(job_id: int, workers: int, chunk_size: int, progress):
+    with database.SessionLocal() as db:
+        job = db.get(models.ScreeningJob, job_id)
+        bbox = (job.min_lon, job.min_lat, job.max_lon, job.max_lat)
+        resolution, buffer_km = job.resolution, job.buffer_km
+
+    lats, lons = grid_cells(*bbox, resolution)
+    total = len(lats)
+    with database.SessionLocal() as db:
+        # A re-run starts from scratch
+        db.query(models.ScreeningResult).filter(models.ScreeningResult.job_id == job_id).delete()
+        db.commit()
+    _update_job(job_id, status="running", total_cells=total, done_cells=0, error=None, finished_at=None)
+
+    done = 0
+    try:
+        # Spawned workers, so no engine or event loop state is inherited from this process
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = [
+                pool.submit(_score_chunk, job_id, start, lats[start:start + chunk_size], lons[start:start + chunk_size], buffer_km)
+                for start in range(0, total, chunk_size)
+            ]
+            for future in as_completed(futures):
+                done += future.result()
+                _update_job(job_id, done_cells=done)
+                if progress is not None:
+                    progress(done, total)
+    except Exception as e:
+        _update_job(job_id, status="failed", error=str(e), finished_at=datetime.datetime.now(datetime.timezone.utc))
+        raise
+    _update_job(job_id, status="done", finished_at=datetime.datetime.now(datetime.timezone.utc))
+
+
+def recover_interrupted_jobs() -> list:
+    """
+    Marks failed the jobs left running (or queued) by a process that stopped: their advisory
+    lock is free. Safe to call from every worker at startup; returns the ids marked failed.
+    """
+    failed = []
+    with database.engine.connect() as conn:
+        candidates = conn.execute(text(
+            "SELECT id FROM screening_jobs WHERE status = 'running' "
+            "OR (status = 'queued' AND created_at < now() - make_interval(secs => :grace))"
+        ), {"grace": QUEUED_JOB_GRACE_SECONDS}).scalars().all()
+        conn.commit()
+        for job_id in candidates:
+            if not _try_lock(conn, job_id):
+                continue  # Still running in a live process
+            try:
+                conn.execute(text(
+                    "UPDATE screening_jobs SET status = 'failed', error = :error, finished_at = now() "
+                    "WHERE id = :id AND status IN ('running', 'queued')"
+                ), {"id": job_id, "error": "Interrupted: the process running this job stopped; submit it again"})
+                conn.commit()
+                failed.append(job_id)
+            finally:
+                _unlock(conn, job_id)
+                conn.commit()
+    return failed
+
+
+def create_job(bbox, resolution: float, buffer_km: float = constraints.DEFAULT_BUFFER_KM) -> int:
+    min_lon, min_lat, max_lon, max_lat = bbox
+    total = count_cells(min_lon, min_lat, max_lon, max_lat, resolution)
+    if total > MAX_SCREENING_CELLS:
+        raise ValueError(f"Screening grid too large ({total} cells, max {MAX_SCREENING_CELLS}); increase resolution")
+    with database.SessionLocal() as db:
+        job = models.ScreeningJob(
+            min_lon=min_lon, min_lat=min_lat, max_lon=max_lon, max_lat=max_lat,
+            resolution=resolution, buffer_km=buffer_km, total_cells=total, status="queued",
+        )
+        db.add(job)
+        db.commit()
+        return job.id
+
+
+def start_job(job_id: int):
+    """Runs the job on a background thread of the API process; its workers are separate processes."""
+    def target():
+        try:
+            run_job(job_id)
+        except Exception as e:
+            print(f"Screening job {job_id} failed: {e}")
+
+    threading.Thread(target=target, name=f"screening-{job_id}", daemon=True).start()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bbox", default="-17.1,20.8,-1.0,35.9", help="'min_lon,min_lat,max_lon,max_lat' (defaults to Morocco)")
+    parser.add_argument("--resolution", type=float, default=0.1, help="Cell size in degrees")
+    parser.add_argument("--buffer-km", type=float, default=constraints.DEFAULT_BUFFER_KM, help="SIBE exclusion distance")
+    parser.add_argument("--workers", type=int, default=SCREENING_WORKERS)
+    parser.add_argument("--chunk-size", type=int, default=SCREENING_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    bbox = tuple(float(v) for v in args.bbox.split(","))
+    job_id = create_job(bbox, args.resolution, args.buffer_km)
+    print(f"Screening job {job_id}")
+
+    def progress(done, total):
+        print(f"  {done}/{total} cells ({100 * done / total:.0f}%)")
+
+    run_job(job_id, workers=args.workers, chunk_size=args.chunk_size, progress=progress)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
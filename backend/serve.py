@@ -0,0 +1,94 @@
+"""
+Production entry point: one Gunicorn master, N Uvicorn workers.
+
+The app module and the static GeoJSON layers (parsed, simplified and
+precompressed) are loaded once in the master, then the workers are forked,
+so every worker shares those pages copy-on-write instead of building its own
+copy. The climate and water-stress caches use the shared store selected by
+CACHE_BACKEND (see cache.py), so the workers also share what they fetch.
+
+    python serve.py --workers 8 --bind 0.0.0.0:8000
+
+Without Gunicorn installed it falls back to `uvicorn --workers`, which spawns
+workers instead of forking them (each worker then loads the datasets itself).
+"""
+import argparse
+import gc
+import os
+
+try:
+    import gunicorn.app.base
+except ImportError:  # gunicorn is optional (and unavailable on Windows)
+    gunicorn = None
+
+DEFAULT_WORKERS = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+DEFAULT_BIND = os.getenv("BIND", "0.0.0.0:8000")
+
+
+def preload():
+    """Everything expensive that can be shared read-only by the workers."""
+    import geodata
+    import main as app_module  # noqa: F401  (imported so the workers inherit the loaded modules)
+
+    geodata.preload()
+    # Keep the preloaded objects out of the GC's reach, so collections in the
+    # workers don't touch (and copy) the shared pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    import database
+
+    # Connection pools must not be shared with the master; close=False leaves its sockets alone
+    database.engine.dispose(close=False)
+    database.async_engine.sync_engine.dispose(close=False)
+
+
+if gunicorn is not None:
+    class Application(gunicorn.app.base.BaseApplication):
+        def __init__(self, options: dict):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            import main as app_module
+            return app_module.app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Defaults to WEB_CONCURRENCY or the core count")
+    parser.add_argument("--bind", default=DEFAULT_BIND)
+    parser.add_argument("--timeout", type=int, default=60, help="Seconds before a silent worker is restarted")
+    parser.add_argument("--max-requests", type=int, default=0, help="Recycle workers after this many requests (0: never)")
+    args = parser.parse_args()
+
+    if gunicorn is None:
+        import uvicorn
+
+        print("gunicorn is not installed: starting uvicorn workers without a preloaded, shared dataset")
+        host, _, port = args.bind.rpartition(":")
+        uvicorn.run("main:app", host=host or "0.0.0.0", port=int(port), workers=args.workers)
+        return
+
+    preload()
+    Application({
+        "bind": args.bind,
+        "workers": args.workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "post_fork": post_fork,
+        "timeout": args.timeout,
+        "graceful_timeout": 30,
+        "keepalive": 5,
+        "max_requests": args.max_requests,
+        "max_requests_jitter": args.max_requests // 10,
+    }).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import math
+
+# Zoom levels (web-map / slippy-tile convention) for which simplified
+# geometries are precomputed. Requests above the last bucket get full resolution.
+ZOOM_BUCKETS = (4, 6, 8, 10)
+
+# Precision used for the full-resolution variant (~0.1 m at Morocco's latitudes)
+FULL_PRECISION = 6
+
+
+def zoom_bucket(zoom):
+    """Maps a requested zoom onto the nearest precomputed bucket that is at least as detailed."""
+    if zoom is None:
+        return None
+    for bucket in ZOOM_BUCKETS:
+        if zoom <= bucket:
+            return bucket
+    return None
+
+
+def tolerance_for_zoom(zoom: int) -> float:
+    # Roughly one screen pixel, in degrees, at the given zoom (256 px tiles)
+    return 360.0 / (256 * 2 ** zoom)
+
+
+def precision_for_tolerance(tolerance: float) -> int:
+    # One decimal finer than the tolerance so quantization never exceeds it
+    return min(FULL_PRECISION, max(0, math.ceil(-math.log10(tolerance))) + 1)
+
+
+def _perpendicular_distance(point, start, end) -> float:
+    px, py = point[0], point[1]
+    sx, sy = start[0], start[1]
+    ex, ey = end[0], end[1]
+    dx, dy = ex - sx, ey - sy
+    if dx == 0 and dy == 0:
+        return math.hypot(px - sx, py - sy)
+    t = ((px - sx) * dx + (py - sy) * dy) / (dx * dx + dy * dy)
+    t = max(0.0, min(1.0, t))
+    return math.hypot(px - (sx + t * dx), py - (sy + t * dy))
+
+
+def douglas_peucker(points, tolerance: float):
+    """Iterative Douglas–Peucker simplification of a coordinate list."""
+    if len(points) < 3 or tolerance <= 0:
+        return list(points)
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        max_dist = 0.0
+        index = first
+        for i in range(first + 1, last):
+            dist = _perpendicular_distance(points[i], points[first], points[last])
+            if dist > max_dist:
+                max_dist = dist
+                index = i
+        if max_dist > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+
+    return [p for p, k in zip(points, keep) if k]
+
+
+def quantize(points, precision: int):
+    """Rounds coordinates and drops consecutive duplicates created by the rounding."""
+    result = []
+    for p in points:
+        q = [round(p[0], precision), round(p[1], precision)]
+        if not result or result[-1] != q:
+            result.append(q)
+    return result
+
+
+def _simplify_line(points, tolerance, precision):
+    line = quantize(douglas_peucker(points, tolerance), precision)
+    return line if len(line) >= 2 else None
+
+
+def _simplify_ring(ring, tolerance, precision, is_exterior):
+    simplified = quantize(douglas_peucker(ring, tolerance), precision)
+    if len(simplified) >= 4:
+        return simplified
+    if is_exterior:
+        # Never let a small polygon vanish: keep its outline at the target precision
+        fallback = quantize(ring, precision)
+        return fallback if len(fallback) >= 4 else None
+    return None
+
+
+def _simplify_polygon(rings, tolerance, precision):
+    result = []
+    for i, ring in enumerate(rings):
+        simplified = _simplify_ring(ring, tolerance, precision, is_exterior=(i == 0))
+        if simplified is None:
+            if i == 0:
+                return None
+            continue
+        result.append(simplified)
+    return result
+
+
+def simplify_geometry(geometry: dict, tolerance: float, precision: int):
+    """
+    Returns a simplified and quantized copy of a GeoJSON geometry,
+    or None when it collapses below the tolerance.
+    """
+    if not geometry:
+        return geometry
+
+    geom_type = geometry.get("type")
+    coords = geometry.get("coordinates")
+
+    if geom_type == "Point":
+        return {"type": geom_type, "coordinates": [round(coords[0], precision), round(coords[1], precision)]}
+    if geom_type == "LineString":
+        line = _simplify_line(coords, tolerance, precision)
+        return {"type": geom_type, "coordinates": line} if line else None
+    if geom_type == "MultiLineString":
+        lines = [l for l in (_simplify_line(c, tolerance, precision) for c in coords) if l]
+        return {"type": geom_type, "coordinates": lines} if lines else None
+    if geom_type == "Polygon":
+        rings = _simplify_polygon(coords, tolerance, precision)
+        return {"type": geom_type, "coordinates": rings} if rings else None
+    if geom_type == "MultiPolygon":
+        polygons = [p for p in (_simplify_polygon(c, tolerance, precision) for c in coords) if p]
+        return {"type": geom_type, "coordinates": polygons} if polygons else None
+
+    # Other geometry types are passed through untouched
+    return geometry
+
+
+def simplify_collection(collection: dict, zoom=None) -> dict:
+    """
+    Simplifies every feature of a FeatureCollection for the given zoom bucket.
+    With zoom=None the geometries keep every vertex and are only quantized.
+    """
+    if zoom is None:
+        tolerance, precision = 0.0, FULL_PRECISION
+    else:
+        tolerance = tolerance_for_zoom(zoom)
+        precision = precision_for_tolerance(tolerance)
+
+    features = []
+    for feature in collection.get("features", []):
+        geometry = simplify_geometry(feature.get("geometry"), tolerance, precision)
+        if geometry is None:
+            continue
+        simplified = dict(feature)
+        simplified["geometry"] = geometry
+        features.append(simplified)
+
+    result = {k: v for k, v in collection.items() if k != "features"}
+    result["features"] = features
+    return result
@@ -0,0 +1,39 @@
+import os
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+import database
+import fastjson
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Rows fetched per round trip of the server-side cursor; each batch is flushed as one chunk
+STREAM_BATCH_ROWS = int(os.getenv("STREAM_BATCH_ROWS", "1000"))
+
+
+def wants_ndjson(request: Request, stream: bool = False) -> bool:
+    """?stream=1, or a client that asks for NDJSON in its Accept header."""
+    return stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+async def ndjson_rows(query, batch_rows: int = STREAM_BATCH_ROWS):
+    """
+    Runs `query` on a server-side cursor and yields one NDJSON chunk per batch,
+    so memory stays at one batch however many rows there are, and the first
+    rows go out as soon as the first batch is fetched.
+    """
+    # A session of its own: the request's session is closed before the body is streamed
+    async with database.AsyncSessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=batch_rows))
+        columns = list(result.keys())
+        async for batch in result.partitions():
+            chunk = bytearray()
+            for row in batch:
+                chunk += fastjson.dumps(dict(zip(columns, row)))
+                chunk += b"\n"
+            yield bytes(chunk)
+
+
+def ndjson_response(query, headers: dict = None) -> StreamingResponse:
+    """Chunked NDJSON response for a Core select: one JSON object per line, same fields as the JSON endpoint."""
+    return StreamingResponse(ndjson_rows(query), media_type=NDJSON_MEDIA_TYPE, headers=headers)
@@ -0,0 +1,158 @@
+import os
+import shutil
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import text
+
+import metrics
+import versioning
+
+# Layers that can be rendered as Mapbox Vector Tiles, with the attribute columns kept in each tile
+TILE_LAYERS = {
+    "grid": {
+        "table": "transmission_lines",
+        "columns": ["id", "legend", "voltage_kv", "status"],
+    },
+    "sibe": {
+        "table": "protected_areas",
+        "columns": ["id", "name", "category", "area_km2", "status", "wdpa_id"],
+    },
+    "projects": {
+        "table": "projects",
+        "columns": ["id", "name", "type", "capacity_mw", "status"],
+    },
+}
+
+MAX_ZOOM = 22
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+
+# In-memory cache budget, and the zoom levels whose tiles are also persisted on disk.
+# Low zoom tiles are few but expensive to build; deeper tiles stay memory-only so the
+# disk cache remains bounded.
+TILE_CACHE_MAX_BYTES = int(os.getenv("TILE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+TILE_DISK_MAX_ZOOM = int(os.getenv("TILE_DISK_MAX_ZOOM", "10"))
+TILE_CACHE_DIR = os.getenv(
+    "TILE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".tile_cache")
+)
+
+
+class TileCache:
+    """
+    A byte-bounded LRU of encoded tiles, written through to disk for low zoom levels.
+    Keys are (layer, table version, z, x, y): a write to the layer's table bumps its
+    version (see versioning.py), so tiles of older versions are simply never asked for again.
+    """
+
+    def __init__(self, max_bytes: int, cache_dir: str, disk_max_zoom: int):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.disk_max_zoom = disk_max_zoom
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+        # Per layer, the version whose tiles are on disk; older versions are removed
+        self._disk_versions = {}
+
+    def _disk_path(self, key) -> str:
+        layer, version, z, x, y = key
+        return os.path.join(self.cache_dir, layer, f"v{version}", str(z), str(x), f"{y}.mvt")
+
+    def _prune_disk(self, layer: str, version: int):
+        with self._lock:
+            if self._disk_versions.get(layer) == version:
+                return
+            self._disk_versions[layer] = version
+        layer_dir = os.path.join(self.cache_dir, layer)
+        current = f"v{version}"
+        try:
+            names = os.listdir(layer_dir)
+        except FileNotFoundError:
+            return
+        for name in names:
+            if name != current:
+                shutil.rmtree(os.path.join(layer_dir, name), ignore_errors=True)
+
+    def get(self, key):
+        with self._lock:
+            tile = self._entries.get(key)
+            if tile is not None:
+                self._entries.move_to_end(key)
+                return tile
+
+        if key[2] <= self.disk_max_zoom:
+            try:
+                with open(self._disk_path(key), "rb") as f:
+                    tile = f.read()
+            except FileNotFoundError:
+                return None
+            self._remember(key, tile)
+            return tile
+        return None
+
+    def put(self, key, tile: bytes):
+        self._remember(key, tile)
+        if key[2] <= self.disk_max_zoom:
+            self._prune_disk(key[0], key[1])
+            path = self._disk_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file first so readers never see a partial tile
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(tile)
+            os.replace(tmp_path, path)
+
+    def _remember(self, key, tile: bytes):
+        if len(tile) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = tile
+            self._size += len(tile)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+
+tile_cache = TileCache(TILE_CACHE_MAX_BYTES, TILE_CACHE_DIR, TILE_DISK_MAX_ZOOM)
+
+
+def _tile_sql(layer: str) -> str:
+    config = TILE_LAYERS[layer]
+    columns = ", ".join(f"t.{c}" for c in config["columns"])
+    # ST_TileEnvelope is in Web Mercator; the bbox test is done in 4326 so the GiST index on geom is used
+    return f"""
+        WITH bounds AS (
+            SELECT ST_TileEnvelope(:z, :x, :y) AS geom
+        ),
+        mvtgeom AS (
+            SELECT ST_AsMVTGeom(ST_Transform(t.geom, 3857), bounds.geom, 4096, 64, true) AS geom, {columns}
+            FROM {config["table"]} t, bounds
+            WHERE t.geom && ST_Transform(bounds.geom, 4326)
+        )
+        SELECT ST_AsMVT(mvtgeom.*, :layer, 4096, 'geom') FROM mvtgeom
+    """
+
+
+def is_valid_tile(z: int, x: int, y: int) -> bool:
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+async def render_tile(db, layer: str, z: int, x: int, y: int) -> bytes:
+    """Returns the encoded MVT for a tile, from cache when possible. Empty tiles are b''."""
+    # A table without a known version (triggers not installed, broker not started) is never cached
+    version = versioning.tracker.get(TILE_LAYERS[layer]["table"])
+    key = (layer, version, z, x, y)
+    tile = tile_cache.get(key) if version is not None else None
+    metrics.record_cache("tiles", tile is not None)
+    if tile is not None:
+        return tile
+
+    result = (await db.execute(text(_tile_sql(layer)), {"z": z, "x": x, "y": y, "layer": layer})).scalar()
+    tile = bytes(result) if result is not None else b""
+    if version is not None:
+        tile_cache.put(key, tile)
+    return tile
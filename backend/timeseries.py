@@ -0,0 +1,171 @@
+import datetime
+import math
+
+from sqlalchemy import bindparam, text
+
+# Series accepted by /api/market-series, named after the matching MarketData columns
+MARKET_SERIES = [
+    "turt_price",
+    "turd_price",
+    "tss_price",
+    "excedent_pointe_price",
+    "excedent_hors_pointe_price",
+    "residential_price",
+    "industrial_price",
+    "solar_lcoe",
+    "wind_lcoe",
+    "fossil_lcoe",
+]
+
+# Calendar resolutions; 'auto' instead picks a bucket width that yields about `points` buckets
+RESOLUTIONS = ("auto", "hour", "day", "week", "month", "year")
+# Shortest length of each calendar bucket, to bound how many buckets a range can produce
+CALENDAR_SECONDS = {"hour": 3600, "day": 86400, "week": 7 * 86400, "month": 28 * 86400, "year": 365 * 86400}
+RESOLUTION_PATTERN = "^(" + "|".join(RESOLUTIONS) + ")$"
+DEFAULT_POINTS = 500
+MAX_POINTS = 5000
+MIN_BUCKET_SECONDS = 60
+
+# Yearly partitions created up front; anything outside lands in the default partition
+PARTITION_FIRST_YEAR = 2015
+PARTITION_YEARS_AHEAD = 5
+
+
+def _partition_sql(year: int) -> str:
+    return (
+        f"CREATE TABLE market_series_{year} PARTITION OF market_series "
+        # Explicit UTC offset: bare dates would be read in the session TimeZone
+        f"FOR VALUES FROM ('{year}-01-01 00:00:00+00') TO ('{year + 1}-01-01 00:00:00+00')"
+    )
+
+
+def ensure_partitions(conn, first_year: int = PARTITION_FIRST_YEAR, last_year: int = None):
+    """
+    Creates the yearly partitions of market_series (and its default partition). Safe to re-run.
+    Rows that landed in the default partition get their year's partition too, so the default
+    stays empty: PostgreSQL refuses to create a partition whose range the default already holds.
+    """
+    if last_year is None:
+        last_year = datetime.date.today().year + PARTITION_YEARS_AHEAD
+    conn.execute(text("CREATE TABLE IF NOT EXISTS market_series_default PARTITION OF market_series DEFAULT"))
+    stray_years = {int(y) for (y,) in conn.execute(text(
+        "SELECT DISTINCT extract(year FROM ts AT TIME ZONE 'UTC') FROM market_series_default"
+    ))}
+    for year in sorted(set(range(first_year, last_year + 1)) | stray_years):
+        if conn.execute(text("SELECT to_regclass(:name)"), {"name": f"market_series_{year}"}).scalar() is not None:
+            continue
+        bounds = {"start": f"{year}-01-01T00:00:00+00:00", "end": f"{year + 1}-01-01T00:00:00+00:00"}
+        if year not in stray_years:
+            conn.execute(text(_partition_sql(year)))
+            continue
+        # Move the year's rows out of the default partition, create the partition, and route them back
+        conn.execute(text(
+            "CREATE TEMP TABLE market_series_moved ON COMMIT DROP AS "
+            "WITH moved AS ("
+            "  DELETE FROM market_series_default WHERE ts >= CAST(:start AS timestamptz) AND ts < CAST(:end AS timestamptz)"
+            "  RETURNING series, ts, value"
+            ") SELECT * FROM moved"
+        ), bounds)
+        conn.execute(text(_partition_sql(year)))
+        conn.execute(text("INSERT INTO market_series (series, ts, value) SELECT series, ts, value FROM market_series_moved"))
+        conn.execute(text("DROP TABLE market_series_moved"))
+
+
+def parse_series(series):
+    """Validates a comma-separated series selector; None selects every series."""
+    if not series:
+        return list(MARKET_SERIES)
+    selected = [s.strip() for s in series.split(",") if s.strip()]
+    unknown = [s for s in selected if s not in MARKET_SERIES]
+    if unknown:
+        raise ValueError(f"Unknown market series: {', '.join(unknown)}")
+    return list(dict.fromkeys(selected))
+
+
+def _utc(value: datetime.datetime) -> datetime.datetime:
+    # Naive timestamps are taken as UTC
+    return value.replace(tzinfo=datetime.timezone.utc) if value.tzinfo is None else value
+
+
+def bucket_seconds(start: datetime.datetime, end: datetime.datetime, points: int) -> int:
+    """Bucket width that splits [start, end] into at most `points` buckets."""
+    span = (end - start).total_seconds()
+    # Buckets are anchored on start and the range is inclusive, so stay strictly above span / points
+    return max(MIN_BUCKET_SECONDS, math.floor(span / max(points, 1)) + 1)
+
+
+def calendar_resolution(start: datetime.datetime, end: datetime.datetime, resolution: str, points: int) -> str:
+    """
+    `resolution`, or the next coarser calendar resolution when it would split [start, end]
+    into more than `points` buckets. Raises ValueError when even yearly buckets are too many.
+    """
+    span = (end - start).total_seconds()
+    calendar = list(CALENDAR_SECONDS)
+    for candidate in calendar[calendar.index(resolution):]:
+        # Buckets are calendar-aligned, so the range can touch one more than span / length
+        if math.floor(span / CALENDAR_SECONDS[candidate]) + 2 <= points:
+            return candidate
+    raise ValueError(f"Range too long for {points} points even at resolution=year; raise points or narrow the range")
+
+
+_RANGE_SQL = text(
+    "SELECT min(ts), max(ts) FROM market_series WHERE series IN :series"
+).bindparams(bindparam("series", expanding=True))
+
+
+def _downsample_sql(bucket_expr: str):
+    # Aggregation happens in PostgreSQL, so only the buckets cross the wire
+    return text(f"""
+        SELECT series, {bucket_expr} AS bucket,
+               avg(value) AS avg, min(value) AS min, max(value) AS max,
+               (array_agg(value ORDER BY ts DESC))[1] AS last,
+               count(*) AS count
+        FROM market_series
+        WHERE series IN :series AND ts >= :start AND ts <= :end
+        GROUP BY series, bucket
+        ORDER BY series, bucket
+    """).bindparams(bindparam("series", expanding=True))
+
+
+async def fetch_series(db, series, start=None, end=None, resolution: str = "auto", points: int = DEFAULT_POINTS) -> dict:
+    """
+    Downsampled series over [start, end], one columnar block per series:
+    {"t": [...], "avg": [...], "min": [...], "max": [...], "last": [...], "count": [...]}.
+    A missing bound defaults to the extent of the stored data.
+    """
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"Unknown resolution: {resolution}")
+    if start is None or end is None:
+        first, last = (await db.execute(_RANGE_SQL, {"series": series})).one()
+        start = start or first
+        end = end or last
+    result = {name: {"t": [], "avg": [], "min": [], "max": [], "last": [], "count": []} for name in series}
+    if start is None or end is None:
+        return {"start": None, "end": None, "resolution": resolution, "bucket_seconds": None, "series": result}
+
+    start, end = _utc(start), _utc(end)
+    if start > end:
+        raise ValueError("start must not be after end")
+    if resolution != "auto":
+        resolution = calendar_resolution(start, end, resolution, points)
+
+    params = {"series": series, "start": start, "end": end}
+    width = None
+    if resolution == "auto":
+        width = bucket_seconds(start, end, points)
+        # Buckets are aligned on `start` so the chart gets evenly spaced points
+        sql = _downsample_sql("date_bin(make_interval(secs => :width), ts, :start)")
+        params["width"] = float(width)
+    else:
+        sql = _downsample_sql(f"date_trunc('{resolution}', ts)")
+
+    for row in (await db.execute(sql, params)).all():
+        block = result[row.series]
+        block["t"].append(row.bucket)
+        block["avg"].append(row.avg)
+        block["min"].append(row.min)
+        block["max"].append(row.max)
+        block["last"].append(row.last)
+        block["count"].append(row.count)
+
+    return {"start": start, "end": end, "resolution": resolution, "bucket_seconds": width, "series": result}
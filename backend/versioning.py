@@ -0,0 +1,74 @@
+from sqlalchemy import text
+
+# Tables whose writes bump their row in table_versions and raise a NOTIFY
+VERSIONED_TABLES = [
+    "projects",
+    "market_data",
+    "reform_tracker",
+    "generation_mix",
+    "top_level_kpis",
+    "historical_growth",
+    "financial_data",
+    "regulatory_updates",
+    "transmission_lines",
+    "protected_areas",
+]
+
+CHANGE_CHANNEL = "table_changes"
+
+_BUMP_FUNCTION_SQL = f"""
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO table_versions (table_name, version, updated_at)
+    VALUES (TG_TABLE_NAME, 1, now())
+    ON CONFLICT (table_name) DO UPDATE
+        SET version = table_versions.version + 1, updated_at = now();
+    PERFORM pg_notify('{CHANGE_CHANNEL}', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def install_version_triggers(conn, tables=None):
+    """
+    (Re)creates the statement-level triggers that keep table_versions current.
+    Safe to run repeatedly; must run after the tables exist.
+    """
+    conn.execute(text(_BUMP_FUNCTION_SQL))
+    for table in tables or VERSIONED_TABLES:
+        # Start every table at a known version so its readers can cache before its first write
+        conn.execute(
+            text("INSERT INTO table_versions (table_name, version) VALUES (:t, 0) ON CONFLICT (table_name) DO NOTHING"),
+            {"t": table}
+        )
+        conn.execute(text(f"DROP TRIGGER IF EXISTS trg_version_{table} ON {table}"))
+        conn.execute(text(
+            f"CREATE TRIGGER trg_version_{table} "
+            f"AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()"
+        ))
+
+
+async def fetch_versions(db) -> dict:
+    rows = (await db.execute(text("SELECT table_name, version FROM table_versions"))).all()
+    return {name: version for name, version in rows}
+
+
+class VersionTracker:
+    """
+    The latest table versions known to this process. Kept current by the
+    change broker (LISTEN/NOTIFY); a table without a known version is never cached.
+    """
+
+    def __init__(self):
+        self._versions = {}
+
+    def get(self, table: str):
+        return self._versions.get(table)
+
+    def update(self, versions: dict):
+        self._versions.update(versions)
+
+
+tracker = VersionTracker()
@@ -0,0 +1,184 @@
+import asyncio
+import os
+
+import numpy as np
+
+import http_client
+import metrics
+from cache import TTLCache, make_store
+
+# Overridable so the lookup can be pointed at a local stub server
+AQUEDUCT_URL = os.getenv("AQUEDUCT_URL", "https://aqueduct40.rdc.io/api/v1/analysis")
+AQUEDUCT_TIMEOUT = 8.0
+AQUEDUCT_SOURCE = "WRI Aqueduct 4.0 — Business as Usual 2030"
+FALLBACK_SOURCE = "Regional estimate — ONEE / National Water Plan Morocco (fallback)"
+
+# Aqueduct scores are per sub-basin, so ~1 km rounding never changes the answer
+CACHE_PRECISION = 2
+WATER_STRESS_CACHE_TTL = float(os.getenv("WATER_STRESS_CACHE_TTL", str(7 * 24 * 3600)))
+WATER_STRESS_CACHE_SIZE = int(os.getenv("WATER_STRESS_CACHE_SIZE", "8192"))
+
+# Upper bound on simultaneous Aqueduct requests made by one batch
+BATCH_CONCURRENCY = int(os.getenv("WATER_STRESS_BATCH_CONCURRENCY", "8"))
+
+# Once Aqueduct keeps failing, skip it entirely until a half-open probe succeeds
+aqueduct_breaker = http_client.CircuitBreaker("aqueduct", failure_threshold=3, reset_timeout=30.0)
+
+water_stress_cache = TTLCache(
+    WATER_STRESS_CACHE_SIZE,
+    WATER_STRESS_CACHE_TTL,
+    make_store("water_stress.sqlite", "aqueduct"),
+    name="water_stress",
+)
+
+
+def bws_label(score: float) -> str:
+    if score < 1.0:   return "Low"
+    if score < 2.0:   return "Low-Medium"
+    if score < 3.0:   return "Medium-High"
+    if score < 4.0:   return "High"
+    return "Extremely High"
+
+
+def estimate_morocco_bws(lat: float, lon: float) -> float:
+    """
+    Regional heuristic for Morocco's baseline water stress:
+    Based on national water scarcity data (Plan National de l'Eau 2020-2050).
+    """
+    # Extremely arid south (Sahara, Anti-Atlas far south)
+    if lat < 28.5:
+        return round(4.2 + (28.5 - lat) * 0.08, 2)
+    # Arid south-central (Draa, Souss, Tafilalet)
+    if lat < 30.5:
+        return round(3.5 + (30.5 - lat) * 0.1, 2)
+    # Semi-arid central (Marrakech, Beni Mellal region)
+    if lat < 32.5:
+        return round(2.8 - (lat - 30.5) * 0.15, 2)
+    # Sub-humid north-central (Fès, Meknès)
+    if lat < 34.0:
+        return round(1.8 - (lat - 32.5) * 0.2, 2)
+    # Humid/sub-humid north (Tanger, Al Hoceima, Rif)
+    return round(max(0.5, 1.2 - (lat - 34.0) * 0.4), 2)
+
+
+BWS_LABELS = np.array(["Low", "Low-Medium", "Medium-High", "High", "Extremely High"])
+BWS_THRESHOLDS = np.array([1.0, 2.0, 3.0, 4.0])
+
+
+def bws_class_array(scores) -> np.ndarray:
+    """Index into BWS_LABELS for every score (vectorized bws_label)."""
+    return np.searchsorted(BWS_THRESHOLDS, np.asarray(scores, dtype=np.float64), side="right")
+
+
+def bws_label_array(scores) -> np.ndarray:
+    return BWS_LABELS[bws_class_array(scores)]
+
+
+def estimate_morocco_bws_array(lat, lon) -> np.ndarray:
+    """
+    Vectorized estimate_morocco_bws over arrays (or grids) of coordinates.
+    Same bands and coefficients as the scalar version, evaluated in one pass.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lat, _ = np.broadcast_arrays(lat, np.asarray(lon, dtype=np.float64))
+    scores = np.select(
+        [lat < 28.5, lat < 30.5, lat < 32.5, lat < 34.0],
+        [
+            4.2 + (28.5 - lat) * 0.08,
+            3.5 + (30.5 - lat) * 0.1,
+            2.8 - (lat - 30.5) * 0.15,
+            1.8 - (lat - 32.5) * 0.2,
+        ],
+        default=np.maximum(0.5, 1.2 - (lat - 34.0) * 0.4),
+    )
+    return np.round(scores, 2)
+
+
+def estimate_raster(min_lon: float, min_lat: float, max_lon: float, max_lat: float, resolution: float):
+    """
+    Regional water-stress estimate sampled at cell centres over a bbox.
+    Rows run north to south (image order). The heuristic only varies with latitude,
+    so every cell of a row has the same value: returns (row scores, row classes, width)
+    with one entry per row, to be repeated across the `width` columns.
+    """
+    width = max(1, int(np.ceil((max_lon - min_lon) / resolution)))
+    height = max(1, int(np.ceil((max_lat - min_lat) / resolution)))
+    lats = max_lat - (np.arange(height) + 0.5) * resolution
+    scores = estimate_morocco_bws_array(lats, min_lon + 0.5 * resolution)
+    return scores, bws_class_array(scores), width
+
+
+def _cache_key(lat: float, lon: float) -> str:
+    return f"{round(lat, CACHE_PRECISION)},{round(lon, CACHE_PRECISION)}"
+
+
+async def fetch_aqueduct_bws(lat: float, lon: float):
+    """Returns the raw Aqueduct BWS score for a point, or None if it is unavailable."""
+    if not aqueduct_breaker.allow():
+        return None
+
+    payload = {
+        "geom": {"type": "Point", "coordinates": [lon, lat]},
+        "indicators": ["bws"],
+        "year": "2030",
+        "scenario": "business_as_usual"
+    }
+    try:
+        resp = await http_client.request("POST", AQUEDUCT_URL, json=payload, timeout=AQUEDUCT_TIMEOUT)
+        if resp.status_code == 200:
+            data = resp.json()
+            aqueduct_breaker.record_success()
+            return data.get("data", [{}])[0].get("bws_raw", None)
+    except Exception:
+        pass  # Caller falls through to regional fallback
+    aqueduct_breaker.record_failure()
+    return None
+
+
+async def score_point(lat: float, lon: float) -> dict:
+    """
+    Water stress for one point: cached Aqueduct score if we have one, a fresh
+    Aqueduct lookup otherwise, and the regional estimate if Aqueduct is unavailable.
+    Only Aqueduct answers are cached, so the fallback never hides a recovered upstream.
+    """
+    key = _cache_key(lat, lon)
+    bws = await water_stress_cache.aget(key)
+    cached = bws is not None
+    if bws is None:
+        bws = await fetch_aqueduct_bws(lat, lon)
+        if bws is not None:
+            await water_stress_cache.aset(key, bws)
+
+    if bws is not None:
+        return {
+            "lat": lat, "lon": lon,
+            "bws_score": round(bws, 2),
+            "bws_label": bws_label(bws),
+            "source": AQUEDUCT_SOURCE,
+            "cached": cached
+        }
+
+    # --- Regional fallback based on Morocco's hydrology ---
+    # Morocco has significant north-south gradient:
+    # North (>35°N) — Low stress | Coastal — Medium | South (<30°N) — High/Extreme
+    # East of Oued Draa (<28°N) — Extremely High
+    bws_estimated = estimate_morocco_bws(lat, lon)
+    metrics.WATER_STRESS_FALLBACK_TOTAL.inc()
+    return {
+        "lat": lat, "lon": lon,
+        "bws_score": bws_estimated,
+        "bws_label": bws_label(bws_estimated),
+        "source": FALLBACK_SOURCE,
+        "cached": False
+    }
+
+
+async def score_points(points, concurrency: int = BATCH_CONCURRENCY) -> list:
+    """Scores many points over the shared client, with at most `concurrency` upstream calls in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(lat, lon):
+        async with semaphore:
+            return await score_point(lat, lon)
+
+    return await asyncio.gather(*(bounded(lat, lon) for lat, lon in points))
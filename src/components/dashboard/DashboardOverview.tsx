@@ -1,7 +1,7 @@
 "use client";
 
-import { useState, useEffect } from "react";
-import { useSync } from "@/context/SyncContext";
+import { useState, useEffect, useCallback } from "react";
+import { useSync, useLiveStream, mergeRecords } from "@/context/SyncContext";
 import {
     PieChart,
     Pie,
@@ -17,6 +17,14 @@ import {
 } from "recharts";
 import { ArrowUpRight, ArrowDownRight, Activity, Zap } from "lucide-react";
 
+// Snapshot section of each watched table
+const SECTION_OF: Record<string, string> = {
+    top_level_kpis: "kpis",
+    generation_mix: "generation_mix",
+    historical_growth: "historical_growth",
+    projects: "projects",
+};
+
 export function DashboardOverview() {
     // eslint-disable-next-line @typescript-eslint/no-explicit-any
     const [kpis, setKpis] = useState < any[] > ([]);
@@ -31,47 +39,58 @@ export function DashboardOverview() {
     const [isLoading, setIsLoading] = useState(true);
     const { isLiveSyncEnabled } = useSync();
 
-    useEffect(() => {
-        const fetchData = async () => {
-            try {
-                // If the user has "Live Sync" toggled on, fetch from the real-time Python Web Scraper proxy.
-                // Else fall back to the resilient Postgres local database snapshots.
-                const kpisEndpoint = isLiveSyncEnabled ? 'http://localhost:8000/api/kpis-live' : 'http://localhost:8000/api/kpis';
-
-                const [kpisRes, mixRes, growthRes, projectsRes] = await Promise.all([
-                    fetch(kpisEndpoint),
-                    fetch('http://localhost:8000/api/generation-mix'),
-                    fetch('http://localhost:8000/api/historical-growth'),
-                    fetch('http://localhost:8000/api/projects')
-                ]);
+    // One aggregated request for the requested overview sections (all of them by default).
+    // With "Live Sync" on, KPIs carry the live synchronization marker.
+    const fetchData = useCallback(async (sections = 'kpis,generation_mix,historical_growth,projects') => {
+        try {
+            const res = await fetch(`http://localhost:8000/api/dashboard/snapshot?sections=${sections}&live=${isLiveSyncEnabled}`);
 
-                if (kpisRes.ok && mixRes.ok && growthRes.ok && projectsRes.ok) {
-                    setKpis(await kpisRes.json());
-                    const mixData = await mixRes.json();
+            if (res.ok) {
+                const snapshot = await res.json();
+                if (snapshot.kpis) setKpis(snapshot.kpis);
+                if (snapshot.generation_mix) {
+                    const mixData = snapshot.generation_mix;
                     // eslint-disable-next-line @typescript-eslint/no-explicit-any
                     setCurrentMix(mixData.filter((m: any) => m.type === 'current'));
                     // eslint-disable-next-line @typescript-eslint/no-explicit-any
                     setTargetMix(mixData.filter((m: any) => m.type === 'target'));
-                    setGrowth(await growthRes.json());
-                    setProjects(await projectsRes.json());
                 }
-            } catch (error) {
-                console.error("Error fetching overview data:", error);
-            } finally {
-                setIsLoading(false);
+                if (snapshot.historical_growth) setGrowth(snapshot.historical_growth);
+                if (snapshot.projects) setProjects(snapshot.projects);
             }
-        };
+        } catch (error) {
+            console.error("Error fetching overview data:", error);
+        } finally {
+            setIsLoading(false);
+        }
+    }, [isLiveSyncEnabled]);
 
+    useEffect(() => {
         fetchData();
+    }, [fetchData]);
 
-        let interval: NodeJS.Timeout;
-        if (isLiveSyncEnabled) {
-            // Poll for fresh data every 10 seconds if Sync is ON
-            interval = setInterval(fetchData, 10000);
+    // Live Sync: instead of polling, the backend pushes only the rows that changed
+    // (projects, a large table, only announces that it changed and is refetched)
+    useLiveStream(
+        ["top_level_kpis", "generation_mix", "historical_growth", "projects"],
+        (tables) => fetchData(tables.map((t) => SECTION_OF[t]).join(",")),
+        (change) => {
+            switch (change.table) {
+                case "top_level_kpis":
+                    setKpis((prev) => mergeRecords(prev, change));
+                    break;
+                case "generation_mix":
+                    // eslint-disable-next-line @typescript-eslint/no-explicit-any
+                    setCurrentMix((prev) => mergeRecords(prev, change).filter((m: any) => m.type === 'current'));
+                    // eslint-disable-next-line @typescript-eslint/no-explicit-any
+                    setTargetMix((prev) => mergeRecords(prev, change).filter((m: any) => m.type === 'target'));
+                    break;
+                case "historical_growth":
+                    setGrowth((prev) => mergeRecords(prev, change));
+                    break;
+            }
         }
-
-        return () => clearInterval(interval);
-    }, [isLiveSyncEnabled]);
+    );
 
     if (isLoading) {
         return (
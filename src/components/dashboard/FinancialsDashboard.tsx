@@ -12,7 +12,7 @@ import {
     Cell
 } from "recharts";
 import { TrendingUp, TrendingDown, DollarSign, Briefcase, RefreshCw, BookOpen, Minus } from "lucide-react";
-import { useSync } from "@/context/SyncContext";
+import { useSync, useLiveStream, mergeRecords } from "@/context/SyncContext";
 
 interface FinancialItem {
     id: number;
@@ -48,14 +48,14 @@ export function FinancialsDashboard() {
 
     useEffect(() => {
         fetchFinancials();
-
-        let interval: NodeJS.Timeout;
-        if (isLiveSyncEnabled) {
-            interval = setInterval(fetchFinancials, 10000);
-        }
-        return () => clearInterval(interval);
     }, [isLiveSyncEnabled, fetchFinancials]);
 
+    // Live Sync: the backend pushes only the rows that changed
+    useLiveStream(["financial_data"], fetchFinancials, (change) => {
+        setInvestmentDistribution((prev) => mergeRecords(prev, change));
+        setLastUpdated(new Date());
+    });
+
     const totalInvestment = investmentDistribution.reduce((sum, item) => sum + item.amountBillionUSD, 0);
 
     // Separate major sectors from individual financing lines
@@ -6,7 +6,7 @@ import {
     BarChart, Bar, Cell
 } from "recharts";
 import { TrendingDown, Activity, DollarSign, Target, CheckCircle2, CircleDashed, RefreshCw, Info } from "lucide-react";
-import { useSync } from "@/context/SyncContext";
+import { useSync, useLiveStream, mergeRecords } from "@/context/SyncContext";
 
 interface MarketDataItem {
     id: number;
@@ -50,13 +50,11 @@ export function MarketEvaluationDashboard() {
 
     const fetchData = useCallback(async () => {
         try {
-            const [marketRes, reformsRes] = await Promise.all([
-                fetch("http://127.0.0.1:8000/api/market-data"),
-                fetch("http://127.0.0.1:8000/api/reforms")
-            ]);
-            if (marketRes.ok && reformsRes.ok) {
-                setMarketData(await marketRes.json());
-                setReformsData(await reformsRes.json());
+            const res = await fetch("http://127.0.0.1:8000/api/dashboard/snapshot?sections=market_data,reforms");
+            if (res.ok) {
+                const snapshot = await res.json();
+                setMarketData(snapshot.market_data);
+                setReformsData(snapshot.reforms);
                 setLastUpdated(new Date());
             }
         } catch (error) {
@@ -68,13 +66,15 @@ export function MarketEvaluationDashboard() {
 
     useEffect(() => {
         fetchData();
-        let interval: NodeJS.Timeout;
-        if (isLiveSyncEnabled) {
-            interval = setInterval(fetchData, 10000);
-        }
-        return () => clearInterval(interval);
     }, [isLiveSyncEnabled, fetchData]);
 
+    // Live Sync: the backend pushes only the rows that changed
+    useLiveStream(["market_data", "reform_tracker"], fetchData, (change) => {
+        if (change.table === "market_data") setMarketData((prev) => mergeRecords(prev, change));
+        if (change.table === "reform_tracker") setReformsData((prev) => mergeRecords(prev, change));
+        setLastUpdated(new Date());
+    });
+
     if (isLoading) {
         return (
             <div className="flex flex-col items-center justify-center min-h-[500px] gap-4">
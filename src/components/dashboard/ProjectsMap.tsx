@@ -5,9 +5,16 @@ import { MapPin, Info, Zap, Wind, Droplets, Activity, Leaf, AlertTriangle, Dropl
 import { ComposableMap, Geographies, Geography, Marker, ZoomableGroup } from "react-simple-maps";
 import { AreaChart, Area, XAxis, YAxis, Tooltip, ResponsiveContainer } from "recharts";
 import { useSync } from "@/context/SyncContext";
+import { fetchSnapshot } from "@/services/snapshot";
 
 const geoUrl = "/world.json";
 
+// Approximate web-map zoom level of the base projection (geoMercator, scale 2200).
+// Used to request geometries simplified for what is actually visible.
+const MAP_BASE_ZOOM = 6;
+// Largest batch /api/water-stress/batch accepts (schemas.WaterStressBatchRequest)
+const WATER_STRESS_BATCH_SIZE = 2000;
+
 export function ProjectsMap() {
     // eslint-disable-next-line @typescript-eslint/no-explicit-any
     const [keyProjects, setKeyProjects] = useState < any[] > ([]);
@@ -19,12 +26,18 @@ export function ProjectsMap() {
     // eslint-disable-next-line @typescript-eslint/no-explicit-any
     const [gridLines, setGridLines] = useState < any[] > ([]);
     const [showGrid, setShowGrid] = useState(false);
+    const [mapZoom, setMapZoom] = useState(1);
+    const gridZoom = Math.ceil(MAP_BASE_ZOOM + Math.log2(mapZoom));
 
     // SIBE Layer
     // eslint-disable-next-line @typescript-eslint/no-explicit-any
     const [sibeZones, setSibeZones] = useState < any | null > (null);
     const [showSibe, setShowSibe] = useState(false);
 
+    // Exact grid / SIBE proximity per project, computed server-side in PostGIS
+    // eslint-disable-next-line @typescript-eslint/no-explicit-any
+    const [projectConstraints, setProjectConstraints] = useState < Record < number, any>> ({});
+
     // Water Stress Layer
     // eslint-disable-next-line @typescript-eslint/no-explicit-any
     const [waterStressScores, setWaterStressScores] = useState < Record < number, any>> ({});
@@ -57,33 +70,34 @@ export function ProjectsMap() {
             }
         };
 
-        const fetchGridData = async () => {
+        const fetchSibeZones = async () => {
             try {
-                const res = await fetch('http://localhost:8000/api/grid-data');
+                const res = await fetchSnapshot(`/api/sibe-zones?zoom=${MAP_BASE_ZOOM}`);
                 if (res.ok) {
-                    const gridFeatureCollection = await res.json();
-                    setGridLines(gridFeatureCollection.features || []);
+                    const data = await res.json();
+                    setSibeZones(data);
                 }
             } catch (error) {
-                console.error("Error fetching grid data:", error);
+                console.error("Error fetching SIBE zones:", error);
             }
         };
 
-        const fetchSibeZones = async () => {
+        const fetchProjectConstraints = async () => {
             try {
-                const res = await fetch('http://localhost:8000/api/sibe-zones');
+                const res = await fetch('http://localhost:8000/api/projects/constraints');
                 if (res.ok) {
                     const data = await res.json();
-                    setSibeZones(data);
+                    // eslint-disable-next-line @typescript-eslint/no-explicit-any
+                    setProjectConstraints(Object.fromEntries(data.results.map((r: any) => [r.id, r])));
                 }
             } catch (error) {
-                console.error("Error fetching SIBE zones:", error);
+                console.error("Error fetching project constraints:", error);
             }
         };
 
         fetchProjects();
-        fetchGridData();
         fetchSibeZones();
+        fetchProjectConstraints();
 
         let interval: NodeJS.Timeout;
         if (isLiveSyncEnabled) {
@@ -92,6 +106,23 @@ export function ProjectsMap() {
         return () => clearInterval(interval);
     }, [isLiveSyncEnabled]);
 
+    // Grid lines are re-fetched at a finer simplification level when the user zooms in
+    useEffect(() => {
+        const fetchGridData = async () => {
+            try {
+                const res = await fetchSnapshot(`/api/grid-data?zoom=${gridZoom}`);
+                if (res.ok) {
+                    const gridFeatureCollection = await res.json();
+                    setGridLines(gridFeatureCollection.features || []);
+                }
+            } catch (error) {
+                console.error("Error fetching grid data:", error);
+            }
+        };
+
+        fetchGridData();
+    }, [gridZoom]);
+
     // Fetch dynamic climatic data whenever a project is selected
     useEffect(() => {
         if (!selectedProject || !selectedProject.latitude || !selectedProject.longitude) return;
@@ -131,24 +162,38 @@ export function ProjectsMap() {
         fetchSingleWaterStress();
     }, [selectedProject]);
 
-    // Fetch all water stress scores if layer is activated
+    // Fetch all water stress scores if layer is activated, in batches the endpoint accepts
     useEffect(() => {
-        if (showWaterStress && Object.keys(waterStressScores).length < keyProjects.length) {
-            setIsFetchingWaterStress(true);
-            Promise.all(keyProjects.map(p =>
-                fetch(`http://localhost:8000/api/water-stress?lat=${p.latitude}&lon=${p.longitude}`)
-                    .then(res => res.json())
-                    .then(data => ({ id: p.id, data }))
-                    .catch(() => ({ id: p.id, data: null }))
-            )).then(results => {
-                const scores: Record<number, any> = { ...waterStressScores };
-                results.forEach(r => {
-                    if (r.data) scores[r.id] = r.data;
-                });
-                setWaterStressScores(scores);
-                setIsFetchingWaterStress(false);
-            });
+        const missing = keyProjects.filter(p => waterStressScores[p.id] === undefined);
+        if (!showWaterStress || missing.length === 0) return;
+        setIsFetchingWaterStress(true);
+        const batches = [];
+        for (let i = 0; i < missing.length; i += WATER_STRESS_BATCH_SIZE) {
+            batches.push(missing.slice(i, i + WATER_STRESS_BATCH_SIZE));
         }
+        Promise.all(batches.map(batch =>
+            fetch('http://localhost:8000/api/water-stress/batch', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({
+                    points: batch.map(p => ({ id: p.id, lat: p.latitude, lon: p.longitude }))
+                })
+            })
+                .then(res => res.json())
+                .then(data => {
+                    // Each batch shows up as soon as it is scored
+                    setWaterStressScores(prev => {
+                        // eslint-disable-next-line @typescript-eslint/no-explicit-any
+                        const scores: Record<number, any> = { ...prev };
+                        // eslint-disable-next-line @typescript-eslint/no-explicit-any
+                        (data.results || []).forEach((r: any) => {
+                            if (r.id !== undefined) scores[r.id] = r;
+                        });
+                        return scores;
+                    });
+                })
+                .catch(err => console.error("Failed to fetch water stress scores:", err))
+        )).finally(() => setIsFetchingWaterStress(false));
     }, [showWaterStress, keyProjects]);
 
     const getIcon = (type: string) => {
@@ -169,7 +214,10 @@ export function ProjectsMap() {
     };
 
     // Calculate rough distance to nearest SIBE
-    const getNearestSibe = useCallback((lat: number, lon: number) => {
+    const getNearestSibe = useCallback((lat: number, lon: number, projectId?: number) => {
+        const exact = projectId !== undefined ? projectConstraints[projectId]?.sibe : null;
+        if (exact) return { name: exact.name, distance: exact.distance_km };
+
         if (!sibeZones || !sibeZones.features) return null;
         let minDist = Infinity;
         // eslint-disable-next-line @typescript-eslint/no-explicit-any
@@ -196,7 +244,7 @@ export function ProjectsMap() {
         });
 
         return { name: nearestSibe?.name, distance: minDist };
-    }, [sibeZones]);
+    }, [sibeZones, projectConstraints]);
 
     return (
         <div className="space-y-6 animate-fade-in">
@@ -281,7 +329,7 @@ export function ProjectsMap() {
                                     }}
                                     className="w-full h-full outline-none"
                                 >
-                                    <ZoomableGroup zoom={1} center={[-8, 29.5]} minZoom={1} maxZoom={5}>
+                                    <ZoomableGroup zoom={1} center={[-8, 29.5]} minZoom={1} maxZoom={5} onMoveEnd={({ zoom }) => setMapZoom(zoom)}>
                                         <Geographies geography={geoUrl}>
                                             {({ geographies }) =>
                                                 geographies.map((geo) => {
@@ -603,7 +651,7 @@ export function ProjectsMap() {
                                             <div>
                                                 <div className="text-[11px] text-[var(--text-muted)] mb-1 flex items-center gap-1.5"><MapPin size={12} className="text-emerald-400" /> Nearest Protected Area</div>
                                                 {sibeZones ? (() => {
-                                                    const nearest = getNearestSibe(selectedProject.latitude, selectedProject.longitude);
+                                                    const nearest = getNearestSibe(selectedProject.latitude, selectedProject.longitude, selectedProject.id);
                                                     if (!nearest) return <div className="text-xs text-[var(--text-muted)]">Geospatial analysis failed</div>;
 
                                                     const isCritical = nearest.distance < 10;
@@ -1,37 +1,76 @@
 "use client";
 
-import { useState, useEffect } from "react";
-import { Scale, FileText, CheckCircle2, ChevronRight, BookOpen } from "lucide-react";
-import { useSync } from "@/context/SyncContext";
+import { useState, useEffect, useCallback } from "react";
+import { Scale, FileText, CheckCircle2, ChevronRight, BookOpen, Search } from "lucide-react";
+import { useSync, useLiveStream } from "@/context/SyncContext";
+
+const PAGE_SIZE = 50;
+const REGULATION_TYPES = ["Law", "Decree", "Policy"];
 
 export function RegulationsDashboard() {
     // eslint-disable-next-line @typescript-eslint/no-explicit-any
     const [regulatoryUpdates, setRegulatoryUpdates] = useState < any[] > ([]);
     const [isLoading, setIsLoading] = useState(true);
+    const [query, setQuery] = useState("");
+    const [typeFilter, setTypeFilter] = useState("");
+    const [nextCursor, setNextCursor] = useState < string | null > (null);
+    const [isLoadingMore, setIsLoadingMore] = useState(false);
     const { isLiveSyncEnabled } = useSync();
 
-    useEffect(() => {
-        const fetchRegulations = async () => {
-            try {
-                const response = await fetch('http://localhost:8000/api/regulations');
-                if (response.ok) {
-                    setRegulatoryUpdates(await response.json());
-                }
-            } catch (error) {
-                console.error("Error fetching regulations data:", error);
-            } finally {
-                setIsLoading(false);
+    // Search, filters and paging run server-side: only one page of the archive is ever shipped
+    const fetchPage = useCallback(async (after: string | null) => {
+        const params = new URLSearchParams({ limit: String(PAGE_SIZE) });
+        if (query.trim()) params.set("q", query.trim());
+        if (typeFilter) params.set("type", typeFilter);
+        if (after) params.set("after", after);
+        const response = await fetch(`http://localhost:8000/api/regulations/search?${params}`);
+        if (!response.ok) return null;
+        return { rows: await response.json(), cursor: response.headers.get("X-Next-Cursor") };
+    }, [query, typeFilter]);
+
+    const loadFirstPage = useCallback(async (isCancelled: () => boolean = () => false) => {
+        try {
+            const page = await fetchPage(null);
+            if (page && !isCancelled()) {
+                setRegulatoryUpdates(page.rows);
+                setNextCursor(page.cursor);
             }
-        };
+        } catch (error) {
+            console.error("Error fetching regulations data:", error);
+        } finally {
+            if (!isCancelled()) setIsLoading(false);
+        }
+    }, [fetchPage]);
 
-        fetchRegulations();
+    useEffect(() => {
+        let cancelled = false;
+        // Debounced, so typing does not fire one search per keystroke
+        const timer = setTimeout(() => loadFirstPage(() => cancelled), 250);
+        return () => {
+            cancelled = true;
+            clearTimeout(timer);
+        };
+    }, [loadFirstPage, isLiveSyncEnabled]);
 
-        let interval: NodeJS.Timeout;
-        if (isLiveSyncEnabled) {
-            interval = setInterval(fetchRegulations, 10000);
+    const loadMore = async () => {
+        if (!nextCursor) return;
+        setIsLoadingMore(true);
+        try {
+            const page = await fetchPage(nextCursor);
+            if (page) {
+                setRegulatoryUpdates((prev) => [...prev, ...page.rows]);
+                setNextCursor(page.cursor);
+            }
+        } catch (error) {
+            console.error("Error fetching regulations data:", error);
+        } finally {
+            setIsLoadingMore(false);
         }
-        return () => clearInterval(interval);
-    }, [isLiveSyncEnabled]);
+    };
+
+    // Live Sync: the archive is too large to push row by row, so a change to it
+    // reloads the first page of the current search
+    useLiveStream(["regulatory_updates"], () => loadFirstPage());
 
     if (isLoading) {
         return (
@@ -69,8 +108,35 @@ export function RegulationsDashboard() {
                             Recent Updates & Policies
                         </h3>
 
+                        <div className="flex flex-col sm:flex-row gap-3 mb-8">
+                            <div className="relative flex-1">
+                                <Search size={16} className="absolute left-3 top-1/2 -translate-y-1/2 text-white/40" />
+                                <input
+                                    type="search"
+                                    value={query}
+                                    onChange={(e) => setQuery(e.target.value)}
+                                    placeholder="Search laws, decrees, policies (FR / EN)"
+                                    className="w-full bg-[#0A1225]/60 border border-white/10 rounded-xl pl-9 pr-3 py-2.5 text-sm text-white placeholder:text-white/40 focus:outline-none focus:border-blue-500/50"
+                                />
+                            </div>
+                            <select
+                                value={typeFilter}
+                                onChange={(e) => setTypeFilter(e.target.value)}
+                                className="bg-[#0A1225]/60 border border-white/10 rounded-xl px-3 py-2.5 text-sm text-white focus:outline-none focus:border-blue-500/50"
+                            >
+                                <option value="">All types</option>
+                                {REGULATION_TYPES.map((t) => (
+                                    <option key={t} value={t}>{t}</option>
+                                ))}
+                            </select>
+                        </div>
+
+                        {regulatoryUpdates.length === 0 && (
+                            <p className="text-sm text-white/50 ml-4">No regulatory updates match this search.</p>
+                        )}
+
                         <div className="relative border-l-2 border-white/10 ml-4 space-y-10 pb-4">
-                            {regulatoryUpdates.map((update, index) => (
+                            {regulatoryUpdates.map((update) => (
                                 <div key={update.id} className="relative pl-10 group/item">
                                     {/* Animated Timeline Dot */}
                                     <span className={`absolute -left-[11px] top-1.5 w-5 h-5 rounded-full border-[4px] border-[#0A1225] shadow-[0_0_10px_rgba(0,0,0,0.8)] z-10 transition-transform duration-300 group-hover/item:scale-125
@@ -112,6 +178,16 @@ export function RegulationsDashboard() {
                                 </div>
                             ))}
                         </div>
+
+                        {nextCursor && (
+                            <button
+                                onClick={loadMore}
+                                disabled={isLoadingMore}
+                                className="mt-6 ml-4 text-sm font-semibold text-blue-400 hover:text-blue-300 disabled:opacity-50 transition-colors"
+                            >
+                                {isLoadingMore ? "Loading…" : "Load older updates"}
+                            </button>
+                        )}
                     </div>
                 </div>
 
@@ -1,6 +1,6 @@
 "use client";
 
-import React, { createContext, useContext, useState, ReactNode } from "react";
+import React, { createContext, useContext, useState, useEffect, useRef, ReactNode } from "react";
 
 interface SyncContextType {
     isLiveSyncEnabled: boolean;
@@ -30,3 +30,67 @@ export function useSync() {
     }
     return context;
 }
+
+export interface LiveChange {
+    table: string;
+    version: number;
+    // eslint-disable-next-line @typescript-eslint/no-explicit-any
+    upserted: any[];
+    deleted: number[];
+    // Set for the large tables (projects, regulatory_updates): no rows are pushed, refetch instead
+    refetch?: boolean;
+}
+
+// Applies a pushed change to a list of records keyed by id
+export function mergeRecords<T extends { id: number }>(rows: T[], change: LiveChange): T[] {
+    const deleted = new Set(change.deleted);
+    const upserted = new Map(change.upserted.map((r) => [r.id, r]));
+    const merged = rows
+        .filter((r) => !deleted.has(r.id))
+        .map((r) => (upserted.has(r.id) ? { ...r, ...upserted.get(r.id) } : r));
+    const existing = new Set(merged.map((r) => r.id));
+    change.upserted.forEach((r) => {
+        if (!existing.has(r.id)) merged.push(r);
+    });
+    return merged;
+}
+
+// Subscribes to the backend change stream while Live Sync is on, instead of polling.
+// `onStale` is called with the tables whose data may be out of date and must be refetched:
+// every table on the first connection (the initial REST fetch may predate the subscription),
+// the tables whose version moved on a reconnect, and large tables on every change.
+export function useLiveStream(
+    tables: string[],
+    onStale: (tables: string[]) => void,
+    onChange?: (change: LiveChange) => void
+) {
+    const { isLiveSyncEnabled } = useSync();
+    const onStaleRef = useRef(onStale);
+    onStaleRef.current = onStale;
+    const onChangeRef = useRef(onChange);
+    onChangeRef.current = onChange;
+    const tablesKey = tables.join(",");
+
+    useEffect(() => {
+        if (!isLiveSyncEnabled) return;
+        const watched = tablesKey.split(",");
+        // Versions of the data applied so far; unknown until the first 'hello'
+        let applied: Record<string, number> | null = null;
+        const source = new EventSource(`http://localhost:8000/api/stream?tables=${tablesKey}`);
+        // Sent on every (re)connect, including after the server dropped a slow client
+        source.addEventListener("hello", (event) => {
+            const versions: Record<string, number> = JSON.parse((event as MessageEvent).data).versions;
+            const previous = applied;
+            const stale = previous === null ? watched : watched.filter((t) => versions[t] !== previous[t]);
+            applied = { ...versions };
+            if (stale.length) onStaleRef.current(stale);
+        });
+        source.addEventListener("change", (event) => {
+            const change: LiveChange = JSON.parse((event as MessageEvent).data);
+            applied = { ...applied, [change.table]: change.version };
+            if (change.refetch || !onChangeRef.current) onStaleRef.current([change.table]);
+            else onChangeRef.current(change);
+        });
+        return () => source.close();
+    }, [isLiveSyncEnabled, tablesKey]);
+}
@@ -0,0 +1,52 @@
+// Static snapshots of the seed-only endpoints, written by backend/export_static.py
+// into public/snapshots/. Served by Next.js (or a CDN) without hitting the API;
+// anything missing from the manifest falls back to the live API.
+
+const API_BASE = "http://localhost:8000";
+const SNAPSHOT_BASE = "/snapshots";
+
+interface SnapshotManifest {
+    zoom_buckets: number[];
+    entries: Record<string, { files: { identity: string }; etag: string }>;
+}
+
+let manifestPromise: Promise<SnapshotManifest | null> | null = null;
+
+function loadManifest(): Promise<SnapshotManifest | null> {
+    if (!manifestPromise) {
+        manifestPromise = fetch(`${SNAPSHOT_BASE}/manifest.json`, { cache: "no-cache" })
+            .then((res) => (res.ok ? res.json() : null))
+            .catch(() => null);
+    }
+    return manifestPromise;
+}
+
+// Same mapping as the backend's simplify.zoom_bucket: the nearest bucket at least as detailed
+function zoomBucket(zoom: number, buckets: number[]): number | null {
+    return buckets.find((bucket) => zoom <= bucket) ?? null;
+}
+
+// Fetches an API path (e.g. "/api/financials" or "/api/grid-data?zoom=6") from its static snapshot when there is one
+export async function fetchSnapshot(path: string): Promise<Response> {
+    const manifest = await loadManifest();
+    if (manifest) {
+        const [pathname, query] = path.split("?");
+        const zoom = new URLSearchParams(query).get("zoom");
+        let key = pathname;
+        if (zoom !== null) {
+            const bucket = zoomBucket(Number(zoom), manifest.zoom_buckets);
+            if (bucket !== null) key = `${pathname}?zoom=${bucket}`;
+        }
+        const entry = manifest.entries[key];
+        if (entry) {
+            try {
+                // Content-hashed file names: cacheable forever
+                const res = await fetch(`${SNAPSHOT_BASE}/${entry.files.identity}`, { cache: "force-cache" });
+                if (res.ok) return res;
+            } catch {
+                // Fall through to the live API
+            }
+        }
+    }
+    return fetch(`${API_BASE}${path}`);
+}